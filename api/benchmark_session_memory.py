@@ -0,0 +1,114 @@
+# ===== BENCHMARK SCRIPT - ROLEPLAY SESSION MEMORY =====
+# Run from the api/ directory: python benchmark_session_memory.py
+
+"""
+Compares the memory held by BENCH_SESSIONS concurrent roleplay sessions
+stored as plain dicts (the old layout) and as RoleplaySession/Turn
+objects. Every session is a long Marathon-style call history of
+BENCH_TURNS messages. Both variants are built from the same JSON, the
+way the session store hands a session back, so message text costs the
+same in each and the difference is the per-session/per-turn overhead.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.session import RoleplaySession
+
+SESSIONS = int(os.getenv('BENCH_SESSIONS', '1000'))
+TURNS = int(os.getenv('BENCH_TURNS', '60'))
+
+STAGES = ['phone_pickup', 'opener_evaluation', 'early_objection', 'objection_handling', 'mini_pitch', 'soft_discovery']
+USER_LINES = [
+    "Hi, this is Sam from Acme. I know I'm calling out of the blue, can I take 30 seconds?",
+    "I understand, most people I call say the same thing. Can I explain why I called?",
+    "We help sales teams book more meetings without adding headcount.",
+    "Out of curiosity, how are you handling outbound prospecting today?",
+]
+PROSPECT_LINES = [
+    "Who is this? I'm in the middle of something.",
+    "Okay, you have 30 seconds. What is this about?",
+    "We already use a vendor for that.",
+    "Send me an email and I'll take a look.",
+]
+
+
+def build_session_json(index: int) -> str:
+    """One serialized session shaped like Roleplay 1.2 (Marathon) state"""
+    started = time.time() - 600
+    history = []
+    for turn in range(TURNS):
+        stage = STAGES[(turn // 2) % len(STAGES)]
+        message = {
+            'role': 'user' if turn % 2 else 'assistant',
+            'content': (USER_LINES if turn % 2 else PROSPECT_LINES)[turn // 2 % 4],
+            'timestamp': datetime.fromtimestamp(started + turn * 7.5, timezone.utc).isoformat(),
+            'stage': stage,
+            'call_number': turn // 12 + 1
+        }
+        if not turn % 2:
+            message['evaluation'] = {'score': 3, 'passed': True, 'hang_up_probability': 0.1}
+        history.append(message)
+
+    return json.dumps({
+        'session_id': f'user{index}_1.2_marathon_{int(started)}',
+        'user_id': f'user{index}',
+        'roleplay_id': '1.2',
+        'mode': 'marathon',
+        'started_at': datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        'user_context': {'first_name': 'Alex', 'prospect_job_title': 'CTO', 'prospect_industry': 'Technology'},
+        'session_active': True,
+        'current_stage': STAGES[-1],
+        'turn_count': TURNS // 2,
+        'stage_turn_count': 1,
+        'rubric_scores': {},
+        'conversation_history': history,
+        'marathon_state': {'current_call_number': TURNS // 12 + 1, 'calls_passed': 2, 'calls_failed': 1},
+        'stages_completed': STAGES[:3],
+        'last_activity_at': time.time()
+    })
+
+
+def measure(build) -> int:
+    """Bytes still allocated after build() returns its sessions"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del sessions
+    return used
+
+
+def main():
+    payloads = [build_session_json(index) for index in range(SESSIONS)]
+
+    dict_bytes = measure(lambda: [json.loads(payload) for payload in payloads])
+    slotted_bytes = measure(lambda: [RoleplaySession.from_dict(json.loads(payload)) for payload in payloads])
+
+    # Message text is identical in both layouts; report the overhead around it too
+    text_bytes = measure(lambda: [
+        [message['content'] for message in json.loads(payload)['conversation_history']]
+        for payload in payloads
+    ])
+
+    print(f"\n{SESSIONS} sessions x {TURNS} turns")
+    print(f"  dict sessions:    {dict_bytes / 1024 / 1024:8.2f} MB  ({dict_bytes / SESSIONS / 1024:6.1f} KB/session)")
+    print(f"  RoleplaySession:  {slotted_bytes / 1024 / 1024:8.2f} MB  ({slotted_bytes / SESSIONS / 1024:6.1f} KB/session)")
+    print(f"  reduction:        {dict_bytes / slotted_bytes:8.2f}x")
+
+    if text_bytes < slotted_bytes:
+        print(f"  excluding message text ({text_bytes / 1024 / 1024:.2f} MB): "
+              f"{(dict_bytes - text_bytes) / (slotted_bytes - text_bytes):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# ===== BENCHMARK SCRIPT - ROLEPLAY TURN LATENCY =====
+# Run from the api/ directory: python benchmark_turn_latency.py
+
+"""
+Measures /respond turn latency with a stubbed OpenAI client that sleeps
+for a fixed delay per completion. Compares the sequential pipeline
+(evaluate, then generate the reply) with the concurrent one where the
+reply is generated speculatively while the input is evaluated.
+"""
+
+import os
+import sys
+import time
+import logging
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.openai_service import OpenAIService
+from services.roleplay.roleplay_1_1 import Roleplay11
+
+logging.basicConfig(level=logging.WARNING)
+
+EVALUATION_DELAY = float(os.getenv('BENCH_EVALUATION_DELAY', '0.4'))
+RESPONSE_DELAY = float(os.getenv('BENCH_RESPONSE_DELAY', '0.4'))
+TURNS = int(os.getenv('BENCH_TURNS', '4'))
+
+USER_INPUTS = [
+    "Hi, this is Sam from Acme. I know I'm calling out of the blue, can I take 30 seconds?",
+    "I understand, most people I call say the same thing. Can I explain why I called?",
+    "We help sales teams book more meetings without adding headcount.",
+    "Out of curiosity, how are you handling outbound prospecting today?",
+]
+
+
+class StubCompletions:
+    """Stands in for client.chat.completions with an injected delay"""
+
+    def create(self, model, messages, temperature, max_tokens):
+        # The evaluator is the low-temperature call
+        if temperature < 0.5:
+            time.sleep(EVALUATION_DELAY)
+            content = (
+                "SCORE: 3/4\n"
+                "PASSED: Yes\n"
+                "CRITERIA_MET: clear_introduction, natural_tone\n"
+                "FEEDBACK: Good opener.\n"
+                "HANG_UP_PROBABILITY: 0.1\n"
+                "NEXT_ACTION: continue"
+            )
+        else:
+            time.sleep(RESPONSE_DELAY)
+            content = "Okay, you have 30 seconds. What is this about?"
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def build_stub_openai_service() -> OpenAIService:
+    service = OpenAIService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    service.is_configured = True
+    return service
+
+
+def run_turns(roleplay: Roleplay11) -> list:
+    """Run a short call and return per-turn latencies in seconds"""
+    user_context = {'first_name': 'Alex', 'prospect_job_title': 'CTO', 'prospect_industry': 'Technology'}
+    session_id = roleplay.create_session('bench_user', 'practice', user_context)['session_id']
+
+    latencies = []
+    for user_input in USER_INPUTS[:TURNS]:
+        started = time.perf_counter()
+        result = roleplay.process_user_input(session_id, user_input)
+        latencies.append(time.perf_counter() - started)
+        if not result.get('success'):
+            raise RuntimeError(f"Turn failed: {result.get('error')}")
+
+    roleplay.active_sessions.pop(session_id, None)
+    return latencies
+
+
+def benchmark_turn_latency():
+    print("⏱️  Benchmarking roleplay turn latency")
+    print("=" * 60)
+    print(f"Stub delays: evaluation={EVALUATION_DELAY}s, response={RESPONSE_DELAY}s, turns={TURNS}")
+
+    # Sequential baseline: no speculation, the reply waits for the evaluation
+    sequential = Roleplay11(build_stub_openai_service())
+    sequential._start_speculative_response = lambda session, user_input, on_token=None: None
+    sequential_latencies = run_turns(sequential)
+
+    concurrent = Roleplay11(build_stub_openai_service())
+    concurrent_latencies = run_turns(concurrent)
+
+    sequential_avg = sum(sequential_latencies) / len(sequential_latencies)
+    concurrent_avg = sum(concurrent_latencies) / len(concurrent_latencies)
+
+    print(f"\nSequential turn:  {sequential_avg * 1000:.0f} ms avg")
+    print(f"Concurrent turn:  {concurrent_avg * 1000:.0f} ms avg")
+    print(f"Speed-up:         {sequential_avg / concurrent_avg:.2f}x")
+
+    return sequential_avg, concurrent_avg
+
+
+if __name__ == "__main__":
+    benchmark_turn_latency()
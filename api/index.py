@@ -147,8 +147,8 @@ def render_roleplay_selection(main_roleplay_id, user_id):
         if main_roleplay_id == '1':
             # Get user progress for Roleplay 1 modes
             try:
-                from services.user_progress_service import UserProgressService
-                progress_service = UserProgressService()
+                from services.user_progress_service import get_user_progress_service
+                progress_service = get_user_progress_service()
                 user_progress = progress_service.get_user_roleplay_progress(user_id, ['1.1', '1.2', '1.3'])
             except Exception as e:
                 logger.warning(f"Could not load user progress: {e}")
@@ -186,8 +186,8 @@ def render_roleplay_1_selection(user_id):
         
         # --- START: FETCH PROGRESS DATA ---
         try:
-            from services.user_progress_service import UserProgressService
-            progress_service = UserProgressService()
+            from services.user_progress_service import get_user_progress_service
+            progress_service = get_user_progress_service()
             # Fetch progress for all modes of Roleplay 1
             user_progress = progress_service.get_user_roleplay_progress(user_id, ['1.1', '1.2', '1.3'])
             logger.info(f"📊 Loaded progress for 1.1, 1.2, 1.3: {user_progress}")
@@ -344,8 +344,8 @@ def render_roleplay_2_selection(user_id):
         
         # Get user progress for Roleplay 2 modes and prerequisites
         try:
-            from services.user_progress_service import UserProgressService
-            progress_service = UserProgressService()
+            from services.user_progress_service import get_user_progress_service
+            progress_service = get_user_progress_service()
             # Get progress for 2.x modes and prerequisite 1.2
             user_progress = progress_service.get_user_roleplay_progress(user_id, ['1.2', '2.1', '2.2'])
             logger.info(f"📊 Loaded progress for Roleplay 2: {user_progress}")
@@ -476,18 +476,20 @@ def get_roleplay_info_api(roleplay_id):
 def get_user_roleplay_access(user_id):
     """Get user's access status for all roleplays"""
     try:
-        from services.user_progress_service import UserProgressService
-        progress_service = UserProgressService()
+        from services.user_progress_service import get_user_progress_service
+        progress_service = get_user_progress_service()
         
-        # Get user progress
-        user_progress = progress_service.get_user_roleplay_progress(user_id)
+        # Load the user's progress rows once; progress and access are both built from them
+        user_stats = progress_service.get_user_roleplay_stats(user_id)
+        user_progress = progress_service.format_roleplay_progress(user_stats.values())
         
         # Check access for each roleplay
         access_info = {}
         roleplay_ids = ['1.1', '1.2', '1.3', '2.1', '2.2', '3', '4', '5']
+        access_checks = progress_service.evaluate_access(user_id, roleplay_ids, user_stats=user_stats)
         
         for roleplay_id in roleplay_ids:
-            access_check = progress_service.check_roleplay_access(user_id, roleplay_id)
+            access_check = access_checks[roleplay_id]
             progress_data = user_progress.get(roleplay_id, {})
             
             access_info[roleplay_id] = {
@@ -516,8 +518,8 @@ def get_user_roleplay_access(user_id):
 def check_roleplay_unlock(user_id, roleplay_id):
     """Check if a specific roleplay is unlocked for a user"""
     try:
-        from services.user_progress_service import UserProgressService
-        progress_service = UserProgressService()
+        from services.user_progress_service import get_user_progress_service
+        progress_service = get_user_progress_service()
         
         access_check = progress_service.check_roleplay_access(user_id, roleplay_id)
         
@@ -592,8 +594,8 @@ def render_specific_roleplay(roleplay_id, user_id):
         # ENHANCED: Check access for advanced roleplays
         if roleplay_id in ['2.1', '2.2', '4', '5']:
             try:
-                from services.user_progress_service import UserProgressService
-                progress_service = UserProgressService()
+                from services.user_progress_service import get_user_progress_service
+                progress_service = get_user_progress_service()
                 access_check = progress_service.check_roleplay_access(user_id, roleplay_id)
                 
                 if not access_check['allowed']:
@@ -646,6 +648,8 @@ def health_check():
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'environment': os.getenv('VERCEL_ENV', 'development'),
+        'services': get_services_status(),
+        'profile_cache': get_profile_cache().get_stats(),
         'roleplay_structure': {
             'main_categories': list(ROLEPLAY_STRUCTURE.keys()),
             'available_specific_ids': ['1.1', '1.2', '1.3', '2.1', '2.2', '3', '4', '5'],
@@ -734,6 +738,27 @@ except ImportError as e:
     def api_error(path):
         return {'error': 'API not properly configured'}, 500
 
+# ===== SERVICE WARM-UP =====
+# Route modules build their services on first use, so pages never wait for the
+# Supabase/OpenAI/ElevenLabs clients. Long-running servers can build them at
+# start-up instead (WARM_UP_SERVICES=true); serverless deployments can ping
+# /api/warmup after a deploy.
+from services.lazy_services import warm_up, warm_up_in_background, get_services_status
+from services.profile_cache import get_profile_cache
+
+if os.getenv('WARM_UP_SERVICES', 'false').lower() == 'true':
+    warm_up_in_background()
+
+@app.route('/api/warmup', methods=['GET', 'POST'])
+def warmup_services():
+    """Build the API services now instead of on the first API request"""
+    try:
+        requested = request.args.get('services')
+        results = warm_up(requested.split(',') if requested else None)
+        return jsonify({'warmed_up': results, 'services': get_services_status()})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 # Log successful startup
 logger.info("Flask application created successfully for Vercel deployment")
 logger.info(f"Available roleplay routes: {list(ROLEPLAY_STRUCTURE.keys())}")
@@ -1 +1,443 @@
 
+-- ===== ROLEPLAY SESSION TURN LOG =====
+-- Append-only per-session events written by services/session_log.py.
+-- kind = 'snapshot' (full session) | 'delta' (new messages + changed fields).
+-- Older events are deleted when a new snapshot is written (compaction).
+CREATE TABLE IF NOT EXISTS roleplay_session_events (
+    id BIGSERIAL PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    user_id UUID NOT NULL,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('snapshot', 'delta')),
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (session_id, seq)
+);
+
+CREATE INDEX IF NOT EXISTS idx_roleplay_session_events_user ON roleplay_session_events (user_id, session_id);
+
+-- ===== ADMIN STATS AGGREGATION =====
+-- Read by services/admin_stats_service.py for GET /api/admin/stats.
+-- admin_stats_live() aggregates in one pass per table; admin_stats_snapshot
+-- holds its last result so the dashboard reads a single row.
+CREATE INDEX IF NOT EXISTS idx_user_profiles_created_at ON user_profiles (created_at);
+CREATE INDEX IF NOT EXISTS idx_voice_sessions_created_at ON voice_sessions (created_at);
+
+CREATE OR REPLACE FUNCTION admin_stats_live()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH users AS (
+        SELECT
+            COUNT(*) AS total_users,
+            COUNT(*) FILTER (WHERE access_level = 'limited_trial') AS trial_users,
+            COUNT(*) FILTER (WHERE access_level = 'unlimited_basic') AS basic_users,
+            COUNT(*) FILTER (WHERE access_level = 'unlimited_pro') AS pro_users,
+            COUNT(*) FILTER (WHERE access_level = 'admin') AS admin_users,
+            COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS new_users_this_week,
+            COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '30 days') AS new_users_this_month
+        FROM user_profiles
+    ),
+    sessions AS (
+        SELECT
+            COUNT(*) AS total_sessions,
+            COUNT(*) FILTER (WHERE success) AS successful_sessions,
+            COALESCE(SUM(duration_minutes), 0) AS total_minutes,
+            COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS sessions_this_week,
+            COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '30 days') AS sessions_this_month
+        FROM voice_sessions
+    ),
+    days AS (
+        SELECT generate_series(
+            (NOW() AT TIME ZONE 'UTC')::date - 29,
+            (NOW() AT TIME ZONE 'UTC')::date,
+            INTERVAL '1 day'
+        )::date AS day
+    ),
+    daily_users AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, COUNT(*) AS new_users
+        FROM user_profiles
+        WHERE created_at >= (NOW() AT TIME ZONE 'UTC')::date - 29
+        GROUP BY 1
+    ),
+    daily_sessions AS (
+        SELECT
+            (created_at AT TIME ZONE 'UTC')::date AS day,
+            COUNT(*) AS sessions,
+            COUNT(*) FILTER (WHERE success) AS successful_sessions,
+            COALESCE(SUM(duration_minutes), 0) AS minutes
+        FROM voice_sessions
+        WHERE created_at >= (NOW() AT TIME ZONE 'UTC')::date - 29
+        GROUP BY 1
+    ),
+    daily AS (
+        SELECT jsonb_agg(jsonb_build_object(
+            'day', days.day,
+            'new_users', COALESCE(daily_users.new_users, 0),
+            'sessions', COALESCE(daily_sessions.sessions, 0),
+            'successful_sessions', COALESCE(daily_sessions.successful_sessions, 0),
+            'minutes', COALESCE(daily_sessions.minutes, 0)
+        ) ORDER BY days.day) AS buckets
+        FROM days
+        LEFT JOIN daily_users USING (day)
+        LEFT JOIN daily_sessions USING (day)
+    )
+    SELECT jsonb_build_object(
+        'total_users', users.total_users,
+        'trial_users', users.trial_users,
+        'basic_users', users.basic_users,
+        'pro_users', users.pro_users,
+        'admin_users', users.admin_users,
+        'new_users_this_week', users.new_users_this_week,
+        'new_users_this_month', users.new_users_this_month,
+        'total_sessions', sessions.total_sessions,
+        'successful_sessions', sessions.successful_sessions,
+        'total_minutes', sessions.total_minutes,
+        'sessions_this_week', sessions.sessions_this_week,
+        'sessions_this_month', sessions.sessions_this_month,
+        'success_rate', COALESCE(ROUND(sessions.successful_sessions * 100.0 / NULLIF(sessions.total_sessions, 0), 1), 0),
+        'daily_activity', COALESCE(daily.buckets, '[]'::jsonb)
+    )
+    FROM users, sessions, daily;
+$$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS admin_stats_snapshot AS
+    SELECT 1 AS id, admin_stats_live() AS stats, NOW() AS refreshed_at;
+
+-- Required for REFRESH ... CONCURRENTLY (readers are never blocked)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_admin_stats_snapshot_id ON admin_stats_snapshot (id);
+
+CREATE OR REPLACE FUNCTION refresh_admin_stats_snapshot()
+RETURNS TIMESTAMPTZ
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY admin_stats_snapshot;
+    RETURN (SELECT refreshed_at FROM admin_stats_snapshot WHERE id = 1);
+END;
+$$;
+
+REVOKE ALL ON admin_stats_snapshot FROM anon, authenticated;
+REVOKE EXECUTE ON FUNCTION admin_stats_live() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION refresh_admin_stats_snapshot() FROM PUBLIC, anon, authenticated;
+
+-- The API refreshes a stale snapshot on read (ADMIN_STATS_REFRESH_INTERVAL).
+-- With pg_cron enabled the database can keep it fresh on its own instead:
+-- SELECT cron.schedule('refresh-admin-stats', '*/5 * * * *', 'SELECT refresh_admin_stats_snapshot()');
+
+-- ===== PER-USER STATS ROLLUP =====
+-- One row per user, maintained by services/user_stats_rollup.py as completions
+-- are saved, so GET /api/user/stats never scans roleplay_completions.
+-- daily_sessions only keeps the last 31 UTC days (enough for the month window).
+CREATE TABLE IF NOT EXISTS user_stats_rollup (
+    user_id UUID PRIMARY KEY,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    successful_sessions INTEGER NOT NULL DEFAULT 0,
+    total_minutes NUMERIC NOT NULL DEFAULT 0,
+    roleplay_counts JSONB NOT NULL DEFAULT '{}'::jsonb,  -- main roleplay id ('1', '2', ...) -> completions
+    daily_sessions JSONB NOT NULL DEFAULT '{}'::jsonb,   -- 'YYYY-MM-DD' -> completions
+    last_completed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_roleplay_completions_user ON roleplay_completions (user_id, completed_at DESC);
+
+-- Adds one completion. Atomic per row, so concurrent completions don't lose updates.
+CREATE OR REPLACE FUNCTION bump_user_stats_rollup(
+    p_user_id UUID,
+    p_roleplay_id TEXT,
+    p_success BOOLEAN,
+    p_duration_minutes NUMERIC,
+    p_completed_at TIMESTAMPTZ
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_main TEXT := split_part(COALESCE(p_roleplay_id, ''), '.', 1);
+    v_day TEXT := to_char((COALESCE(p_completed_at, NOW()) AT TIME ZONE 'UTC')::date, 'YYYY-MM-DD');
+    v_cutoff TEXT := to_char((NOW() AT TIME ZONE 'UTC')::date - 31, 'YYYY-MM-DD');
+BEGIN
+    INSERT INTO user_stats_rollup AS r (
+        user_id, total_sessions, successful_sessions, total_minutes,
+        roleplay_counts, daily_sessions, last_completed_at
+    )
+    VALUES (
+        p_user_id, 1, CASE WHEN p_success THEN 1 ELSE 0 END, COALESCE(p_duration_minutes, 0),
+        CASE WHEN v_main = '' THEN '{}'::jsonb ELSE jsonb_build_object(v_main, 1) END,
+        jsonb_build_object(v_day, 1), p_completed_at
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_sessions = r.total_sessions + 1,
+        successful_sessions = r.successful_sessions + EXCLUDED.successful_sessions,
+        total_minutes = r.total_minutes + EXCLUDED.total_minutes,
+        roleplay_counts = CASE WHEN v_main = '' THEN r.roleplay_counts
+            ELSE r.roleplay_counts || jsonb_build_object(v_main, COALESCE((r.roleplay_counts->>v_main)::INTEGER, 0) + 1)
+        END,
+        daily_sessions = (
+            SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+            FROM jsonb_each(r.daily_sessions)
+            WHERE key >= v_cutoff AND key <> v_day
+        ) || jsonb_build_object(v_day, COALESCE((r.daily_sessions->>v_day)::INTEGER, 0) + 1),
+        last_completed_at = GREATEST(r.last_completed_at, EXCLUDED.last_completed_at),
+        updated_at = NOW();
+END;
+$$;
+
+-- Recomputes a user's row from roleplay_completions (backfill for users
+-- whose history predates the rollup). Always leaves a row behind.
+CREATE OR REPLACE FUNCTION rebuild_user_stats_rollup(p_user_id UUID)
+RETURNS SETOF user_stats_rollup
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH completions AS (
+        SELECT
+            split_part(roleplay_id::TEXT, '.', 1) AS main_id,
+            (completed_at AT TIME ZONE 'UTC')::date AS day,
+            success,
+            duration_minutes,
+            completed_at
+        FROM roleplay_completions
+        WHERE user_id = p_user_id
+    ),
+    totals AS (
+        SELECT
+            COUNT(*) AS total_sessions,
+            COUNT(*) FILTER (WHERE success IS TRUE) AS successful_sessions,
+            COALESCE(SUM(duration_minutes), 0) AS total_minutes,
+            MAX(completed_at) AS last_completed_at
+        FROM completions
+    ),
+    by_roleplay AS (
+        SELECT COALESCE(jsonb_object_agg(main_id, n), '{}'::jsonb) AS counts
+        FROM (SELECT main_id, COUNT(*) AS n FROM completions WHERE main_id <> '' GROUP BY main_id) g
+    ),
+    by_day AS (
+        SELECT COALESCE(jsonb_object_agg(to_char(day, 'YYYY-MM-DD'), n), '{}'::jsonb) AS counts
+        FROM (
+            SELECT day, COUNT(*) AS n FROM completions
+            WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - 31
+            GROUP BY day
+        ) g
+    )
+    INSERT INTO user_stats_rollup (
+        user_id, total_sessions, successful_sessions, total_minutes,
+        roleplay_counts, daily_sessions, last_completed_at, updated_at
+    )
+    SELECT p_user_id, totals.total_sessions, totals.successful_sessions, totals.total_minutes,
+           by_roleplay.counts, by_day.counts, totals.last_completed_at, NOW()
+    FROM totals, by_roleplay, by_day
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_sessions = EXCLUDED.total_sessions,
+        successful_sessions = EXCLUDED.successful_sessions,
+        total_minutes = EXCLUDED.total_minutes,
+        roleplay_counts = EXCLUDED.roleplay_counts,
+        daily_sessions = EXCLUDED.daily_sessions,
+        last_completed_at = EXCLUDED.last_completed_at,
+        updated_at = NOW()
+    RETURNING *;
+$$;
+
+REVOKE EXECUTE ON FUNCTION bump_user_stats_rollup(UUID, TEXT, BOOLEAN, NUMERIC, TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_user_stats_rollup(UUID) FROM PUBLIC, anon, authenticated;
+
+-- ===== ROLEPLAY LEADERBOARD =====
+-- Read by services/leaderboard_service.py. One query returns the top p_limit
+-- rows plus the requesting user's row, each with its RANK() and the number of
+-- participants, so the API never issues a separate count.
+CREATE INDEX IF NOT EXISTS idx_user_roleplay_progress_leaderboard
+    ON user_roleplay_progress (roleplay_id, best_score DESC);
+
+CREATE OR REPLACE FUNCTION get_roleplay_leaderboard(
+    p_roleplay_id TEXT,
+    p_limit INTEGER DEFAULT 10,
+    p_user_id UUID DEFAULT NULL
+)
+RETURNS TABLE (progress JSONB, rank BIGINT, total_participants BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH ranked AS (
+        SELECT
+            to_jsonb(p) AS progress,
+            p.user_id,
+            RANK() OVER (ORDER BY p.best_score DESC) AS rank,
+            ROW_NUMBER() OVER (ORDER BY p.best_score DESC, p.last_attempt_at ASC NULLS LAST, p.user_id) AS position,
+            COUNT(*) OVER () AS total_participants
+        FROM user_roleplay_progress p
+        WHERE p.roleplay_id = p_roleplay_id AND p.best_score > 0
+    )
+    SELECT progress, rank, total_participants
+    FROM ranked
+    WHERE position <= p_limit OR user_id = p_user_id
+    ORDER BY position;
+$$;
+
+REVOKE EXECUTE ON FUNCTION get_roleplay_leaderboard(TEXT, INTEGER, UUID) FROM PUBLIC, anon, authenticated;
+
+-- ===== ROLEPLAY UNLOCK UPSERTS =====
+-- UserProgressService writes unlocks as one upsert on (user_id, roleplay_id).
+-- Remove duplicate (user_id, roleplay_id) rows before creating this if any exist.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_roleplay_progress_user_roleplay
+    ON user_roleplay_progress (user_id, roleplay_id);
+
+-- ===== TRANSACTIONAL COMPLETION WRITE =====
+-- Everything RoleplayEngine.end_session writes for a completed session, in one
+-- call and one transaction (services/user_progress_service.record_completion):
+--   completion row, stats rollup, user_roleplay_progress stats, Marathon Pass
+--   profile rewards, unlocks of the roleplays that list this one as their
+--   prerequisite, and usage minutes.
+-- p_pass_rule says what passing this roleplay means (see
+-- services/progression_graph.PASS_REQUIREMENTS); p_unlock_ids are the
+-- roleplays it unlocks once passed.
+CREATE OR REPLACE FUNCTION record_roleplay_completion(
+    p_completion JSONB,
+    p_pass_rule TEXT DEFAULT 'completed',
+    p_unlock_ids TEXT[] DEFAULT '{}'
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user_id UUID := (p_completion->>'user_id')::UUID;
+    v_roleplay_id TEXT := p_completion->>'roleplay_id';
+    v_score NUMERIC := COALESCE((p_completion->>'score')::NUMERIC, 0);
+    v_duration INTEGER := COALESCE((p_completion->>'duration_minutes')::NUMERIC, 0)::INTEGER;
+    v_marathon JSONB := CASE WHEN jsonb_typeof(p_completion->'marathon_results') = 'object'
+                             AND p_completion->'marathon_results' <> '{}'::JSONB
+                        THEN p_completion->'marathon_results' END;
+    v_advanced JSONB := CASE WHEN jsonb_typeof(p_completion->'advanced_results') = 'object'
+                             AND p_completion->'advanced_results' <> '{}'::JSONB
+                        THEN p_completion->'advanced_results' END;
+    v_now TIMESTAMPTZ := NOW();
+    v_completion_id roleplay_completions.id%TYPE;
+    v_previous_best NUMERIC;
+    v_progress user_roleplay_progress%ROWTYPE;
+    v_passed BOOLEAN;
+    v_profile_updated BOOLEAN := FALSE;
+    v_unlocked TEXT[] := '{}';
+BEGIN
+    -- 1. The completion itself
+    INSERT INTO roleplay_completions (
+        user_id, session_id, roleplay_id, mode, score, success, duration_minutes,
+        started_at, completed_at, conversation_data, coaching_feedback, rubric_scores,
+        forced_end, marathon_results, advanced_results
+    )
+    SELECT
+        r.user_id, r.session_id, r.roleplay_id, r.mode, r.score, r.success, r.duration_minutes,
+        r.started_at, r.completed_at, r.conversation_data, r.coaching_feedback, r.rubric_scores,
+        r.forced_end, r.marathon_results, r.advanced_results
+    FROM jsonb_populate_record(NULL::roleplay_completions, p_completion) r
+    RETURNING id INTO v_completion_id;
+
+    PERFORM bump_user_stats_rollup(
+        v_user_id, v_roleplay_id, (p_completion->>'success')::BOOLEAN IS TRUE,
+        COALESCE((p_completion->>'duration_minutes')::NUMERIC, 0),
+        COALESCE((p_completion->>'completed_at')::TIMESTAMPTZ, v_now)
+    );
+
+    -- 2. Progress stats for this roleplay. A user's first completion inserts the
+    -- row; ON CONFLICT lets a concurrent first completion fall through to the
+    -- locked update below instead of failing on the unique index.
+    INSERT INTO user_roleplay_progress (
+        user_id, roleplay_id, last_score, last_attempt_at, total_attempts, best_score, completed,
+        marathon_passed, marathon_best_run, advanced_completed, stages_completed
+    )
+    VALUES (
+        v_user_id, v_roleplay_id, v_score, v_now, 1, v_score, v_score >= 70,
+        (v_marathon->>'marathon_passed')::BOOLEAN,
+        CASE WHEN v_marathon IS NULL THEN NULL ELSE COALESCE((v_marathon->>'calls_passed')::INTEGER, 0) END,
+        CASE WHEN v_advanced IS NULL THEN NULL
+            ELSE COALESCE((v_advanced->>'company_fit_qualified')::BOOLEAN, FALSE)
+                 AND COALESCE((v_advanced->>'meeting_asked')::BOOLEAN, FALSE) END,
+        CASE WHEN v_advanced IS NULL THEN NULL ELSE COALESCE((v_advanced->>'stages_completed')::INTEGER, 0) END
+    )
+    ON CONFLICT (user_id, roleplay_id) DO NOTHING
+    RETURNING * INTO v_progress;
+
+    IF NOT FOUND THEN
+        SELECT best_score INTO v_previous_best
+        FROM user_roleplay_progress
+        WHERE user_id = v_user_id AND roleplay_id = v_roleplay_id
+        FOR UPDATE;
+
+        UPDATE user_roleplay_progress SET
+            last_score = v_score,
+            last_attempt_at = v_now,
+            total_attempts = COALESCE(total_attempts, 0) + 1,
+            best_score = GREATEST(COALESCE(best_score, 0), v_score),
+            completed = COALESCE(completed, FALSE) OR v_score >= 70,
+            marathon_passed = CASE WHEN v_marathon IS NULL THEN marathon_passed
+                ELSE COALESCE(marathon_passed, FALSE) OR COALESCE((v_marathon->>'marathon_passed')::BOOLEAN, FALSE) END,
+            marathon_best_run = CASE WHEN v_marathon IS NULL THEN marathon_best_run
+                ELSE GREATEST(COALESCE(marathon_best_run, 0), COALESCE((v_marathon->>'calls_passed')::INTEGER, 0)) END,
+            advanced_completed = CASE WHEN v_advanced IS NULL THEN advanced_completed
+                ELSE COALESCE((v_advanced->>'company_fit_qualified')::BOOLEAN, FALSE)
+                     AND COALESCE((v_advanced->>'meeting_asked')::BOOLEAN, FALSE) END,
+            stages_completed = CASE WHEN v_advanced IS NULL THEN stages_completed
+                ELSE COALESCE((v_advanced->>'stages_completed')::INTEGER, 0) END
+        WHERE user_id = v_user_id AND roleplay_id = v_roleplay_id
+        RETURNING * INTO v_progress;
+    END IF;
+
+    -- 3. Marathon Pass rewards
+    IF v_roleplay_id = '1.2' AND COALESCE((v_marathon->>'marathon_passed')::BOOLEAN, FALSE) THEN
+        UPDATE user_profiles SET
+            legend_attempt_used = FALSE,
+            module_2_unlocked_until = v_now + INTERVAL '24 hours',
+            roleplay_2_1_unlocked = TRUE,
+            updated_at = v_now
+        WHERE id = v_user_id;
+        v_profile_updated := TRUE;
+    END IF;
+
+    -- 4. Unlocks, if this roleplay now counts as passed
+    v_passed := CASE p_pass_rule
+        WHEN 'marathon_passed' THEN COALESCE((to_jsonb(v_progress)->>'marathon_passed')::BOOLEAN, FALSE)
+        WHEN 'legend_completed' THEN COALESCE((to_jsonb(v_progress)->>'legend_completed')::BOOLEAN, FALSE)
+        WHEN 'best_score_70' THEN COALESCE(v_progress.best_score, 0) >= 70
+        ELSE COALESCE((to_jsonb(v_progress)->>'completed')::BOOLEAN, FALSE)
+    END;
+
+    IF v_passed AND COALESCE(array_length(p_unlock_ids, 1), 0) > 0 THEN
+        WITH upserted AS (
+            INSERT INTO user_roleplay_progress AS p (user_id, roleplay_id, is_unlocked, unlocked_at, unlocked_by, created_at)
+            SELECT v_user_id, unlock_id, TRUE, v_now, v_roleplay_id, v_now
+            FROM unnest(p_unlock_ids) AS unlock_id
+            ON CONFLICT (user_id, roleplay_id) DO UPDATE SET
+                is_unlocked = TRUE,
+                unlocked_at = EXCLUDED.unlocked_at,
+                unlocked_by = EXCLUDED.unlocked_by
+            WHERE p.is_unlocked IS NOT TRUE
+            RETURNING p.roleplay_id
+        )
+        SELECT COALESCE(array_agg(roleplay_id), '{}') INTO v_unlocked FROM upserted;
+    END IF;
+
+    -- 5. Usage minutes
+    PERFORM increment_usage_minutes(p_user_id => v_user_id, p_duration => v_duration);
+
+    RETURN jsonb_build_object(
+        'completion_id', v_completion_id,
+        'progress', to_jsonb(v_progress),
+        'previous_best_score', v_previous_best,
+        'unlocked', to_jsonb(v_unlocked),
+        'profile_updated', v_profile_updated
+    );
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION record_roleplay_completion(JSONB, TEXT, TEXT[]) FROM PUBLIC, anon, authenticated;
@@ -1 +1,248 @@
+# ===== API/MODELS/SESSION.PY - COMPACT ROLEPLAY SESSION STATE =====
 
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Iterable
+
+def _to_epoch(value: Any) -> Any:
+    """ISO timestamp -> epoch seconds. Anything unparseable is kept as is"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return value
+    return value
+
+def _to_iso(value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+    return value
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+def to_json_compatible(value: Any) -> Any:
+    """Deep-convert sessions and turns (wherever they are nested) to plain dicts and lists"""
+    if isinstance(value, (RoleplaySession, Turn)):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    return value
+
+# JSON has no sets: {SET_TAG: [...]} stands in for one until from_json_compatible() restores it
+SET_TAG = '__set__'
+
+def _sorted_items(value: Iterable) -> list:
+    try:
+        return sorted(value)
+    except TypeError:
+        return sorted(value, key=repr)
+
+def json_default(value: Any) -> Any:
+    """default= hook for json.dumps over session data"""
+    if isinstance(value, (RoleplaySession, Turn)):
+        return value.to_dict()
+    if isinstance(value, (set, frozenset)):
+        # Sorted so equal sets always encode (and digest) the same
+        return {SET_TAG: _sorted_items(value)}
+    return str(value)
+
+def from_json_compatible(value: Any) -> Any:
+    """Undo json_default's set encoding, wherever it is nested"""
+    if isinstance(value, dict):
+        if len(value) == 1 and SET_TAG in value and isinstance(value[SET_TAG], list):
+            return set(value[SET_TAG])
+        return {key: from_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_json_compatible(item) for item in value]
+    return value
+
+# ===== TURN =====
+
+TURN_FIELDS = ('role', 'content', 'timestamp', 'stage', 'evaluation', 'call_number', 'turn_number')
+_TURN_FIELD_SET = frozenset(TURN_FIELDS)
+
+class Turn(MutableMapping):
+    """
+    One conversation message. Behaves like the message dicts the roleplay
+    implementations build (msg['role'], msg.get('evaluation')), but holds
+    the common keys in slots: the timestamp as epoch seconds and role/stage
+    as interned strings. Any other key goes into a small overflow dict.
+    Reading 'timestamp' returns the ISO string, as before.
+    """
+
+    __slots__ = TURN_FIELDS + ('extra',)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields):
+        self.extra = None
+        for source in (data or {}, fields):
+            for key, value in source.items():
+                self[key] = value
+
+    @classmethod
+    def coerce(cls, value: Any) -> 'Turn':
+        return value if isinstance(value, Turn) else cls(value)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _TURN_FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return _to_iso(value) if key == 'timestamp' else value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _TURN_FIELD_SET:
+            if key == 'timestamp':
+                value = _to_epoch(value)
+            elif key in ('role', 'stage'):
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _TURN_FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra is not None:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for key in TURN_FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: to_json_compatible(self[key]) for key in self}
+
+    def __repr__(self) -> str:
+        return f"Turn({dict(self.items())!r})"
+
+class TurnList(list):
+    """conversation_history: a list that stores every appended message as a Turn"""
+
+    __slots__ = ()
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(Turn.coerce(item) for item in items)
+
+    def append(self, item: Any) -> None:
+        super().append(Turn.coerce(item))
+
+    def insert(self, index: int, item: Any) -> None:
+        super().insert(index, Turn.coerce(item))
+
+    def extend(self, items: Iterable) -> None:
+        super().extend(Turn.coerce(item) for item in items)
+
+    def __iadd__(self, items: Iterable) -> 'TurnList':
+        self.extend(items)
+        return self
+
+# ===== SESSION =====
+
+SESSION_FIELDS = (
+    'session_id', 'user_id', 'roleplay_id', 'mode', 'started_at', 'ended_at',
+    'last_activity_at', 'user_context', 'session_active', 'current_stage',
+    'turn_count', 'stage_turn_count', 'rubric_scores', 'conversation_history'
+)
+_SESSION_FIELD_SET = frozenset(SESSION_FIELDS)
+_TIMESTAMP_FIELDS = frozenset(('started_at', 'ended_at'))
+_INTERNED_FIELDS = frozenset(('roleplay_id', 'mode', 'current_stage'))
+
+class RoleplaySession(MutableMapping):
+    """
+    Roleplay session state. The roleplay implementations still index it
+    like the dict it replaces (session['current_stage'] = ...), so it is a
+    drop-in for their code; the keys every roleplay shares live in slots
+    and implementation-specific state (marathon/power hour counters and
+    the like) in the extra dict.
+
+    started_at/ended_at are kept as epoch seconds and read back as ISO
+    strings; conversation_history is a TurnList. to_dict()/from_dict()
+    give the JSON form, which has the same layout as the old dict; set
+    values (used_objections and the like) are written through json_default
+    as {SET_TAG: [...]} and come back from from_dict() as sets.
+    """
+
+    __slots__ = SESSION_FIELDS + ('extra',)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        self.extra = {}
+        self.conversation_history = TurnList()
+        for key, value in (data or {}).items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RoleplaySession':
+        """From a plain dict, including one decoded from JSON (tagged sets become sets again)"""
+        return cls({key: from_json_compatible(value) for key, value in (data or {}).items()})
+
+    @classmethod
+    def coerce(cls, value: Any) -> 'RoleplaySession':
+        return value if isinstance(value, RoleplaySession) else cls.from_dict(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: to_json_compatible(self[key]) for key in self}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SESSION_FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return _to_iso(value) if key in _TIMESTAMP_FIELDS else value
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _SESSION_FIELD_SET:
+            if key == 'conversation_history':
+                value = value if isinstance(value, TurnList) else TurnList(value or [])
+            elif key in _TIMESTAMP_FIELDS:
+                value = _to_epoch(value)
+            elif key in _INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _SESSION_FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            del self.extra[key]
+
+    def __iter__(self):
+        for key in SESSION_FIELDS:
+            if hasattr(self, key):
+                yield key
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return (f"RoleplaySession(session_id={getattr(self, 'session_id', None)!r}, "
+                f"stage={getattr(self, 'current_stage', None)!r}, "
+                f"turns={len(self.conversation_history)})")
@@ -0,0 +1,187 @@
+# ===== prerender_audio_pack.py =====
+# Batch-render every canned prospect line for every voice into an audio pack.
+# Run from the api/ directory:
+#   python prerender_audio_pack.py [--out DIR] [--workers N] [--voices a,b] [--dry-run]
+# Interrupted runs resume: clips already rendered into DIR/parts are reused.
+# Serve the result by pointing TTS_AUDIO_PACK_DIR at DIR.
+# Roleplay 3 (warm-up challenge) has no config here: every line it speaks is
+# numbered ("Question 7/25: ..."), so its 88 questions would take ~2,200 clips
+# per voice to cover, and the question number changes the cache key anyway.
+
+import os
+import sys
+import ast
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import constants
+from services.elevenlabs_service import ElevenLabsService
+from services.audio_pack import write_audio_pack
+from services.roleplay.configs.roleplay_1_1_config import Roleplay11Config
+from services.roleplay.configs.roleplay_1_2_config import Roleplay12Config
+from services.roleplay.configs.roleplay_2_1_config import Roleplay21Config
+from services.roleplay.configs.roleplay_4_config import Roleplay4Config
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONSTANT_LISTS = ['EARLY_OBJECTIONS', 'POST_PITCH_OBJECTIONS', 'IMPATIENCE_PHRASES', 'PITCH_PROMPTS', 'WARMUP_QUESTIONS']
+
+CONFIG_CLASSES = [Roleplay11Config, Roleplay12Config, Roleplay21Config, Roleplay4Config]
+
+# Fallback lines are inline literals, so they are read from source rather than imported
+FALLBACK_METHODS = {
+    'services/roleplay/roleplay_1_1.py': ['_get_enhanced_fallback_response'],
+    'services/roleplay/roleplay_1_2.py': ['_get_marathon_fallback_response'],
+    'services/roleplay/roleplay_5.py': [
+        '_get_power_hour_initial_response',
+        '_get_power_hour_fallback_response',
+        '_handle_silence_trigger'
+    ],
+}
+
+def _config_lines(config) -> list:
+    """Spoken prospect lines from a roleplay config class"""
+    lines = []
+
+    for attr in ('PITCH_PROMPTS', 'POST_PITCH_OBJECTIONS'):
+        lines.extend(getattr(config, attr, []))
+
+    behavior = getattr(config, 'PROSPECT_BEHAVIOR', {})
+    for responses in behavior.get('response_patterns', {}).values():
+        lines.extend(responses)
+
+    lines.extend(getattr(config, 'SILENCE_RESPONSES', {}).get('impatience', []))
+
+    for personality in getattr(config, 'PROSPECT_PERSONALITIES', {}).values():
+        for responses in personality.get('typical_responses', {}).values():
+            lines.extend(responses)
+
+    return lines
+
+def _fallback_lines(relative_path: str, method_names: list) -> list:
+    """String literals inside list/dict literals of the given methods"""
+    with open(os.path.join(API_DIR, relative_path), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    lines = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name in method_names:
+            for child in ast.walk(node):
+                if isinstance(child, ast.List):
+                    lines.extend(
+                        element.value for element in child.elts
+                        if isinstance(element, ast.Constant) and isinstance(element.value, str)
+                    )
+    return lines
+
+def collect_prospect_lines() -> list:
+    """Every static prospect utterance, de-duplicated, in a stable order"""
+    lines = []
+
+    for name in CONSTANT_LISTS:
+        lines.extend(getattr(constants, name, []))
+
+    for config in CONFIG_CLASSES:
+        lines.extend(_config_lines(config))
+
+    for relative_path, method_names in FALLBACK_METHODS.items():
+        lines.extend(_fallback_lines(relative_path, method_names))
+
+    # Whitespace is normalized in the cache key (tts_cache.make_cache_key), not here
+    seen = set()
+    unique_lines = []
+    for line in lines:
+        line = str(line).strip()
+        if line and line not in seen:
+            seen.add(line)
+            unique_lines.append(line)
+    return unique_lines
+
+def _part_path(parts_dir: str, key: str) -> str:
+    return os.path.join(parts_dir, f"{key}.mp3")
+
+def _render_job(service: ElevenLabsService, parts_dir: str, job: dict) -> bool:
+    audio = service.render_line(job['text'], job['voice_settings'])
+    if not audio:
+        return False
+
+    # Write-then-rename: an interrupted write never looks like a finished clip
+    fd, tmp_path = tempfile.mkstemp(dir=parts_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(audio)
+    os.replace(tmp_path, _part_path(parts_dir, job['key']))
+    return True
+
+def prerender_audio_pack(out_dir: str, workers: int = 4, voices: list = None, dry_run: bool = False) -> bool:
+    print("🎙️  Pre-rendering prospect line audio pack")
+    print("=" * 60)
+
+    service = ElevenLabsService()
+    voice_names = voices or list(service.voice_configs.keys())
+    lines = collect_prospect_lines()
+
+    jobs = {}
+    for voice_name in voice_names:
+        voice_settings = service.voice_configs[voice_name]
+        for text in lines:
+            key = service.cache_key_for(text, voice_settings)
+            # Voices with identical settings share clips
+            jobs.setdefault(key, {'key': key, 'text': text, 'voice': voice_name, 'voice_settings': voice_settings})
+
+    parts_dir = os.path.join(out_dir, 'parts')
+    os.makedirs(parts_dir, exist_ok=True)
+    pending = [job for job in jobs.values() if not os.path.exists(_part_path(parts_dir, job['key']))]
+
+    print(f"Lines: {len(lines)}  Voices: {len(voice_names)}  Clips: {len(jobs)}")
+    print(f"Already rendered: {len(jobs) - len(pending)}  To render: {len(pending)}")
+
+    if dry_run:
+        return True
+
+    if pending and not service.is_available():
+        print("❌ ElevenLabs API key not configured")
+        return False
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prerender') as executor:
+        futures = {executor.submit(_render_job, service, parts_dir, job): job for job in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"⚠️ {job['voice']}: '{job['text'][:40]}' failed: {e}")
+                ok = False
+            if not ok:
+                failed += 1
+            if done % 25 == 0 or done == len(pending):
+                print(f"   {done}/{len(pending)} rendered ({failed} failed)")
+
+    def rendered_clips():
+        for job in jobs.values():
+            path = _part_path(parts_dir, job['key'])
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    yield job['key'], f.read(), {'text': job['text'], 'voice': job['voice']}
+
+    count = write_audio_pack(out_dir, rendered_clips(), service.model_id)
+    print(f"\n📦 Wrote {count} clips to {out_dir}")
+
+    if failed:
+        print(f"⚠️ {failed} clips failed - re-run to resume")
+        return False
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render canned prospect lines into an audio pack")
+    parser.add_argument('--out', default=os.getenv('TTS_AUDIO_PACK_DIR', 'audio_pack'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('PRERENDER_WORKERS', '4')))
+    parser.add_argument('--voices', help="Comma-separated voice_configs names (default: all)")
+    parser.add_argument('--dry-run', action='store_true', help="Only count lines and clips")
+    args = parser.parse_args()
+
+    selected_voices = [v.strip() for v in args.voices.split(',')] if args.voices else None
+    success = prerender_audio_pack(args.out, max(1, args.workers), selected_voices, args.dry_run)
+    sys.exit(0 if success else 1)
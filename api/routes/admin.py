@@ -2,15 +2,15 @@
 # Fix: Removed the redundant and error-prone `user_id = request.view_args['user_id']` line.
 
 from flask import Blueprint, request, jsonify, session
-from services.supabase_client import SupabaseService
+from services.lazy_services import supabase_service
+from services.admin_decision_cache import get_admin_decision_cache
+from services.admin_stats_service import get_admin_stats_service
 import logging
 from utils.helpers import require_admin
-from datetime import datetime, timezone, timedelta
 
 logger = logging.getLogger(__name__)
 admin_bp = Blueprint('admin', __name__)
 
-supabase_service = SupabaseService()
 
 @admin_bp.route('/users', methods=['GET'])
 @require_admin
@@ -83,6 +83,7 @@ def update_user_access_level(user_id):
         
         # Use service client to update admin users
         if supabase_service.update_user_profile_by_service(user_id, {'access_level': new_access_level}):
+            get_admin_decision_cache().invalidate(user_id)
             logger.info(f"Updated access level for user {user_id} to {new_access_level}")
             return jsonify({'message': 'Access level updated successfully'})
         else:
@@ -95,94 +96,13 @@ def update_user_access_level(user_id):
 @admin_bp.route('/stats', methods=['GET'])
 @require_admin
 def get_admin_stats():
-    """Get overall platform statistics"""
+    """Get overall platform statistics (from the periodically refreshed SQL snapshot)"""
     try:
-        # Use service client to bypass RLS
-        service_client = supabase_service.get_service_client()
-        
-        # Get user stats
-        users_response = service_client.table('user_profiles')\
-            .select('access_level,created_at')\
-            .execute()
-        
-        users = users_response.data or []
-        
-        # Get session stats
-        sessions_response = service_client.table('voice_sessions')\
-            .select('duration_minutes,success,created_at')\
-            .execute()
-        
-        sessions = sessions_response.data or []
-        
-        # Calculate stats - USE TIMEZONE-AWARE DATETIME
-        now = datetime.now(timezone.utc)  # This is timezone-aware
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        stats = {
-            'total_users': len(users),
-            'trial_users': sum(1 for u in users if u['access_level'] == 'limited_trial'),
-            'basic_users': sum(1 for u in users if u['access_level'] == 'unlimited_basic'),
-            'pro_users': sum(1 for u in users if u['access_level'] == 'unlimited_pro'),
-            'admin_users': sum(1 for u in users if u['access_level'] == 'admin'),
-            'new_users_this_week': 0,
-            'new_users_this_month': 0,
-            'total_sessions': len(sessions),
-            'successful_sessions': sum(1 for s in sessions if s.get('success')),
-            'total_minutes': sum(s.get('duration_minutes', 0) for s in sessions if s.get('duration_minutes')),
-            'sessions_this_week': 0,
-            'sessions_this_month': 0
-        }
-        
-        # Helper function to parse datetime strings consistently
-        def parse_datetime_string(date_string):
-            """Parse datetime string to timezone-aware datetime"""
-            if not date_string:
-                return None
-            try:
-                # Handle different datetime formats from Supabase
-                if date_string.endswith('Z'):
-                    # Convert 'Z' to '+00:00'
-                    return datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-                elif '+' in date_string and date_string.count('+') == 1:
-                    # Already has timezone info
-                    return datetime.fromisoformat(date_string)
-                elif 'T' in date_string:
-                    # No timezone info, assume UTC
-                    return datetime.fromisoformat(date_string + '+00:00')
-                else:
-                    # Legacy format without timezone
-                    dt = datetime.strptime(date_string, '%Y-%m-%d %H:%M:%S')
-                    return dt.replace(tzinfo=timezone.utc)
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Could not parse datetime '{date_string}': {e}")
-                return None
-        
-        # Calculate time-based stats for users
-        for user in users:
-            user_date = parse_datetime_string(user.get('created_at'))
-            if user_date:
-                if user_date >= week_ago:
-                    stats['new_users_this_week'] += 1
-                if user_date >= month_ago:
-                    stats['new_users_this_month'] += 1
-        
-        # Calculate time-based stats for sessions
-        for session in sessions:
-            session_date = parse_datetime_string(session.get('created_at'))
-            if session_date:
-                if session_date >= week_ago:
-                    stats['sessions_this_week'] += 1
-                if session_date >= month_ago:
-                    stats['sessions_this_month'] += 1
-        
-        # Calculate success rate
-        if stats['total_sessions'] > 0:
-            stats['success_rate'] = round((stats['successful_sessions'] / stats['total_sessions']) * 100, 1)
-        else:
-            stats['success_rate'] = 0
+        # ?refresh=true rebuilds the snapshot before answering
+        force_refresh = request.args.get('refresh', '').lower() == 'true'
+        stats = get_admin_stats_service().get_stats(force_refresh=force_refresh)
         
-        logger.info(f"Admin stats calculated successfully: {stats}")
+        logger.info(f"Admin stats served (snapshot {stats.get('snapshot_refreshed_at')})")
         return jsonify(stats)
         
     except Exception as e:
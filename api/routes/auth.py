@@ -1,7 +1,6 @@
 # ===== IMPROVED API/ROUTES/AUTH.PY =====
 from flask import Blueprint, request, jsonify, session
-from services.supabase_client import SupabaseService
-from services.resend_service import ResendService
+from services.lazy_services import supabase_service, resend_service
 from utils.constants import JOB_TITLES, INDUSTRIES
 import logging
 import json
@@ -10,8 +9,6 @@ import re
 logger = logging.getLogger(__name__)
 auth_bp = Blueprint('auth', __name__)
 
-supabase_service = SupabaseService()
-resend_service = ResendService()
 
 def validate_email(email):
     """Validate email format"""
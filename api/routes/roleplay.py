@@ -1,21 +1,21 @@
 # ===== FIXED: api/routes/roleplay.py - Session Management =====
 
-from flask import Blueprint, request, jsonify, session, Response, redirect, render_template, url_for
+from flask import Blueprint, request, jsonify, session, Response, redirect, render_template, url_for, stream_with_context
+import json
 import logging
+import queue
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
-# Import services with error handling
-try:
-    from services.supabase_client import SupabaseService
-    from services.elevenlabs_service import ElevenLabsService  
-    from services.roleplay_engine import RoleplayEngine
-    from services.user_progress_service import UserProgressService 
-except ImportError as e:
-    logger.error(f"Service import error: {e}")
+# Services are built on first use, not at import (see services/lazy_services.py)
+from services.lazy_services import (
+    supabase_service, elevenlabs_service, roleplay_engine, progress_service, activity_buffer
+)
+from services.profile_cache import get_profile_cache
 
 # Import utilities with error handling  
 try:
@@ -28,65 +28,18 @@ except ImportError as e:
 # Create blueprint
 roleplay_bp = Blueprint('roleplay', __name__, url_prefix='/api/roleplay')
 
-# Initialize services
-try:
-    supabase_service = SupabaseService()
-    elevenlabs_service = ElevenLabsService()
-    roleplay_engine = RoleplayEngine()
-    progress_service = UserProgressService()
-    logger.info("✅ Roleplay services initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Error initializing services: {e}")
-    supabase_service = None
-    elevenlabs_service = None
-    roleplay_engine = None
-    progress_service = None
-
 # ===== ENHANCED SESSION STORAGE =====
-session_storage = {}  # In-memory backup
+# Live session state is held by roleplay_engine.session_store (shared between
+# workers when SESSION_STORE_BACKEND=sqlite). The engine also appends each
+# turn's changes to a durable turn log, used only when the store no longer
+# has the session. active_roleplay_sessions keeps one small row per session.
 DATABASE_SESSION_STORAGE = True
 
 def store_session_reliably(session_id: str, user_id: str, session_data: Dict) -> bool:
-    """Enhanced session storage with multiple fallbacks"""
+    """Remember the session in the Flask cookie and register it in the database"""
     try:
-        # Store in Flask session
-        session['current_roleplay_session'] = session_id
-        session['roleplay_user_id'] = user_id
-        session['session_data'] = {
-            'session_id': session_id,
-            'user_id': user_id,
-            'roleplay_id': session_data.get('roleplay_id'),
-            'started_at': session_data.get('started_at'),
-            'current_stage': session_data.get('current_stage', 'phone_pickup'),
-            'last_activity': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Store in memory backup (CRITICAL for marathon mode)
-        session_storage[session_id] = {
-            'user_id': user_id,
-            'session_data': session_data,
-            'stored_at': datetime.now(timezone.utc).isoformat(),
-            'last_activity': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Also store a user-to-session mapping for quick lookup
-        user_session_key = f"user_{user_id}_current_session"
-        session_storage[user_session_key] = session_id
-        
-        # Store in database for persistence (if available)
-        if DATABASE_SESSION_STORAGE and supabase_service:
-            try:
-                supabase_service.upsert_data('active_roleplay_sessions', {
-                    'session_id': session_id,
-                    'user_id': user_id,
-                    'session_data': session_data,
-                    'created_at': datetime.now(timezone.utc).isoformat(),
-                    'last_activity': datetime.now(timezone.utc).isoformat(),
-                    'is_active': True
-                })
-                logger.info(f"Session {session_id} stored in database")
-            except Exception as db_error:
-                logger.warning(f"Failed to store session in database: {db_error}")
+        if _remember_session_in_cookie(session_id, user_id, session_data):
+            _register_session_row(session_id, user_id, session_data)
         
         logger.info(f"Session {session_id} stored reliably for user {user_id}")
         return True
@@ -94,67 +47,81 @@ def store_session_reliably(session_id: str, user_id: str, session_data: Dict) ->
     except Exception as e:
         logger.error(f"Failed to store session reliably: {e}")
         return False
-def retrieve_session_reliably(session_id: str, user_id: str) -> Optional[Dict]:
-    """Enhanced session retrieval with multiple fallbacks"""
-    try:
-        # 1. Check roleplay engine's active memory first
-        if roleplay_engine and session_id in roleplay_engine.active_sessions:
-            session_data = roleplay_engine.active_sessions[session_id]
-            if session_data.get('user_id') == user_id:
-                logger.info(f"Session {session_id} found in roleplay engine memory")
-                # Update activity timestamp
-                update_session_activity(session_id)
-                return session_data
 
-        # 2. Check in-memory backup
-        if session_id in session_storage:
-            stored_session = session_storage[session_id]
-            if stored_session.get('user_id') == user_id:
-                session_data = stored_session['session_data']
-                logger.info(f"Session {session_id} recovered from memory backup")
-                
-                # Restore to roleplay engine
-                if roleplay_engine:
-                    roleplay_engine.active_sessions[session_id] = session_data
-                
-                update_session_activity(session_id)
-                return session_data
+def _remember_session_in_cookie(session_id: str, user_id: str, session_data: Dict) -> bool:
+    """
+    Flask session side of store_session_reliably. Must run before the response
+    headers are sent. Returns True when the cookie pointed at another session
+    """
+    is_new_session = session.get('current_roleplay_session') != session_id
+    
+    session['current_roleplay_session'] = session_id
+    session['roleplay_user_id'] = user_id
+    session['session_data'] = {
+        'session_id': session_id,
+        'user_id': user_id,
+        'roleplay_id': session_data.get('roleplay_id'),
+        'started_at': session_data.get('started_at'),
+        'current_stage': session_data.get('current_stage', 'phone_pickup'),
+        'last_activity': datetime.now(timezone.utc).isoformat()
+    }
+    return is_new_session
 
-        # 3. Try to find by user ID if session_id lookup failed
-        user_session_key = f"user_{user_id}_current_session"
-        if user_session_key in session_storage:
-            actual_session_id = session_storage[user_session_key]
-            if actual_session_id != session_id:
-                logger.info(f"Found different session for user {user_id}: {actual_session_id}")
-                return retrieve_session_reliably(actual_session_id, user_id)
+def _register_session_row(session_id: str, user_id: str, session_data: Dict):
+    """Register the session row once; per-turn state goes to the turn log"""
+    if not (DATABASE_SESSION_STORAGE and supabase_service):
+        return
+    
+    try:
+        supabase_service.upsert_data('active_roleplay_sessions', {
+            'session_id': session_id,
+            'user_id': user_id,
+            'session_data': {
+                'roleplay_id': session_data.get('roleplay_id'),
+                'mode': session_data.get('mode'),
+                'started_at': session_data.get('started_at')
+            },
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'last_activity': datetime.now(timezone.utc).isoformat(),
+            'is_active': True
+        })
+        logger.info(f"Session {session_id} stored in database")
+    except Exception as db_error:
+        logger.warning(f"Failed to store session in database: {db_error}")
 
-        # 4. Check Flask session
-        flask_session_id = session.get('current_roleplay_session')
-        if flask_session_id and flask_session_id != session_id:
-            logger.info(f"Flask session has different session ID: {flask_session_id}")
-            return retrieve_session_reliably(flask_session_id, user_id)
+def retrieve_session_reliably(session_id: str, user_id: str) -> Optional[Dict]:
+    """Load a session from the session store, falling back to the database copy"""
+    try:
+        if not roleplay_engine:
+            return None
+        
+        # 1. Session store (any worker's writes are visible here)
+        session_data = roleplay_engine.get_session(session_id)
+        if session_data:
+            if session_data.get('user_id') != user_id:
+                logger.warning(f"Session {session_id} does not belong to user {user_id}")
+                return None
+            update_session_activity(session_id)
+            return session_data
 
-        # 5. Database recovery as last resort
+        # 2. Database recovery as last resort (store expired or was reset)
         if DATABASE_SESSION_STORAGE and supabase_service:
-            logger.warning(f"Session {session_id} not in memory. Attempting DB recovery...")
+            logger.warning(f"Session {session_id} not in session store. Attempting DB recovery...")
+            session_data = roleplay_engine.recover_session(session_id, user_id)
+            if session_data:
+                return session_data
+            
+            # Sessions stored before the turn log carry a full blob
             records = supabase_service.get_data_with_filter(
                 'active_roleplay_sessions', 'session_id', session_id,
-                additional_filters={'user_id': user_id, 'is_active': True}
+                additional_filters={'user_id': user_id, 'is_active': True},
+                columns='session_data'
             )
             if records:
                 session_data = records[0].get('session_data')
-                if session_data:
+                if session_data and roleplay_engine.restore_session(session_id, session_data):
                     logger.info(f"Session {session_id} successfully recovered from database")
-                    # Restore to both memory stores
-                    if roleplay_engine:
-                        roleplay_engine.active_sessions[session_id] = session_data
-                    session_storage[session_id] = {
-                        'user_id': user_id,
-                        'session_data': session_data,
-                        'stored_at': datetime.now(timezone.utc).isoformat(),
-                        'last_activity': datetime.now(timezone.utc).isoformat()
-                    }
-                    return session_data
+                    return roleplay_engine.get_session(session_id)
 
         logger.error(f"SESSION RECOVERY FAILED for user {user_id} and session {session_id}")
         return None
@@ -164,38 +131,25 @@ def retrieve_session_reliably(session_id: str, user_id: str) -> Optional[Dict]:
         return None
 
 def update_session_activity(session_id: str) -> None:
-    """Update session last activity timestamp in all stores"""
+    """Extend the session's TTL and queue a last_activity write (flushed in bulk)"""
     try:
-        timestamp = datetime.now(timezone.utc).isoformat()
-        
-        # Update in memory
-        if session_id in session_storage:
-            session_storage[session_id]['last_activity'] = timestamp
+        if roleplay_engine:
+            roleplay_engine.session_store.touch(session_id)
         
-        # Update in database
-        if DATABASE_SESSION_STORAGE and supabase_service:
-            try:
-                supabase_service.update_data_by_id(
-                    'active_roleplay_sessions',
-                    {'session_id': session_id},
-                    {'last_activity': timestamp}
-                )
-            except Exception as db_error:
-                logger.warning(f"Failed to update session activity in DB: {db_error}")
+        if DATABASE_SESSION_STORAGE and activity_buffer:
+            activity_buffer.record(session_id)
                 
     except Exception as e:
         logger.warning(f"Failed to update session activity: {e}")
+
 def cleanup_session(session_id: str) -> None:
     """Enhanced session cleanup"""
     try:
-        # Remove from memory stores
-        session_storage.pop(session_id, None)
-        
-        # Remove user-to-session mapping
-        for key in list(session_storage.keys()):
-            if key.startswith('user_') and key.endswith('_current_session'):
-                if session_storage[key] == session_id:
-                    session_storage.pop(key, None)
+        # Remove from the session store (also drops the user-to-session mapping)
+        if roleplay_engine:
+            roleplay_engine.session_store.delete(session_id)
+        if activity_buffer:
+            activity_buffer.discard(session_id)
         
         # Remove from database
         if DATABASE_SESSION_STORAGE and supabase_service:
@@ -228,27 +182,25 @@ def debug_session_info():
             return jsonify({'error': 'User not authenticated'}), 401
         
         flask_session_id = session.get('current_roleplay_session')
-        user_session_key = f"user_{user_id}_current_session"
-        memory_session_id = session_storage.get(user_session_key)
+        memory_session_id = roleplay_engine.get_user_session_id(user_id) if roleplay_engine else None
         
         engine_sessions = []
-        if roleplay_engine:
-            for sid, sdata in roleplay_engine.active_sessions.items():
-                if sdata.get('user_id') == user_id:
-                    engine_sessions.append({
-                        'session_id': sid,
-                        'active': sdata.get('session_active', False),
-                        'stage': sdata.get('current_stage', 'unknown'),
-                        'turn_count': sdata.get('turn_count', 0)
-                    })
+        if roleplay_engine and memory_session_id:
+            sdata = roleplay_engine.get_session(memory_session_id)
+            if sdata:
+                engine_sessions.append({
+                    'session_id': memory_session_id,
+                    'active': sdata.get('session_active', False),
+                    'stage': sdata.get('current_stage', 'unknown'),
+                    'turn_count': sdata.get('turn_count', 0)
+                })
         
         return jsonify({
             'user_id': user_id,
             'flask_session_id': flask_session_id,
             'memory_session_id': memory_session_id,
             'engine_sessions': engine_sessions,
-            'memory_store_keys': list(session_storage.keys()),
-            'session_storage_count': len([k for k in session_storage.keys() if not k.startswith('user_')])
+            'session_store': roleplay_engine.session_store.get_stats() if roleplay_engine else None
         })
         
     except Exception as e:
@@ -277,12 +229,12 @@ def start_roleplay():
         
         # Clean up any existing sessions for this user more thoroughly
         existing_session_id = session.get('current_roleplay_session')
-        user_session_key = f"user_{user_id}_current_session"
+        stored_session_id = roleplay_engine.get_user_session_id(user_id)
         
-        # Check memory for existing sessions
-        if user_session_key in session_storage:
-            old_session_id = session_storage[user_session_key]
-            logger.info(f"🧹 Found existing session in memory: {old_session_id}")
+        # Check the session store for existing sessions
+        if stored_session_id:
+            old_session_id = stored_session_id
+            logger.info(f"🧹 Found existing session in store: {old_session_id}")
             try:
                 roleplay_engine.end_session(old_session_id, forced_end=True)
                 cleanup_session(old_session_id)
@@ -290,7 +242,7 @@ def start_roleplay():
                 logger.warning(f"Error cleaning up memory session: {cleanup_error}")
         
         # Clean up Flask session if different
-        if existing_session_id and existing_session_id != session_storage.get(user_session_key):
+        if existing_session_id and existing_session_id != stored_session_id:
             logger.info(f"🧹 Cleaning up Flask session: {existing_session_id}")
             try:
                 roleplay_engine.end_session(existing_session_id, forced_end=True)
@@ -346,7 +298,7 @@ def start_roleplay():
         logger.info(f"✅ Session created successfully: {session_id}")
         
         # Store session reliably with enhanced storage
-        session_data = roleplay_engine.active_sessions.get(session_id, {})
+        session_data = roleplay_engine.get_working_session(session_id) or {}
         success = store_session_reliably(session_id, user_id, session_data)
         
         if not success:
@@ -373,6 +325,43 @@ def start_roleplay():
     except Exception as e:
         logger.error(f"❌ Critical error starting roleplay: {e}")
         return jsonify({'error': 'Internal server error during session creation'}), 500
+def _resolve_user_session(user_id: str):
+    """Find the caller's active roleplay session. Returns (session_id, session_data) or (None, None)"""
+    session_id_from_cookie = session.get('current_roleplay_session')
+    
+    # Try multiple ways to find the session
+    session_data = None
+    actual_session_id = None
+    
+    # 1. Try with the cookie session ID
+    if session_id_from_cookie:
+        session_data = retrieve_session_reliably(session_id_from_cookie, user_id)
+        if session_data:
+            actual_session_id = session_id_from_cookie
+    
+    # 2. Fall back to the user's current session in the store
+    if not session_data and roleplay_engine:
+        potential_session_id = roleplay_engine.get_user_session_id(user_id)
+        if potential_session_id and potential_session_id != session_id_from_cookie:
+            session_data = retrieve_session_reliably(potential_session_id, user_id)
+            if session_data:
+                actual_session_id = potential_session_id
+                # Update Flask session
+                session['current_roleplay_session'] = actual_session_id
+    
+    if not session_data or not actual_session_id:
+        logger.error(f"No session found for user {user_id}. Cookie session: {session_id_from_cookie}")
+        return None, None
+    
+    return actual_session_id, session_data
+
+def _session_not_found_response():
+    return jsonify({
+        'error': 'No active roleplay session found. Please start a new call.',
+        'session_expired': True, 
+        'action_required': 'restart_call'
+    }), 404
+
 @roleplay_bp.route('/respond', methods=['POST'])
 def handle_user_response():
     """ENHANCED: Handle user input with robust session recovery"""
@@ -385,59 +374,17 @@ def handle_user_response():
             return jsonify({'error': 'User not authenticated'}), 401
         
         # Enhanced session recovery
-        session_id_from_cookie = session.get('current_roleplay_session')
-        
-        # Try multiple ways to find the session
-        session_data = None
-        actual_session_id = None
-        
-        # 1. Try with the cookie session ID
-        if session_id_from_cookie:
-            session_data = retrieve_session_reliably(session_id_from_cookie, user_id)
-            if session_data:
-                actual_session_id = session_id_from_cookie
-        
-        # 2. Try to find user's current session if cookie failed
-        if not session_data:
-            user_session_key = f"user_{user_id}_current_session"
-            if user_session_key in session_storage:
-                potential_session_id = session_storage[user_session_key]
-                session_data = retrieve_session_reliably(potential_session_id, user_id)
-                if session_data:
-                    actual_session_id = potential_session_id
-                    # Update Flask session
-                    session['current_roleplay_session'] = actual_session_id
-        
-        # 3. Check if roleplay engine has any sessions for this user
-        if not session_data and roleplay_engine:
-            for sid, sdata in roleplay_engine.active_sessions.items():
-                if sdata.get('user_id') == user_id and sdata.get('session_active', False):
-                    session_data = sdata
-                    actual_session_id = sid
-                    # Update both session stores
-                    session['current_roleplay_session'] = actual_session_id
-                    session_storage[f"user_{user_id}_current_session"] = actual_session_id
-                    logger.info(f"Found session in roleplay engine: {actual_session_id}")
-                    break
-        
-        if not session_data or not actual_session_id:
-            logger.error(f"No session found for user {user_id}. Cookie session: {session_id_from_cookie}")
-            return jsonify({
-                'error': 'No active roleplay session found. Please start a new call.',
-                'session_expired': True, 
-                'action_required': 'restart_call'
-            }), 404
+        actual_session_id, session_data = _resolve_user_session(user_id)
+        if not actual_session_id:
+            return _session_not_found_response()
 
         logger.info(f"💬 Processing input for session {actual_session_id}: '{user_input[:50]}...'")
         
-        # Update activity timestamp
-        update_session_activity(actual_session_id)
-        
         # Process input with the correct session ID
         response_result = roleplay_engine.process_user_input(actual_session_id, user_input)
         
         # Store updated session data
-        updated_session_data = roleplay_engine.active_sessions.get(actual_session_id)
+        updated_session_data = roleplay_engine.get_working_session(actual_session_id)
         if updated_session_data:
             store_session_reliably(actual_session_id, user_id, updated_session_data)
 
@@ -446,6 +393,77 @@ def handle_user_response():
     except Exception as e:
         logger.error(f"❌ Critical error handling user response: {e}", exc_info=True)
         return jsonify({'error': 'Internal server error', 'action_required': 'restart_call'}), 500
+
+# ===== STREAMING RESPONSE (SSE) =====
+_STREAM_DONE = object()
+
+def _sse_event(event: str, data: Dict) -> str:
+    """Format a single Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@roleplay_bp.route('/respond/stream', methods=['POST'])
+def handle_user_response_stream():
+    """
+    Same as /respond, but streams the prospect reply as Server-Sent Events.
+    Emits 'token' events while the reply is generated and a final 'done'
+    event carrying the full result (evaluation, session state). The 'done'
+    ai_response is authoritative: hang-ups and fallbacks replace streamed text.
+    """
+    try:
+        data = request.get_json()
+        user_input = data.get('user_input', '').strip()
+        user_id = session.get('user_id')
+        
+        if not user_id: 
+            return jsonify({'error': 'User not authenticated'}), 401
+        
+        actual_session_id, session_data = _resolve_user_session(user_id)
+        if not actual_session_id:
+            return _session_not_found_response()
+
+        logger.info(f"📡 Streaming input for session {actual_session_id}: '{user_input[:50]}...'")
+        
+        # Cookie changes are only saved with the response headers, so update the
+        # Flask session now; the generator below runs after they are sent
+        is_new_session = _remember_session_in_cookie(actual_session_id, user_id, session_data)
+        
+        events = queue.Queue()
+        
+        def run_turn():
+            try:
+                result = roleplay_engine.process_user_input(
+                    actual_session_id, user_input,
+                    on_token=lambda delta: events.put(('token', {'delta': delta}))
+                )
+            except Exception as e:
+                logger.error(f"❌ Streaming turn failed: {e}", exc_info=True)
+                result = {'success': False, 'error': 'Internal server error', 'action_required': 'restart_call'}
+            events.put(('done', result))
+            events.put((_STREAM_DONE, None))
+        
+        threading.Thread(target=run_turn, name='roleplay-stream', daemon=True).start()
+        
+        def generate():
+            while True:
+                event, payload = events.get()
+                if event is _STREAM_DONE:
+                    break
+                if event == 'done' and is_new_session:
+                    # Register before telling the client the turn is complete
+                    updated_session_data = roleplay_engine.get_working_session(actual_session_id)
+                    if updated_session_data:
+                        _register_session_row(actual_session_id, user_id, updated_session_data)
+                yield _sse_event(event, payload)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error(f"❌ Critical error streaming user response: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error', 'action_required': 'restart_call'}), 500
 # Keep all other existing endpoints...
 @roleplay_bp.route('/end', methods=['POST'])
 def end_roleplay():
@@ -461,9 +479,8 @@ def end_roleplay():
         session_id = session.get('current_roleplay_session')
         
         # Try to find session if not in Flask session
-        if not session_id:
-            user_session_key = f"user_{user_id}_current_session"
-            session_id = session_storage.get(user_session_key)
+        if not session_id and roleplay_engine:
+            session_id = roleplay_engine.get_user_session_id(user_id)
         
         if not session_id:
             logger.warning("⚠️ No active session to end")
@@ -662,6 +679,66 @@ def text_to_speech():
         logger.error(f"❌ Critical TTS error: {e}")
         return _create_emergency_audio_response()
 
+@roleplay_bp.route('/tts/stream', methods=['GET', 'POST'])
+def text_to_speech_stream():
+    """
+    Streaming TTS: synthesizes the text sentence by sentence and forwards
+    ElevenLabs MP3 chunks as they arrive. GET (?text=...) lets an <audio>
+    element start playback before synthesis finishes.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            text = data.get('text', '').strip()
+        else:
+            text = request.args.get('text', '').strip()
+        user_id = session.get('user_id')
+        
+        if not user_id:
+            return jsonify({'error': 'User not authenticated'}), 401
+        
+        if not text:
+            return _create_silent_audio_response()
+        
+        if len(text) > 2500:
+            text = text[:2500]
+            logger.warning("Text truncated to 2500 characters for TTS")
+        
+        if not (elevenlabs_service and elevenlabs_service.is_available()):
+            logger.info("🔊 Streaming TTS unavailable, client falls back to /tts")
+            return _create_stream_fallback_response()
+        
+        logger.info(f"🔊 Streaming TTS request from user {user_id}: '{text[:50]}...'")
+        
+        audio_chunks = elevenlabs_service.stream_text_to_speech(text)
+        
+        # Pull the first chunk eagerly so a failed synthesis can still fall back
+        try:
+            first_chunk = next(audio_chunks)
+        except StopIteration:
+            return _create_stream_fallback_response()
+        except Exception as tts_error:
+            logger.warning(f"⚠️ Streaming TTS failed before first chunk: {tts_error}")
+            return _create_stream_fallback_response()
+        
+        def generate():
+            yield first_chunk
+            yield from audio_chunks
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='audio/mpeg',
+            headers={
+                'Content-Disposition': 'inline; filename=roleplay_speech.mp3',
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"❌ Critical streaming TTS error: {e}")
+        return _create_stream_fallback_response()
+
 @roleplay_bp.route('/session/status', methods=['GET'])
 def get_session_status():
     """FIXED: Get current session status with recovery"""
@@ -718,7 +795,11 @@ def health_check():
             'timestamp': datetime.now(timezone.utc).isoformat(),
             'version': '1.1',
             'services': services_status,
-            'active_sessions': len(getattr(roleplay_engine, 'active_sessions', {})) if roleplay_engine else 0
+            'active_sessions': len(getattr(roleplay_engine, 'active_sessions', {})) if roleplay_engine else 0,
+            'tts_cache': elevenlabs_service.audio_cache.get_stats() if elevenlabs_service else None,
+            'session_activity': activity_buffer.get_metrics() if activity_buffer else None,
+            'session_reaper': roleplay_engine.session_reaper.get_stats() if roleplay_engine else None,
+            'profile_cache': get_profile_cache().get_stats()
         }
         
         return jsonify(status_data)
@@ -770,6 +851,17 @@ def _create_emergency_audio_data(text: str = None) -> bytes:
         logger.error(f"Error creating emergency audio: {e}")
         return b''
 
+def _create_stream_fallback_response():
+    """
+    /tts/stream could not synthesize: the emergency audio with a 503 and
+    X-TTS-Fallback, so the player errors out and switches to buffered /tts
+    instead of playing the placeholder.
+    """
+    response = _create_emergency_audio_response()
+    response.status_code = 503
+    response.headers['X-TTS-Fallback'] = 'emergency'
+    return response
+
 def _create_emergency_audio_response():
     """Create emergency audio response"""
     try:
@@ -1,17 +1,16 @@
 # ===== API/ROUTES/USER.PY (COMPLETELY FIXED) =====
 from flask import Blueprint, request, jsonify, session
-from services.supabase_client import SupabaseService
-from services.user_progress_service import UserProgressService
+from services.lazy_services import supabase_service, progress_service
+from services.user_stats_rollup import get_user_stats_rollup
+from services.leaderboard_service import get_leaderboard_service
 from utils.decorators import require_auth
-from utils.constants import ROLEPLAY_CONFIG
+from utils.constants import ROLEPLAY_CONFIG, COMPLETION_SUMMARY_COLUMNS, COMPLETION_DETAIL_COLUMNS
 from datetime import datetime, timedelta, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 user_bp = Blueprint('user', __name__)
 
-supabase_service = SupabaseService()
-progress_service = UserProgressService()
 
 @user_bp.route('/profile', methods=['GET'])
 @require_auth
@@ -59,56 +58,8 @@ def get_user_stats():
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
         
-        # FIX: Get completions from the new table
-        user_completions = supabase_service.get_user_completions(user_id, limit=1000)
-        
-        stats = {
-            'total_sessions': len(user_completions),
-            'total_minutes': sum(c.get('duration_minutes', 0) or 0 for c in user_completions),
-            'successful_sessions': sum(1 for c in user_completions if c.get('success') is True),
-            'success_rate': 0,
-            'favorite_roleplay': None,
-            'sessions_this_week': 0,
-            'sessions_this_month': 0,
-            'monthly_usage_minutes': profile.get('monthly_usage_minutes', 0) or 0,
-            'lifetime_usage_minutes': profile.get('lifetime_usage_minutes', 0) or 0
-        }
-        
-        if stats['total_sessions'] > 0:
-            stats['success_rate'] = round((stats['successful_sessions'] / stats['total_sessions']) * 100, 1)
-        
-        now = datetime.now(timezone.utc)
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        for completion in user_completions:
-            try:
-                # Use 'completed_at' from the new table
-                session_date_str = completion.get('completed_at')
-                if not session_date_str:
-                    continue
-                session_date = _parse_iso_datetime(session_date_str)
-                
-                if session_date >= week_ago:
-                    stats['sessions_this_week'] += 1
-                if session_date >= month_ago:
-                    stats['sessions_this_month'] += 1
-                    
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Could not parse completion date {session_date_str}: {e}")
-                continue
-        
-        roleplay_counts = {}
-        for completion in user_completions:
-            rp_id_str = str(completion.get('roleplay_id'))
-            if rp_id_str:
-                # Use the main roleplay ID (e.g., '1' from '1.1')
-                main_rp_id = int(float(rp_id_str))
-                roleplay_counts[main_rp_id] = roleplay_counts.get(main_rp_id, 0) + 1
-
-        if roleplay_counts:
-            favorite_id = max(roleplay_counts, key=roleplay_counts.get)
-            stats['favorite_roleplay'] = ROLEPLAY_CONFIG.get(favorite_id, {}).get('name', f'Roleplay {favorite_id}')
+        # Single-row read of the rollup maintained as completions are saved
+        stats = get_user_stats_rollup().get_user_stats(user_id, profile)
         
         logger.info(f"Successfully retrieved stats for user {user_id}")
         return jsonify(stats)
@@ -129,8 +80,10 @@ def get_user_sessions():
         logger.info(f"Getting completions for user {user_id}, page {page}, limit {limit}")
         
         offset = (page - 1) * limit
-        # FIX: Get completions from the new table
-        user_completions = supabase_service.get_user_completions(user_id, limit=limit, offset=offset)
+        # FIX: Get completions from the new table (list columns only; transcripts via /sessions/<id>)
+        user_completions = supabase_service.get_user_completions(
+            user_id, limit=limit, offset=offset, columns=COMPLETION_SUMMARY_COLUMNS
+        )
         total_count = supabase_service.get_completion_count(user_id)
         
         logger.info(f"Successfully retrieved {len(user_completions)} completions for user {user_id}")
@@ -145,6 +98,23 @@ def get_user_sessions():
     except Exception as e:
         logger.error(f"Error getting user sessions: {e}")
         return jsonify({'error': 'Internal server error'}), 500
+
+@user_bp.route('/sessions/<completion_id>', methods=['GET'])
+@require_auth
+def get_user_session_detail(completion_id):
+    """Get one completion with its transcript and coaching feedback"""
+    try:
+        user_id = session['user_id']
+        
+        completion = supabase_service.get_user_completion(user_id, completion_id, columns=COMPLETION_DETAIL_COLUMNS)
+        if not completion:
+            return jsonify({'error': 'Session not found'}), 404
+        
+        return jsonify({'session': completion})
+        
+    except Exception as e:
+        logger.error(f"Error getting session {completion_id}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
 @user_bp.route('/profile', methods=['PUT'])
 @require_auth
 def update_profile():
@@ -379,39 +349,16 @@ def get_roleplay_leaderboard(roleplay_id):
         limit = min(int(request.args.get('limit', 10)), 50)
         user_id = session.get('user_id')
         
-        leaderboard = progress_service.get_leaderboard(roleplay_id, limit)
-        
-        # Find user's rank
-        user_rank = None
-        user_score = None
-        for entry in leaderboard:
-            if entry['user_id'] == user_id:
-                user_rank = entry['rank']
-                user_score = entry['score']
-                break
-        
-        # If user not in top, find their rank
-        if user_rank is None:
-            user_stats = supabase_service.get_service_client().table('user_roleplay_stats').select(
-                'best_score'
-            ).eq('user_id', user_id).eq('roleplay_id', roleplay_id).execute()
-            
-            if user_stats.data and user_stats.data[0]['best_score']:
-                user_score = user_stats.data[0]['best_score']
-                
-                # Count how many users have higher scores
-                higher_scores = supabase_service.get_service_client().table('user_roleplay_stats').select(
-                    'user_id', count='exact'
-                ).eq('roleplay_id', roleplay_id).gt('best_score', user_score).execute()
-                
-                user_rank = (higher_scores.count or 0) + 1
+        # Ranks, the user's position and the participant count: one ranked query at most (cached per roleplay)
+        ranking = get_leaderboard_service().get_leaderboard(roleplay_id, limit, user_id=user_id)
         
         return jsonify({
             'roleplay_id': roleplay_id,
-            'leaderboard': leaderboard,
-            'user_rank': user_rank,
-            'user_score': user_score,
-            'total_participants': len(leaderboard)
+            'leaderboard': ranking['leaderboard'],
+            'user_rank': ranking['user_rank'],
+            'user_score': ranking['user_score'],
+            'user_percentile': ranking['user_percentile'],
+            'total_participants': ranking['total_participants']
         })
         
     except Exception as e:
@@ -428,7 +375,10 @@ def export_user_progress():
         
         # Get all user data
         progress = progress_service.get_user_roleplay_progress(user_id)
-        completions = get_all_completions(user_id)
+        # The CSV only has summary fields; the JSON export carries every column
+        completions = get_all_completions(
+            user_id, COMPLETION_SUMMARY_COLUMNS if format_type == 'csv' else COMPLETION_DETAIL_COLUMNS
+        )
         achievements = get_user_achievements(user_id)
         
         export_data = {
@@ -466,11 +416,11 @@ def get_recent_completions(user_id: str, limit: int = 5):
         logger.error(f"Error getting recent completions: {e}")
         return []
 
-def get_all_completions(user_id: str):
+def get_all_completions(user_id: str, columns: str = COMPLETION_DETAIL_COLUMNS):
     """Get all user completions for export"""
     try:
         result = supabase_service.get_service_client().table('roleplay_completions').select(
-            '*'
+            columns
         ).eq('user_id', user_id).order('completed_at', desc=True).execute()
         
         return result.data if result.data else []
@@ -0,0 +1,172 @@
+# ===== API/SERVICES/ACTIVITY_BUFFER.PY - WRITE-BEHIND SESSION ACTIVITY =====
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_TABLE = 'active_roleplay_sessions'
+
+class SessionActivityBuffer:
+    """
+    Write-behind buffer for active_roleplay_sessions.last_activity.
+    record() only updates an in-memory map (several touches of the same
+    session coalesce into one). A background thread flushes the map every
+    flush_interval seconds, or sooner once max_pending sessions are waiting,
+    with one bulk update per bucket_seconds of activity: each session's
+    last_activity is its own, rounded down to the bucket, never a newer one.
+    """
+
+    def __init__(self, supabase_service, flush_interval: Optional[float] = None, max_pending: Optional[int] = None):
+        self.supabase_service = supabase_service
+        self.flush_interval = flush_interval or float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '5'))
+        self.max_pending = max_pending or int(os.getenv('ACTIVITY_FLUSH_MAX_PENDING', '100'))
+        self.bucket_seconds = max(1, int(os.getenv('ACTIVITY_BUCKET_SECONDS', '1')))
+
+        self._pending = {}  # session_id -> latest activity timestamp (epoch seconds)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self._flush_latencies = deque(maxlen=200)
+        self._metrics = {
+            'recorded': 0,
+            'coalesced': 0,
+            'flushes': 0,
+            'flushed_sessions': 0,
+            'flush_failures': 0
+        }
+
+    # ===== PRODUCER SIDE =====
+
+    def record(self, session_id: str) -> None:
+        """Note activity for a session; written on the next flush"""
+        if not session_id:
+            return
+
+        with self._lock:
+            if session_id in self._pending:
+                self._metrics['coalesced'] += 1
+            self._pending[session_id] = time.time()
+            self._metrics['recorded'] += 1
+            should_flush = len(self._pending) >= self.max_pending
+
+        self._ensure_started()
+        if should_flush:
+            self._wakeup.set()
+
+    def discard(self, session_id: str) -> None:
+        """Forget pending activity for a session that just ended"""
+        with self._lock:
+            self._pending.pop(session_id, None)
+
+    # ===== FLUSHING =====
+
+    def flush(self) -> int:
+        """Write all pending activity now. Returns the number of sessions written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+
+            if not batch or not self.supabase_service:
+                return 0
+
+            # Sessions active in the same bucket share one statement
+            buckets = {}
+            for session_id, timestamp in batch.items():
+                bucket = timestamp - timestamp % self.bucket_seconds
+                buckets.setdefault(bucket, []).append(session_id)
+
+            started = time.perf_counter()
+            client = self.supabase_service.get_service_client()
+            flushed = 0
+            failed = {}
+            for bucket, session_ids in buckets.items():
+                try:
+                    client.table(ACTIVITY_TABLE)\
+                        .update({'last_activity': datetime.fromtimestamp(bucket, timezone.utc).isoformat()})\
+                        .in_('session_id', session_ids)\
+                        .execute()
+                    flushed += len(session_ids)
+                except Exception as e:
+                    logger.warning(f"⚠️ Session activity flush failed ({len(session_ids)} sessions): {e}")
+                    failed.update((session_id, batch[session_id]) for session_id in session_ids)
+
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                if failed:
+                    self._metrics['flush_failures'] += 1
+                    # Re-queue with their own timestamps, unless a newer touch arrived meanwhile
+                    for session_id, timestamp in failed.items():
+                        self._pending.setdefault(session_id, timestamp)
+                if flushed:
+                    self._metrics['flushes'] += 1
+                    self._metrics['flushed_sessions'] += flushed
+                    self._flush_latencies.append(elapsed)
+            return flushed
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stopping.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='session-activity-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the flusher and write whatever is still pending"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        flushed = self.flush()
+        if flushed:
+            logger.info(f"✅ Flushed {flushed} pending session activity updates on shutdown")
+
+    # ===== METRICS =====
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._pending)
+            latencies = list(self._flush_latencies)
+
+        metrics['flush_interval'] = self.flush_interval
+        metrics['max_pending'] = self.max_pending
+        metrics['bucket_seconds'] = self.bucket_seconds
+        if latencies:
+            metrics['flush_latency_ms'] = {
+                'last': round(latencies[-1] * 1000, 1),
+                'avg': round(sum(latencies) / len(latencies) * 1000, 1),
+                'max': round(max(latencies) * 1000, 1)
+            }
+        return metrics
+
+# Global instance for singleton pattern
+_activity_buffer = None
+_activity_buffer_lock = threading.Lock()
+
+def get_session_activity_buffer(supabase_service=None) -> SessionActivityBuffer:
+    """Get the process-wide session activity buffer"""
+    global _activity_buffer
+    if _activity_buffer is None:
+        with _activity_buffer_lock:
+            if _activity_buffer is None:
+                _activity_buffer = SessionActivityBuffer(supabase_service)
+    return _activity_buffer
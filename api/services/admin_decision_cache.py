@@ -0,0 +1,85 @@
+# ===== API/SERVICES/ADMIN_DECISION_CACHE.PY - CACHED ADMIN AUTHORIZATION =====
+
+import os
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+DEFAULT_DECISION_TTL = 30  # seconds
+
+class AdminDecisionCache:
+    """
+    Short-lived cache of require_admin outcomes, keyed by user and access token.
+
+    A decision is only reused for the same user with the same token, so a
+    new login re-checks. Changing a user's access level invalidates every
+    decision held for that user on this worker; on other workers the TTL
+    bounds how long an old decision survives. Tokens are stored hashed.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv('ADMIN_DECISION_TTL', str(DEFAULT_DECISION_TTL))
+        )
+        self._decisions = {}  # user_id -> {token_hash: (is_admin, expires_at)}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @staticmethod
+    def _token_key(access_token: Optional[str]) -> str:
+        if not access_token:
+            return ''
+        return hashlib.sha256(access_token.encode('utf-8')).hexdigest()[:32]
+
+    def get(self, user_id: str, access_token: Optional[str]) -> Optional[bool]:
+        """Cached decision, or None if there is no live one"""
+        if not self.ttl_seconds:
+            return None
+        token_key = self._token_key(access_token)
+        with self._lock:
+            entry = self._decisions.get(user_id, {}).get(token_key)
+            if entry is None or entry[1] <= time.time():
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, user_id: str, access_token: Optional[str], is_admin: bool) -> None:
+        if not self.ttl_seconds:
+            return
+        now = time.time()
+        with self._lock:
+            user_decisions = self._decisions.setdefault(user_id, {})
+            # Drop this user's expired tokens as we go
+            for token_key in [key for key, entry in user_decisions.items() if entry[1] <= now]:
+                del user_decisions[token_key]
+            user_decisions[self._token_key(access_token)] = (is_admin, now + self.ttl_seconds)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget every decision for a user (e.g. after their access level changed)"""
+        with self._lock:
+            if self._decisions.pop(user_id, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['users'] = len(self._decisions)
+        lookups = stats['hits'] + stats['misses']
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+# Global instance for singleton pattern
+_admin_decision_cache = None
+_admin_decision_cache_lock = threading.Lock()
+
+def get_admin_decision_cache() -> AdminDecisionCache:
+    """Get the process-wide admin decision cache"""
+    global _admin_decision_cache
+    if _admin_decision_cache is None:
+        with _admin_decision_cache_lock:
+            if _admin_decision_cache is None:
+                _admin_decision_cache = AdminDecisionCache()
+    return _admin_decision_cache
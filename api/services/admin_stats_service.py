@@ -0,0 +1,215 @@
+# ===== API/SERVICES/ADMIN_STATS_SERVICE.PY - PLATFORM STATISTICS SNAPSHOT =====
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 300  # seconds the database snapshot may age before it is rebuilt
+DEFAULT_CACHE_TTL = 30  # seconds this worker reuses the snapshot without re-reading it
+
+SNAPSHOT_VIEW = 'admin_stats_snapshot'
+LIVE_STATS_RPC = 'admin_stats_live'
+REFRESH_RPC = 'refresh_admin_stats_snapshot'
+
+class AdminStatsService:
+    """
+    Admin dashboard statistics, aggregated in Postgres rather than in Python.
+
+    admin_stats_live() (see migrations/supabase_schema.sql) does the grouped
+    counts and time buckets; the admin_stats_snapshot materialized view keeps
+    its last result, so a dashboard load is a one-row read however large
+    user_profiles and voice_sessions get. A snapshot older than
+    refresh_interval is rebuilt on a background thread (one at a time) and
+    the current one is served meanwhile.
+
+    Until the migration is applied it falls back to the live RPC, and then
+    to aggregating the raw rows here.
+    """
+
+    def __init__(self, supabase_service, refresh_interval: Optional[int] = None, cache_ttl: Optional[int] = None):
+        self.supabase = supabase_service
+        self.refresh_interval = refresh_interval if refresh_interval is not None else int(
+            os.getenv('ADMIN_STATS_REFRESH_INTERVAL', str(DEFAULT_REFRESH_INTERVAL))
+        )
+        self.cache_ttl = cache_ttl if cache_ttl is not None else int(
+            os.getenv('ADMIN_STATS_CACHE_TTL', str(DEFAULT_CACHE_TTL))
+        )
+
+        self._cached = None  # (stats, refreshed_at, fetched_at)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._stats = {'cache_hits': 0, 'snapshot_reads': 0, 'refreshes': 0, 'fallbacks': 0}
+
+    # ===== READ PATH =====
+
+    def get_stats(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Platform statistics; force_refresh rebuilds the snapshot first"""
+        if force_refresh:
+            self.refresh_snapshot()
+        else:
+            with self._lock:
+                cached = self._cached
+                if cached and time.time() - cached[2] < self.cache_ttl:
+                    self._stats['cache_hits'] += 1
+                    return self._with_meta(cached[0], cached[1])
+
+        try:
+            stats, refreshed_at = self._read_snapshot()
+        except Exception as e:
+            logger.warning(f"⚠️ Admin stats snapshot unavailable, aggregating live: {e}")
+            return self._live_stats()
+
+        with self._lock:
+            self._cached = (stats, refreshed_at, time.time())
+            self._stats['snapshot_reads'] += 1
+
+        if not force_refresh and self._is_stale(refreshed_at):
+            self.refresh_in_background()
+        return self._with_meta(stats, refreshed_at)
+
+    def _read_snapshot(self):
+        response = self.supabase.get_service_client().table(SNAPSHOT_VIEW)\
+            .select('stats,refreshed_at')\
+            .eq('id', 1)\
+            .limit(1)\
+            .execute()
+        if not response.data:
+            raise LookupError(f"{SNAPSHOT_VIEW} is empty")
+        row = response.data[0]
+        return row['stats'], row.get('refreshed_at')
+
+    def _is_stale(self, refreshed_at: Optional[str]) -> bool:
+        refreshed = _parse_datetime(refreshed_at)
+        if refreshed is None:
+            return True
+        return (datetime.now(timezone.utc) - refreshed).total_seconds() >= self.refresh_interval
+
+    @staticmethod
+    def _with_meta(stats: Dict[str, Any], refreshed_at: Optional[str]) -> Dict[str, Any]:
+        result = dict(stats)
+        result['snapshot_refreshed_at'] = refreshed_at
+        return result
+
+    # ===== REFRESH =====
+
+    def refresh_snapshot(self) -> bool:
+        """Rebuild the materialized snapshot now. Returns whether it succeeded"""
+        try:
+            self.supabase.get_service_client().rpc(REFRESH_RPC, {}).execute()
+            with self._lock:
+                self._cached = None
+                self._stats['refreshes'] += 1
+            logger.info("📊 Admin stats snapshot refreshed")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error refreshing admin stats snapshot: {e}")
+            return False
+
+    def refresh_in_background(self) -> None:
+        """refresh_snapshot() on a daemon thread, unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh_snapshot()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='admin-stats-refresh', daemon=True).start()
+
+    # ===== FALLBACKS =====
+
+    def _live_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._stats['fallbacks'] += 1
+        service_client = self.supabase.get_service_client()
+        try:
+            stats = service_client.rpc(LIVE_STATS_RPC, {}).execute().data
+            if stats:
+                return self._with_meta(stats, datetime.now(timezone.utc).isoformat())
+        except Exception as e:
+            logger.warning(f"⚠️ {LIVE_STATS_RPC} RPC unavailable, aggregating rows in Python: {e}")
+        return self._with_meta(self._aggregate_rows(service_client), datetime.now(timezone.utc).isoformat())
+
+    @staticmethod
+    def _aggregate_rows(service_client) -> Dict[str, Any]:
+        """Pre-migration path: pull every row and count here (linear in table size)"""
+        users = service_client.table('user_profiles').select('access_level,created_at').execute().data or []
+        sessions = service_client.table('voice_sessions').select('duration_minutes,success,created_at').execute().data or []
+
+        now = datetime.now(timezone.utc)
+        week_ago = now - timedelta(days=7)
+        month_ago = now - timedelta(days=30)
+
+        def count_since(rows, since):
+            return sum(1 for row in rows if (_parse_datetime(row.get('created_at')) or datetime.min.replace(tzinfo=timezone.utc)) >= since)
+
+        stats = {
+            'total_users': len(users),
+            'trial_users': sum(1 for u in users if u['access_level'] == 'limited_trial'),
+            'basic_users': sum(1 for u in users if u['access_level'] == 'unlimited_basic'),
+            'pro_users': sum(1 for u in users if u['access_level'] == 'unlimited_pro'),
+            'admin_users': sum(1 for u in users if u['access_level'] == 'admin'),
+            'new_users_this_week': count_since(users, week_ago),
+            'new_users_this_month': count_since(users, month_ago),
+            'total_sessions': len(sessions),
+            'successful_sessions': sum(1 for s in sessions if s.get('success')),
+            'total_minutes': sum(s.get('duration_minutes', 0) for s in sessions if s.get('duration_minutes')),
+            'sessions_this_week': count_since(sessions, week_ago),
+            'sessions_this_month': count_since(sessions, month_ago)
+        }
+        if stats['total_sessions'] > 0:
+            stats['success_rate'] = round((stats['successful_sessions'] / stats['total_sessions']) * 100, 1)
+        else:
+            stats['success_rate'] = 0
+        return stats
+
+    # ===== METRICS =====
+
+    def get_service_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['refreshing'] = self._refreshing
+            stats['cached_refreshed_at'] = self._cached[1] if self._cached else None
+        stats['refresh_interval'] = self.refresh_interval
+        stats['cache_ttl'] = self.cache_ttl
+        return stats
+
+def _parse_datetime(date_string: Optional[str]) -> Optional[datetime]:
+    """Parse a Supabase timestamp to a timezone-aware datetime (naive values are UTC)"""
+    if not date_string:
+        return None
+    try:
+        if date_string.endswith('Z'):
+            date_string = date_string.replace('Z', '+00:00')
+        if 'T' not in date_string and ' ' in date_string:
+            date_string = date_string.replace(' ', 'T', 1)
+        parsed = datetime.fromisoformat(date_string)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Could not parse datetime '{date_string}': {e}")
+        return None
+
+# Global instance for singleton pattern
+_admin_stats_service = None
+_admin_stats_service_lock = threading.Lock()
+
+def get_admin_stats_service(supabase_service=None) -> AdminStatsService:
+    """Get the process-wide admin stats service"""
+    global _admin_stats_service
+    if _admin_stats_service is None:
+        with _admin_stats_service_lock:
+            if _admin_stats_service is None:
+                if supabase_service is None:
+                    from .lazy_services import supabase_service
+                _admin_stats_service = AdminStatsService(supabase_service)
+    return _admin_stats_service
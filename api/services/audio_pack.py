@@ -0,0 +1,124 @@
+# ===== API/SERVICES/AUDIO_PACK.PY - PRE-RENDERED PROSPECT LINE AUDIO =====
+
+import os
+import mmap
+import json
+import logging
+import threading
+from typing import Optional, Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+PACK_INDEX_FILE = 'index.json'
+PACK_DATA_FILE = 'audio.pack'
+PACK_VERSION = 1
+
+class AudioPack:
+    """
+    Read-only pack of pre-rendered MP3 lines.
+    Layout: audio.pack holds the clips back to back, index.json maps each
+    TTS cache key (see tts_cache.make_cache_key) to its offset and length.
+    The data file is memory-mapped once, so a lookup is a slice copy.
+    """
+
+    def __init__(self, pack_dir: str):
+        self.pack_dir = pack_dir
+
+        with open(os.path.join(pack_dir, PACK_INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        if index.get('version') != PACK_VERSION:
+            raise ValueError(f"Unsupported audio pack version: {index.get('version')}")
+
+        self.model_id = index.get('model_id')
+        self.entries = index.get('entries', {})
+
+        self._data_file = open(os.path.join(pack_dir, PACK_DATA_FILE), 'rb')
+        if os.fstat(self._data_file.fileno()).st_size:
+            self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b''  # mmap cannot map an empty file
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def load(cls, pack_dir: Optional[str]) -> Optional['AudioPack']:
+        """Open a pack, or return None if it is not configured or unreadable"""
+        if not pack_dir:
+            return None
+
+        try:
+            pack = cls(pack_dir)
+            logger.info(f"📦 Loaded audio pack with {len(pack)} clips from {pack_dir}")
+            return pack
+        except FileNotFoundError:
+            logger.warning(f"⚠️ No audio pack found at {pack_dir}")
+        except Exception as e:
+            logger.error(f"❌ Failed to load audio pack from {pack_dir}: {e}")
+        return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+
+        offset, length = entry['offset'], entry['length']
+        return self._data[offset:offset + length]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+
+        return {
+            'clips': len(self.entries),
+            'bytes': len(self._data),
+            'model_id': self.model_id,
+            'hits': hits,
+            'misses': misses
+        }
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data_file.close()
+
+def write_audio_pack(pack_dir: str, clips: Iterable[Tuple[str, bytes, Dict]], model_id: str) -> int:
+    """
+    Write a pack from (key, audio, metadata) tuples. Both files are written
+    to temporary names and renamed so a running server never sees a partial pack.
+    Returns the number of clips written.
+    """
+    os.makedirs(pack_dir, exist_ok=True)
+    data_path = os.path.join(pack_dir, PACK_DATA_FILE)
+    index_path = os.path.join(pack_dir, PACK_INDEX_FILE)
+
+    entries = {}
+    offset = 0
+
+    with open(data_path + '.tmp', 'wb') as data_file:
+        for key, audio, metadata in clips:
+            if not audio or key in entries:
+                continue
+            data_file.write(audio)
+            entries[key] = dict(metadata, offset=offset, length=len(audio))
+            offset += len(audio)
+
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as index_file:
+        json.dump({'version': PACK_VERSION, 'model_id': model_id, 'entries': entries}, index_file, indent=1)
+
+    os.replace(data_path + '.tmp', data_path)
+    os.replace(index_path + '.tmp', index_path)
+
+    return len(entries)
@@ -2,20 +2,153 @@
 
 import os
 import io
+import re
+import time
+import random
 import requests
 import logging
+import threading
 import wave
 import struct
-from typing import Optional, Dict, Any, BinaryIO, List
+from collections import deque
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, BinaryIO, List, Iterator
 from datetime import datetime
 
+from services.tts_cache import TTSAudioCache, make_cache_key
+from services.audio_pack import AudioPack
+
 logger = logging.getLogger(__name__)
 
+# Sentence boundary: terminal punctuation (optionally closed by a quote/bracket) followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+STREAM_CHUNK_SIZE = 4096
+
+def split_into_sentences(text: str) -> List[str]:
+    """Split text into sentences for incremental synthesis"""
+    if not text or not text.strip():
+        return []
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence.strip()]
+
+# ===== POOLED HTTP CLIENT =====
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class ElevenLabsHTTPClient:
+    """
+    Keep-alive, connection-pooled session shared by all ElevenLabsService
+    instances. Retries 429/5xx and connection errors with jittered exponential
+    backoff and records per-request latency.
+    """
+
+    def __init__(self):
+        self.pool_size = int(os.getenv('ELEVENLABS_POOL_SIZE', '10'))
+        self.max_retries = int(os.getenv('ELEVENLABS_MAX_RETRIES', '2'))
+        self.backoff_base = float(os.getenv('ELEVENLABS_BACKOFF_BASE', '0.25'))
+        self.backoff_max = float(os.getenv('ELEVENLABS_BACKOFF_MAX', '4.0'))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)  # seconds, most recent requests
+        self._metrics = {'requests': 0, 'retries': 0, 'errors': 0}
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying retryable failures. Raises after the last attempt"""
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(time.perf_counter() - started, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+
+            self._record(time.perf_counter() - started, error=response.status_code >= 400)
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                return response
+
+            retry_after = response.headers.get('Retry-After')
+            response.close()
+            logger.warning(f"ElevenLabs returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+            self._sleep_before_retry(attempt, retry_after)
+            attempt += 1
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def _sleep_before_retry(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        with self._lock:
+            self._metrics['retries'] += 1
+
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)  # jitter so clients don't retry in lockstep
+        if retry_after:
+            try:
+                delay = min(self.backoff_max, max(delay, float(retry_after)))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def _record(self, latency: float, error: bool = False) -> None:
+        with self._lock:
+            self._metrics['requests'] += 1
+            if error:
+                self._metrics['errors'] += 1
+            self._latencies.append(latency)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            latencies = sorted(self._latencies)
+
+        metrics['pool_size'] = self.pool_size
+        if latencies:
+            metrics['latency_ms'] = {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 1),
+                'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1)
+            }
+        return metrics
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_elevenlabs_http_client() -> ElevenLabsHTTPClient:
+    """Get the process-wide ElevenLabs HTTP client"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = ElevenLabsHTTPClient()
+    return _http_client
+
 class ElevenLabsService:
     def __init__(self):
         self.api_key = os.getenv('REACT_APP_ELEVENLABS_API_KEY')
         self.base_url = "https://api.elevenlabs.io/v1"
         self.is_enabled = bool(self.api_key)
+        self.model_id = "eleven_monolingual_v1"
+        self.http = get_elevenlabs_http_client()
+        
+        # Repeated prospect lines are served from here instead of ElevenLabs
+        self.audio_cache = TTSAudioCache()
+        
+        # Pre-rendered canned lines (see prerender_audio_pack.py)
+        self.audio_pack = AudioPack.load(os.getenv('TTS_AUDIO_PACK_DIR'))
         
         # Enhanced voice configurations for Roleplay 1.1
         self.voice_configs = {
@@ -110,39 +243,29 @@ class ElevenLabsService:
             if not voice_settings:
                 voice_settings = self.voice_configs['default_prospect']
             
-            # If ElevenLabs is not available, use emergency fallback
-            if not self.is_enabled:
-                logger.info("ElevenLabs not available, using emergency audio for Roleplay 1.1")
-                return self._generate_emergency_audio(text)
-            
             # Prepare request
+            url, headers, data = self._build_tts_request(text, voice_settings)
             voice_id = voice_settings.get('voice_id', self.voice_configs['default_prospect']['voice_id'])
-            url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
             
-            headers = {
-                "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": self.api_key
-            }
+            cache_key = self._cache_key(data, voice_id)
+            cached_audio = self._lookup_audio(cache_key)
+            if cached_audio:
+                logger.info(f"TTS cache hit: {text[:50]}...")
+                return io.BytesIO(cached_audio)
             
-            # Enhanced payload for Roleplay 1.1
-            data = {
-                "text": text,
-                "model_id": "eleven_monolingual_v1",
-                "voice_settings": {
-                    "stability": voice_settings.get('stability', 0.5),
-                    "similarity_boost": voice_settings.get('similarity_boost', 0.75),
-                    "style": voice_settings.get('style', 0.0),
-                    "use_speaker_boost": voice_settings.get('use_speaker_boost', True)
-                }
-            }
+            # If ElevenLabs is not available, use emergency fallback
+            if not self.is_enabled:
+                logger.info("ElevenLabs not available, using emergency audio for Roleplay 1.1")
+                return self._generate_emergency_audio(text)
             
             logger.info(f"Generating TTS for Roleplay 1.1: {text[:50]}... with voice {voice_id}")
             
             # Make request with timeout
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = self.http.post(url, json=data, headers=headers, timeout=10)
             
             if response.status_code == 200:
+                self.audio_cache.put(cache_key, response.content)
+                
                 # Convert MP3 to WAV for better compatibility
                 audio_stream = self._convert_mp3_to_wav(response.content)
                 logger.info(f"Successfully generated Roleplay 1.1 TTS audio: {len(response.content)} bytes")
@@ -161,6 +284,121 @@ class ElevenLabsService:
             logger.error(f"Unexpected error in TTS generation: {e}, using emergency audio")
             return self._generate_emergency_audio(text)
 
+    def stream_text_to_speech(self, text: str, voice_settings: Optional[Dict] = None) -> Iterator[bytes]:
+        """
+        Stream MP3 audio sentence by sentence as ElevenLabs produces it.
+        Each sentence is synthesized in turn and its chunks are yielded as
+        they arrive, so playback can start before the whole reply is rendered.
+        Raises on failure before the first chunk so callers can fall back.
+        """
+        if not self.is_enabled:
+            raise RuntimeError("ElevenLabs not available for streaming TTS")
+        
+        if not voice_settings:
+            voice_settings = self.voice_configs['default_prospect']
+        
+        sentences = split_into_sentences(text)
+        total_bytes = 0
+        
+        for index, sentence in enumerate(sentences):
+            url, headers, data = self._build_tts_request(sentence, voice_settings)
+            cache_key = self._cache_key(data, voice_settings.get('voice_id', self.voice_configs['default_prospect']['voice_id']))
+            
+            cached_audio = self._lookup_audio(cache_key)
+            if cached_audio:
+                total_bytes += len(cached_audio)
+                yield cached_audio
+                continue
+            
+            try:
+                with self.http.post(url, json=data, headers=headers, timeout=10, stream=True) as response:
+                    if response.status_code != 200:
+                        raise requests.exceptions.RequestException(
+                            f"status {response.status_code}: {response.text[:200]}"
+                        )
+                    
+                    sentence_chunks = []
+                    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        if chunk:
+                            total_bytes += len(chunk)
+                            sentence_chunks.append(chunk)
+                            yield chunk
+                    
+                    # Only complete sentences are cached
+                    self.audio_cache.put(cache_key, b''.join(sentence_chunks))
+                            
+            except requests.exceptions.RequestException as e:
+                if total_bytes == 0:
+                    raise
+                # Audio is already playing - drop the rest rather than break the stream
+                logger.warning(f"Streaming TTS stopped at sentence {index + 1}/{len(sentences)}: {e}")
+                return
+        
+        logger.info(f"Streamed TTS audio: {len(sentences)} sentences, {total_bytes} bytes")
+
+    def render_line(self, text: str, voice_settings: Optional[Dict] = None) -> Optional[bytes]:
+        """
+        Synthesize one line and return the raw MP3, or None on failure.
+        Unlike text_to_speech there is no fallback audio - used for pre-rendering
+        """
+        if not self.is_enabled:
+            return None
+        
+        voice_settings = voice_settings or self.voice_configs['default_prospect']
+        url, headers, data = self._build_tts_request(text, voice_settings)
+        
+        try:
+            response = self.http.post(url, json=data, headers=headers, timeout=30)
+            if response.status_code == 200 and response.content:
+                return response.content
+            logger.warning(f"Render failed with status {response.status_code}: {text[:50]}")
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Render request failed: {e}")
+        return None
+
+    def cache_key_for(self, text: str, voice_settings: Optional[Dict] = None) -> str:
+        """Content address of a line as this service would synthesize it"""
+        voice_settings = voice_settings or self.voice_configs['default_prospect']
+        _, _, data = self._build_tts_request(text, voice_settings)
+        return self._cache_key(data, voice_settings.get('voice_id', self.voice_configs['default_prospect']['voice_id']))
+
+    def _lookup_audio(self, cache_key: str) -> Optional[bytes]:
+        """Pre-rendered pack first, then the runtime cache"""
+        if self.audio_pack:
+            packed_audio = self.audio_pack.get(cache_key)
+            if packed_audio:
+                return packed_audio
+        return self.audio_cache.get(cache_key)
+
+    def _cache_key(self, data: Dict, voice_id: str) -> str:
+        """Cache key for a prepared ElevenLabs payload"""
+        return make_cache_key(data['text'], voice_id, data['voice_settings'], data['model_id'])
+
+    def _build_tts_request(self, text: str, voice_settings: Dict):
+        """Build (url, headers, payload) for an ElevenLabs streaming TTS call"""
+        voice_id = voice_settings.get('voice_id', self.voice_configs['default_prospect']['voice_id'])
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
+        
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        }
+        
+        # Enhanced payload for Roleplay 1.1
+        data = {
+            "text": text,
+            "model_id": self.model_id,
+            "voice_settings": {
+                "stability": voice_settings.get('stability', 0.5),
+                "similarity_boost": voice_settings.get('similarity_boost', 0.75),
+                "style": voice_settings.get('style', 0.0),
+                "use_speaker_boost": voice_settings.get('use_speaker_boost', True)
+            }
+        }
+        
+        return url, headers, data
+
     def get_voice_settings_for_prospect(self, prospect_info: Dict) -> Dict:
         """
         Get enhanced voice settings based on prospect information for Roleplay 1.1
@@ -364,7 +602,7 @@ class ElevenLabsService:
             url = f"{self.base_url}/voices"
             headers = {"xi-api-key": self.api_key}
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = self.http.get(url, headers=headers, timeout=5)
             
             if response.status_code == 200:
                 logger.info("ElevenLabs connection test successful for Roleplay 1.1")
@@ -390,13 +628,17 @@ class ElevenLabsService:
             'api_key_configured': bool(self.api_key),
             'base_url': self.base_url,
             'voice_configs_count': len(self.voice_configs),
+            'audio_cache': self.audio_cache.get_stats(),
+            'audio_pack': self.audio_pack.get_stats() if self.audio_pack else None,
+            'http': self.http.get_metrics(),
             'roleplay_11_enhanced': True,
             'features': {
                 'stage_specific_voices': True,
                 'prospect_type_matching': True,
                 'emergency_fallback': True,
                 'silence_audio_generation': True,
-                'wav_conversion': True
+                'wav_conversion': True,
+                'sentence_streaming': True
             }
         }
         
@@ -423,7 +665,7 @@ class ElevenLabsService:
             url = f"{self.base_url}/voices"
             headers = {"xi-api-key": self.api_key}
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 voices_data = response.json()
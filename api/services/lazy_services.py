@@ -0,0 +1,158 @@
+# ===== API/SERVICES/LAZY_SERVICES.PY - DEFERRED SERVICE CONSTRUCTION =====
+
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+class LazyService:
+    """
+    Stands in for a service until something actually uses it.
+
+    The route modules import these proxies in place of building their
+    services at import time, so a cold start that only serves a page never
+    imports or constructs the Supabase, OpenAI or ElevenLabs clients. The
+    first attribute access (or truth test) builds the service once, under
+    a lock; later accesses go straight to the instance.
+
+    A factory that raises leaves the proxy falsy, the same as the old
+    "service = None" fallback, so `if not roleplay_engine:` checks keep working.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._failed = False
+        self._init_ms = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Any]:
+        """The service instance, built on first call (None if it could not be built)"""
+        if self._instance is not None or self._failed:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None and not self._failed:
+                started = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                    self._init_ms = round((time.perf_counter() - started) * 1000, 1)
+                    logger.info(f"✅ {self._name} initialized on first use ({self._init_ms}ms)")
+                except Exception as e:
+                    self._failed = True
+                    logger.error(f"❌ Error initializing {self._name}: {e}")
+        return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        instance = self.get()
+        if instance is None:
+            raise AttributeError(f"{self._name} is unavailable")
+        return getattr(instance, attr)
+
+    def __bool__(self) -> bool:
+        return self.get() is not None
+
+    def __repr__(self) -> str:
+        state = 'ready' if self._instance is not None else 'failed' if self._failed else 'deferred'
+        return f"<LazyService {self._name} ({state})>"
+
+    def get_status(self) -> Dict[str, Any]:
+        return {'initialized': self._instance is not None, 'failed': self._failed, 'init_ms': self._init_ms}
+
+# ===== FACTORIES =====
+# Imports live inside the factories: importing the client libraries is a large
+# part of the cost we are deferring.
+
+def _build_supabase_service():
+    from .supabase_client import SupabaseService
+    return SupabaseService()
+
+def _build_elevenlabs_service():
+    from .elevenlabs_service import ElevenLabsService
+    return ElevenLabsService()
+
+def _build_roleplay_engine():
+    from .roleplay_engine import get_roleplay_engine
+    return get_roleplay_engine()
+
+def _build_progress_service():
+    from .user_progress_service import get_user_progress_service
+    return get_user_progress_service()
+
+def _build_resend_service():
+    from .resend_service import ResendService
+    return ResendService()
+
+def _build_activity_buffer():
+    from .activity_buffer import get_session_activity_buffer
+    return get_session_activity_buffer(get_supabase_service())
+
+supabase_service = LazyService('SupabaseService', _build_supabase_service)
+elevenlabs_service = LazyService('ElevenLabsService', _build_elevenlabs_service)
+roleplay_engine = LazyService('RoleplayEngine', _build_roleplay_engine)
+progress_service = LazyService('UserProgressService', _build_progress_service)
+resend_service = LazyService('ResendService', _build_resend_service)
+activity_buffer = LazyService('SessionActivityBuffer', _build_activity_buffer)
+
+_SERVICES = {
+    'supabase': supabase_service,
+    'elevenlabs': elevenlabs_service,
+    'roleplay_engine': roleplay_engine,
+    'progress': progress_service,
+    'resend': resend_service,
+    'activity_buffer': activity_buffer,
+}
+
+# ===== ACCESSORS =====
+
+def get_supabase_service():
+    return supabase_service.get()
+
+def get_elevenlabs_service():
+    return elevenlabs_service.get()
+
+def get_roleplay_engine():
+    return roleplay_engine.get()
+
+def get_progress_service():
+    return progress_service.get()
+
+def get_resend_service():
+    return resend_service.get()
+
+# ===== WARM-UP =====
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+    """
+    Build services ahead of the first request that needs them (all by default).
+    Runs in dependency order: the engine and progress service reuse the
+    Supabase client built first. Returns name -> available.
+    """
+    selected = list(names) if names is not None else list(_SERVICES)
+    unknown = [name for name in selected if name not in _SERVICES]
+    if unknown:
+        raise ValueError(f"Unknown services: {unknown}")
+
+    started = time.perf_counter()
+    results = {name: _SERVICES[name].get() is not None for name in selected}
+
+    logger.info(f"🔥 Warmed up {sum(results.values())}/{len(results)} services in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms")
+    return results
+
+def warm_up_in_background(names: Optional[Iterable[str]] = None) -> threading.Thread:
+    """warm_up() on a daemon thread, so app start-up doesn't wait for it"""
+    thread = threading.Thread(target=warm_up, args=(names,), name='service-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def get_services_status() -> Dict[str, Any]:
+    """Which services have been built so far (does not build any)"""
+    return {name: service.get_status() for name, service in _SERVICES.items()}
@@ -0,0 +1,241 @@
+# ===== API/SERVICES/LEADERBOARD_SERVICE.PY - RANKED LEADERBOARDS =====
+
+import os
+import time
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from .score_rank_index import ScoreRankIndex, is_score_rank_index_enabled
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEADERBOARD_TTL = 30  # seconds
+DEFAULT_SNAPSHOT_SIZE = 50  # the most the leaderboard endpoint will show
+
+LEADERBOARD_RPC = 'get_roleplay_leaderboard'
+
+class LeaderboardService:
+    """
+    Per-roleplay leaderboards over user_roleplay_progress.best_score.
+
+    get_roleplay_leaderboard() (see migrations/supabase_schema.sql) ranks
+    with RANK() OVER (...) and returns the top rows, the caller's own row
+    and the participant count in one query. The top snapshot_size rows of
+    each roleplay are kept here for ttl_seconds and served to every limit
+    up to that size. When a completion raises someone's best_score,
+    record_best_score() re-slots them in the cached snapshot instead of
+    dropping it; other workers catch up when their copy expires.
+
+    Ties share a rank (two users on 90 are both 2nd, the next is 4th).
+
+    With SCORE_RANK_INDEX_ENABLED=true, a user's rank, percentile and the
+    participant count come from an in-process ScoreRankIndex instead, so
+    "where am I" never needs a ranked query.
+    """
+
+    def __init__(self, supabase_service, ttl_seconds: Optional[int] = None, snapshot_size: Optional[int] = None):
+        self.supabase = supabase_service
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv('LEADERBOARD_CACHE_TTL', str(DEFAULT_LEADERBOARD_TTL))
+        )
+        self.snapshot_size = snapshot_size or int(os.getenv('LEADERBOARD_SNAPSHOT_SIZE', str(DEFAULT_SNAPSHOT_SIZE)))
+
+        self.rank_index = ScoreRankIndex(supabase_service) if is_score_rank_index_enabled() else None
+
+        self._snapshots = {}  # roleplay_id -> {'rows': [...], 'total': int, 'expires_at': float}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'rank_lookups': 0, 'incremental_updates': 0, 'fallbacks': 0}
+
+    # ===== READ PATH =====
+
+    def get_leaderboard(self, roleplay_id: str, limit: int = 10, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Top `limit` entries, plus the user's rank, score and percentile when user_id is given"""
+        limit = max(1, min(limit, self.snapshot_size))
+
+        position = self.rank_index.lookup(roleplay_id, user_id or '') if self.rank_index else None
+
+        user_row = None
+        user_looked_up = False
+        snapshot = self._get_snapshot(roleplay_id)
+        if snapshot is None:
+            rows, total, user_row = self._fetch(roleplay_id, self.snapshot_size, None if position else user_id)
+            snapshot = self._store(roleplay_id, rows, total)
+            user_looked_up = True
+        if position is not None:
+            return {
+                'leaderboard': [self._format_entry(row) for row in snapshot['rows'][:limit]],
+                'user_rank': position['rank'] if user_id else None,
+                'user_score': position['score'] if user_id else None,
+                'user_percentile': position['percentile'] if user_id else None,
+                'total_participants': position['total']
+            }
+        if user_id and not user_looked_up:
+            user_row = next((row for row in snapshot['rows'] if row['user_id'] == user_id), None)
+            if user_row is None:
+                # Outside the cached top: one ranked lookup for just this user
+                self._count('rank_lookups')
+                _, _, user_row = self._fetch(roleplay_id, 0, user_id)
+
+        return {
+            'leaderboard': [self._format_entry(row) for row in snapshot['rows'][:limit]],
+            'user_rank': user_row['rank'] if user_row else None,
+            'user_score': user_row['score'] if user_row else None,
+            'user_percentile': None,
+            'total_participants': snapshot['total']
+        }
+
+    def _get_snapshot(self, roleplay_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snapshot = self._snapshots.get(roleplay_id)
+            if snapshot is not None and snapshot['expires_at'] > time.time():
+                self._stats['hits'] += 1
+                return snapshot
+            self._stats['misses'] += 1
+            return None
+
+    def _store(self, roleplay_id: str, rows: List[Dict[str, Any]], total: int) -> Dict[str, Any]:
+        snapshot = {'rows': rows, 'total': total, 'expires_at': time.time() + self.ttl_seconds}
+        if self.ttl_seconds:
+            with self._lock:
+                self._snapshots[roleplay_id] = snapshot
+        return snapshot
+
+    def _fetch(self, roleplay_id: str, limit: int, user_id: Optional[str]) -> Tuple[List[Dict[str, Any]], int, Optional[Dict[str, Any]]]:
+        """(top rows, participant count, user's row) from the ranking RPC"""
+        try:
+            response = self.supabase.get_service_client().rpc(LEADERBOARD_RPC, {
+                'p_roleplay_id': roleplay_id,
+                'p_limit': limit,
+                'p_user_id': user_id
+            }).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ {LEADERBOARD_RPC} RPC unavailable, ranking in Python: {e}")
+            self._count('fallbacks')
+            return self._fetch_without_rpc(roleplay_id, limit, user_id)
+
+        ranked = response.data or []
+        rows = [self._row(item['progress'], item['rank']) for item in ranked]
+        total = ranked[0]['total_participants'] if ranked else 0
+        user_row = next((row for row in rows if user_id and row['user_id'] == user_id), None)
+        return rows[:limit], total, user_row
+
+    def _fetch_without_rpc(self, roleplay_id: str, limit: int, user_id: Optional[str]):
+        """Pre-migration path: top rows, then a count of higher scores for the user"""
+        records = self.supabase.get_data_with_filter(
+            'user_roleplay_progress', 'roleplay_id', roleplay_id,
+            limit=limit or 1, order_by='best_score', ascending=False
+        ) if limit else []
+        rows = _assign_ranks([self._row(record) for record in records if (record.get('best_score') or 0) > 0])
+
+        user_row = next((row for row in rows if user_id and row['user_id'] == user_id), None)
+        if user_id and user_row is None:
+            client = self.supabase.get_service_client()
+            own = client.table('user_roleplay_progress').select('*')\
+                .eq('user_id', user_id).eq('roleplay_id', roleplay_id).limit(1).execute()
+            if own.data and (own.data[0].get('best_score') or 0) > 0:
+                higher = client.table('user_roleplay_progress').select('user_id', count='exact')\
+                    .eq('roleplay_id', roleplay_id).gt('best_score', own.data[0]['best_score']).execute()
+                user_row = self._row(own.data[0], (higher.count or 0) + 1)
+        return rows, len(rows), user_row
+
+    # ===== INCREMENTAL UPDATES =====
+
+    def record_best_score(self, roleplay_id: str, user_id: str, progress: Dict[str, Any],
+                          previous_best: Optional[float] = None) -> None:
+        """
+        Re-slot a user whose best_score just went up in the cached snapshot.
+        progress is their user_roleplay_progress row after the update.
+        """
+        new_row = self._row(dict(progress, user_id=user_id))
+        if self.rank_index:
+            self.rank_index.update(roleplay_id, user_id, new_row['score'])
+
+        with self._lock:
+            snapshot = self._snapshots.get(roleplay_id)
+            if snapshot is None:
+                return
+
+            rows = [row for row in snapshot['rows'] if row['user_id'] != user_id]
+            was_listed = len(rows) != len(snapshot['rows'])
+            if not previous_best or previous_best <= 0:
+                snapshot['total'] += 1
+
+            is_full = len(snapshot['rows']) >= self.snapshot_size
+            if was_listed or not is_full or new_row['score'] > rows[-1]['score']:
+                # After everyone already on this score, matching the SQL tie-break
+                position = next((i for i, row in enumerate(rows) if row['score'] < new_row['score']), len(rows))
+                rows.insert(position, new_row)
+                snapshot['rows'] = _assign_ranks(rows[:self.snapshot_size])
+
+            self._stats['incremental_updates'] += 1
+
+    def invalidate(self, roleplay_id: Optional[str] = None) -> None:
+        with self._lock:
+            if roleplay_id is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(roleplay_id, None)
+
+    # ===== HELPERS =====
+
+    @staticmethod
+    def _row(progress: Dict[str, Any], rank: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            'user_id': str(progress.get('user_id')),
+            'score': progress.get('best_score') or 0,
+            'total_attempts': progress.get('total_attempts') or 0,
+            'successful_attempts': progress.get('successful_attempts') or 0,
+            'last_attempt': progress.get('last_attempt_at'),
+            'rank': rank
+        }
+
+    @staticmethod
+    def _format_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'rank': row['rank'],
+            'user_id': row['user_id'][:8] + '...',  # Anonymized
+            'score': row['score'],
+            'total_attempts': row['total_attempts'],
+            'successful_attempts': row['successful_attempts'],
+            'completion_rate': (row['successful_attempts'] / max(row['total_attempts'], 1)) * 100,
+            'last_attempt': row['last_attempt']
+        }
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_roleplays'] = len(self._snapshots)
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['snapshot_size'] = self.snapshot_size
+        if self.rank_index:
+            stats['rank_index'] = self.rank_index.get_stats()
+        return stats
+
+def _assign_ranks(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """RANK() over rows already sorted by score, highest first"""
+    for position, row in enumerate(rows):
+        if position and row['score'] == rows[position - 1]['score']:
+            row['rank'] = rows[position - 1]['rank']
+        else:
+            row['rank'] = position + 1
+    return rows
+
+# Global instance for singleton pattern
+_leaderboard_service = None
+_leaderboard_service_lock = threading.Lock()
+
+def get_leaderboard_service(supabase_service=None) -> LeaderboardService:
+    """Get the process-wide leaderboard service"""
+    global _leaderboard_service
+    if _leaderboard_service is None:
+        with _leaderboard_service_lock:
+            if _leaderboard_service is None:
+                if supabase_service is None:
+                    from .lazy_services import supabase_service
+                _leaderboard_service = LeaderboardService(supabase_service)
+    return _leaderboard_service
@@ -3,7 +3,7 @@
 import os
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 
 # Use the modern OpenAI library
@@ -87,10 +87,14 @@ class OpenAIService:
             return self._fallback_evaluation(user_input, evaluation_stage)
     
     def generate_roleplay_response(self, user_input: str, conversation_history: List[Dict], 
-                                     user_context: Dict, current_stage: str) -> Dict[str, Any]:
+                                     user_context: Dict, current_stage: str,
+                                     on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Generate AI prospect response for Roleplay 1.1
         Returns contextual, logical response
+        If on_token is given the completion is streamed and each text delta is
+        passed to it as it arrives; the returned response is still the full,
+        cleaned text.
         """
         if not self.is_available():
             return self._fallback_response(current_stage)
@@ -102,19 +106,24 @@ class OpenAIService:
             # Create response prompt
             prompt = self._create_response_prompt(user_input, context, current_stage)
             
-            # NEW: Use the updated client.chat.completions.create method
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_prospect_system_prompt(user_context)},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=150  # Keep responses concise
-            )
+            messages = [
+                {"role": "system", "content": self._get_prospect_system_prompt(user_context)},
+                {"role": "user", "content": prompt}
+            ]
             
-            # NEW: Access the response content from the message object
-            ai_response = response.choices[0].message.content.strip()
+            if on_token:
+                ai_response = self._stream_completion(messages, on_token).strip()
+            else:
+                # NEW: Use the updated client.chat.completions.create method
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=150  # Keep responses concise
+                )
+                
+                # NEW: Access the response content from the message object
+                ai_response = response.choices[0].message.content.strip()
             
             # Clean up response
             ai_response = self._clean_ai_response(ai_response)
@@ -173,6 +182,27 @@ class OpenAIService:
             logger.error(f"❌ Unexpected error during OpenAI coaching: {e}")
             return self._fallback_coaching(rubric_scores)
     
+    def _stream_completion(self, messages: List[Dict], on_token: Callable[[str], None]) -> str:
+        """Stream a prospect completion, forwarding deltas and returning the full text"""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150,
+            stream=True
+        )
+        
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_token(delta)
+        
+        return ''.join(parts)
+    
     # ===== SYSTEM PROMPTS (No changes needed) =====
     
     def _get_evaluator_system_prompt(self) -> str:
@@ -0,0 +1,145 @@
+# ===== API/SERVICES/PROFILE_CACHE.PY - USER PROFILE CACHE =====
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Dict, Any
+
+from flask import g, has_app_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_TTL = 60  # seconds
+DEFAULT_MAX_PROFILES = 10000
+
+_REQUEST_MEMO = '_user_profile_memo'
+
+class UserProfileCache:
+    """
+    Two-layer cache in front of user_profiles lookups:
+    - request: memo on flask.g, so decorators and the handler share one fetch per request
+    - process: LRU with TTL, shared by every request on this worker
+
+    Writes through SupabaseService invalidate both layers for that user.
+    Other workers only see a change once their copy expires, so the TTL
+    bounds how stale a profile (including access_level) can be.
+    Callers get their own copy; mutating it does not touch the cache.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv('PROFILE_CACHE_TTL', str(DEFAULT_PROFILE_TTL))
+        )
+        self.max_entries = max_entries or int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', str(DEFAULT_MAX_PROFILES)))
+
+        self._entries = OrderedDict()  # user_id -> (profile, expires_at)
+        self._lock = threading.Lock()
+        self._stats = {
+            'request_hits': 0,
+            'process_hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+            'evictions': 0
+        }
+
+    # ===== LOOKUP =====
+
+    def get(self, user_id: str, loader: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Cached profile for user_id, calling loader(user_id) on a miss. None results are not cached"""
+        if not user_id or not self.ttl_seconds:
+            return loader(user_id)
+
+        memo = self._request_memo()
+        if memo is not None and user_id in memo:
+            self._count('request_hits')
+            return dict(memo[user_id])
+
+        profile = None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(user_id)
+                    self._stats['process_hits'] += 1
+                    profile = entry[0]
+                else:
+                    del self._entries[user_id]
+
+        if profile is None:
+            self._count('misses')
+            profile = loader(user_id)
+            if profile is None:
+                return None
+            self._store(user_id, profile)
+
+        if memo is not None:
+            memo[user_id] = profile
+        return dict(profile)
+
+    def _store(self, user_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[user_id] = (dict(profile), time.time() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    @staticmethod
+    def _request_memo() -> Optional[Dict[str, Dict[str, Any]]]:
+        """Per-request dict on flask.g (None outside an app context, e.g. background threads)"""
+        if not has_app_context():
+            return None
+        memo = g.get(_REQUEST_MEMO)
+        if memo is None:
+            memo = {}
+            setattr(g, _REQUEST_MEMO, memo)
+        return memo
+
+    # ===== INVALIDATION =====
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's profile after it was written"""
+        if not user_id:
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._stats['invalidations'] += 1
+
+        memo = self._request_memo()
+        if memo is not None:
+            memo.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ===== METRICS =====
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+
+        lookups = stats['request_hits'] + stats['process_hits'] + stats['misses']
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['hit_ratio'] = round((stats['request_hits'] + stats['process_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+# Global instance for singleton pattern
+_profile_cache = None
+_profile_cache_lock = threading.Lock()
+
+def get_profile_cache() -> UserProfileCache:
+    """Get the process-wide user profile cache"""
+    global _profile_cache
+    if _profile_cache is None:
+        with _profile_cache_lock:
+            if _profile_cache is None:
+                _profile_cache = UserProfileCache()
+    return _profile_cache
@@ -0,0 +1,181 @@
+# ===== API/SERVICES/PROGRESSION_GRAPH.PY - COMPILED ROLEPLAY UNLOCK RULES =====
+
+import logging
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Open to everyone regardless of the rules
+ALWAYS_AVAILABLE = ('1.1', '1.2', '3')
+
+class PassRequirement:
+    """What "passing" a prerequisite roleplay means, and how to explain a miss"""
+
+    __slots__ = ('kind', 'check', 'reason', 'name', 'progress')
+
+    def __init__(self, kind: str, check: Callable[[Dict[str, Any]], bool], reason: str, name: Optional[str] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.kind = kind  # same rule by name in record_roleplay_completion() (p_pass_rule)
+        self.check = check
+        self.reason = reason  # formatted with roleplay_id (the locked one) and required_rp_id
+        self.name = name
+        self.progress = progress
+
+# Keyed by the prerequisite roleplay
+PASS_REQUIREMENTS = {
+    '1.2': PassRequirement(  # Marathon Mode
+        kind='marathon_passed',
+        check=lambda row: bool(row.get('marathon_passed', False)),
+        reason='Pass Marathon Mode (6/10 calls) to unlock {roleplay_id}',
+        name='Marathon Mode',
+        progress=lambda row: f"{row.get('marathon_best_run', 0)}/10 calls passed"
+    ),
+    '1.3': PassRequirement(  # Legend Mode
+        kind='legend_completed',
+        check=lambda row: bool(row.get('legend_completed', False)),
+        reason='Complete Legend Mode to unlock {roleplay_id}',
+        name='Legend Mode'
+    ),
+    '2.1': PassRequirement(  # Post-Pitch Practice
+        kind='best_score_70',
+        check=lambda row: (row.get('best_score', 0) or 0) >= 70,
+        reason='Pass Post-Pitch Practice (70+ score) to unlock {roleplay_id}',
+        name='Post-Pitch Practice',
+        progress=lambda row: f"Best score: {row.get('best_score', 0)}/100"
+    ),
+}
+# Any other prerequisite: its progress row is marked completed
+DEFAULT_PASS_REQUIREMENT = PassRequirement(
+    kind='completed',
+    check=lambda row: bool(row.get('completed', False)),
+    reason='Complete {required_rp_id} to unlock {roleplay_id}'
+)
+
+class ProgressionGraph:
+    """
+    UserProgressService.progression_rules compiled into a DAG.
+
+    Each roleplay with 'requires_completion' is an edge prerequisite -> roleplay.
+    Compiling checks the rules are acyclic and precomputes children lists and a
+    topological order, so access checks and unlock propagation are dictionary
+    walks over the user's progress rows (roleplay_id -> user_roleplay_progress row).
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, Any]]):
+        self.rules = rules
+        self.requires = {roleplay_id: rule.get('requires_completion') for roleplay_id, rule in rules.items()
+                         if rule.get('requires_completion')}
+        self.children = {}
+        for roleplay_id, required_rp_id in self.requires.items():
+            self.children.setdefault(required_rp_id, []).append(roleplay_id)
+
+        nodes = set(rules) | set(self.requires.values()) | set(ALWAYS_AVAILABLE)
+        self.order = self._topological_order(nodes)
+        logger.info(f"✅ Progression rules compiled: {len(self.order)} roleplays, {len(self.requires)} unlock edges")
+
+    def _topological_order(self, nodes: Iterable[str]) -> List[str]:
+        indegree = {node: 0 for node in nodes}
+        for roleplay_id in self.requires:
+            indegree[roleplay_id] += 1
+        queue = deque(sorted(node for node, degree in indegree.items() if degree == 0))
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for child in self.children.get(node, []):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        if len(order) != len(indegree):
+            cyclic = sorted(node for node, degree in indegree.items() if degree > 0)
+            raise ValueError(f"Progression rules contain a cycle through {cyclic}")
+        return order
+
+    # ===== ACCESS =====
+
+    @staticmethod
+    def pass_requirement(roleplay_id: str) -> PassRequirement:
+        return PASS_REQUIREMENTS.get(roleplay_id, DEFAULT_PASS_REQUIREMENT)
+
+    @staticmethod
+    def is_passed(roleplay_id: str, row: Optional[Dict[str, Any]]) -> bool:
+        if not row:
+            return False
+        return PASS_REQUIREMENTS.get(roleplay_id, DEFAULT_PASS_REQUIREMENT).check(row)
+
+    def evaluate(self, roleplay_id: str, user_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Access decision for one roleplay (the check_roleplay_access result)"""
+        if roleplay_id in ALWAYS_AVAILABLE:
+            return {'allowed': True, 'reason': 'Always available'}
+
+        rule = self.rules.get(roleplay_id)
+        if not rule:
+            return {'allowed': True, 'reason': 'No specific unlock requirement'}
+
+        required_rp_id = self.requires.get(roleplay_id)
+        if not required_rp_id:
+            return {'allowed': True, 'reason': 'No prerequisite required'}
+
+        required_stats = user_stats.get(required_rp_id)
+        if not required_stats:
+            return {
+                'allowed': False,
+                'reason': f'Complete {rule.get("description", required_rp_id)} first',
+                'required_roleplay': required_rp_id,
+                'required_name': rule.get('name', f'Roleplay {required_rp_id}')
+            }
+
+        requirement = PASS_REQUIREMENTS.get(required_rp_id, DEFAULT_PASS_REQUIREMENT)
+        if not requirement.check(required_stats):
+            denied = {
+                'allowed': False,
+                'reason': requirement.reason.format(roleplay_id=roleplay_id, required_rp_id=required_rp_id),
+                'required_roleplay': required_rp_id
+            }
+            if requirement.name:
+                denied['required_name'] = requirement.name
+            if requirement.progress:
+                denied['current_progress'] = requirement.progress(required_stats)
+            return denied
+
+        return {
+            'allowed': True,
+            'reason': 'Requirement met',
+            'unlocked_by': required_rp_id
+        }
+
+    # ===== UNLOCK PROPAGATION =====
+
+    @staticmethod
+    def _is_unlocked(row: Optional[Dict[str, Any]]) -> bool:
+        return bool(row and row.get('is_unlocked'))
+
+    def propagate(self, roleplay_id: str, user_stats: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Roleplays newly unlocked after `roleplay_id`'s row changed: unlock_id -> unlocked_by.
+        Walks down from that roleplay only, and only through prerequisites the user has passed.
+        """
+        unlocked = {}
+        queue = deque([roleplay_id])
+        while queue:
+            parent = queue.popleft()
+            if not self.is_passed(parent, user_stats.get(parent)):
+                continue
+            for child in self.children.get(parent, []):
+                if child in unlocked:
+                    continue
+                if not self._is_unlocked(user_stats.get(child)):
+                    unlocked[child] = parent
+                queue.append(child)
+        return unlocked
+
+    def pending_unlocks(self, user_stats: Dict[str, Any]) -> Dict[str, str]:
+        """Every roleplay whose prerequisite is passed but isn't marked unlocked yet"""
+        return {
+            roleplay_id: self.requires[roleplay_id]
+            for roleplay_id in self.order
+            if roleplay_id in self.requires
+            and self.is_passed(self.requires[roleplay_id], user_stats.get(self.requires[roleplay_id]))
+            and not self._is_unlocked(user_stats.get(roleplay_id))
+        }
@@ -1,18 +1,75 @@
 # ===== FIXED: services/roleplay/base_roleplay.py =====
 
+import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 import json
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for the speculative prospect reply that runs alongside evaluation
+_turn_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ROLEPLAY_TURN_WORKERS', '8')),
+    thread_name_prefix='roleplay-turn'
+)
+SPECULATIVE_RESPONSE_TIMEOUT = 30  # seconds
+
+class SpeculativeResponse:
+    """
+    A prospect reply generated while the turn is still being evaluated.
+    Its streamed tokens are held back until release() (evaluation kept the
+    call going) and dropped by discard() (e.g. hang-up), so the client never
+    shows text the turn ends up not using.
+    """
+
+    def __init__(self, on_token: Optional[Callable[[str], None]] = None):
+        self.future = None
+        self._on_token = on_token
+        self._held = []
+        self._released = False
+        self._discarded = False
+        self._lock = threading.Lock()
+
+    def push(self, delta: str) -> None:
+        """on_token for the background generation"""
+        with self._lock:
+            if self._discarded:
+                return
+            if not self._released:
+                self._held.append(delta)
+                return
+            # Forwarded under the lock so tokens keep their order across release()
+            self._on_token(delta)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released or self._discarded:
+                return
+            self._released = True
+            held, self._held = self._held, []
+            for delta in held:
+                self._on_token(delta)
+
+    def discard(self) -> bool:
+        """Drop held tokens and cancel the generation. False if it was already running"""
+        with self._lock:
+            self._discarded = True
+            self._held = []
+        return self.future.cancel() if self.future is not None else True
+
 class BaseRoleplay:
     """Enhanced base class for all roleplay implementations"""
     
-    def __init__(self, openai_service=None):
+    # Implementations that accept on_token in process_user_input
+    supports_token_streaming = False
+    
+    def __init__(self, openai_service=None, session_registry=None):
         self.openai_service = openai_service
-        self.active_sessions = {}
+        # Shared with the engine and the other implementations when injected
+        self.active_sessions = session_registry if session_registry is not None else {}
         self.roleplay_id = "base"
         
         logger.info(f"BaseRoleplay initialized with OpenAI: {self.is_openai_available()}")
@@ -193,6 +250,9 @@ class BaseRoleplay:
             expired_sessions = []
             
             for session_id, session_data in self.active_sessions.items():
+                # The registry is shared; only expire this roleplay's sessions
+                if session_data.get('roleplay_id') != self.roleplay_id:
+                    continue
                 try:
                     started_at = datetime.fromisoformat(session_data['started_at'].replace('Z', '+00:00'))
                     if (current_time - started_at).total_seconds() > 3600:  # 1 hour
@@ -310,6 +370,101 @@ class BaseRoleplay:
     
     # ===== SHARED HELPER METHODS FOR SUBCLASSES =====
     
+    def _build_response_context(self, session: Dict, evaluation: Optional[Dict]) -> Dict[str, Any]:
+        """Context passed to generate_roleplay_response; implementations add their own state"""
+        return dict(session.get('user_context', {}))
+    
+    def _start_speculative_response(self, session: Dict, user_input: str,
+                                    on_token: Optional[Callable[[str], None]] = None) -> Optional[SpeculativeResponse]:
+        """
+        Start generating the prospect reply in the background so it overlaps
+        with evaluation. It is given the same context _build_response_context
+        builds for the sequential call, from the session as it stands before
+        evaluation (no stage_performance yet); the prospect prompt reads the
+        persona, the history and the current stage, which evaluation doesn't
+        change. Returns None when OpenAI is unavailable.
+        on_token receives streamed text deltas when the caller wants them,
+        once _resolve_speculative_response() confirms the reply is used.
+        """
+        if not self.is_openai_available():
+            return None
+        
+        speculative = SpeculativeResponse(on_token)
+        kwargs = {'on_token': speculative.push} if on_token else {}
+        
+        try:
+            speculative.future = _turn_executor.submit(
+                self.openai_service.generate_roleplay_response,
+                user_input,
+                list(session['conversation_history']),  # Snapshot - main thread keeps appending
+                self._build_response_context(session, None),
+                session.get('current_stage', 'conversation'),
+                **kwargs
+            )
+            return speculative
+        except Exception as e:
+            logger.warning(f"Could not start speculative response: {e}")
+            return None
+    
+    def _resolve_speculative_response(self, speculative: Optional[SpeculativeResponse]) -> Optional[str]:
+        """
+        The turn continues: stream the held tokens and wait for the speculative reply.
+        Returns None so callers can make the regular call
+        """
+        if speculative is None:
+            return None
+        
+        speculative.release()
+        try:
+            response_result = speculative.future.result(timeout=SPECULATIVE_RESPONSE_TIMEOUT)
+            if response_result and response_result.get('success'):
+                return response_result['response']
+        except Exception as e:
+            logger.warning(f"Speculative response failed: {e}")
+        return None
+    
+    def _generate_prospect_response(self, session: Dict, user_input: str, evaluation: Dict,
+                                    speculative_response: Optional[SpeculativeResponse] = None) -> Optional[str]:
+        """
+        The prospect reply from OpenAI: the speculative one when it succeeded,
+        otherwise the regular call with the post-evaluation context.
+        None when OpenAI is unavailable or failed, so callers use their fallback line.
+        """
+        ai_response = self._resolve_speculative_response(speculative_response)
+        if ai_response:
+            return ai_response
+        
+        if not self.is_openai_available():
+            return None
+        
+        response_result = self.openai_service.generate_roleplay_response(
+            user_input,
+            session['conversation_history'],
+            self._build_response_context(session, evaluation),
+            session['current_stage']
+        )
+        if response_result.get('success'):
+            return response_result['response']
+        return None
+    
+    def _discard_speculative_response(self, speculative: Optional[SpeculativeResponse]):
+        """Drop a speculative reply the turn no longer needs (e.g. hang-up)"""
+        if speculative is not None and not speculative.discard():
+            logger.info("Speculative response discarded after hang-up")
+    
+    def _get_contextual_hangup_response(self, session: Dict, evaluation: Dict) -> str:
+        """Prospect line used when the call ends with a hang-up"""
+        import random
+        
+        responses = [
+            "Sorry, I'm not interested. Goodbye.",
+            "I don't have time for this.",
+            "Please take me off your list.",
+            "I have to go. Bye."
+        ]
+        
+        return random.choice(responses)
+    
     def _get_contextual_initial_response(self, user_context: Dict) -> str:
         """Generate contextual initial response"""
         import random
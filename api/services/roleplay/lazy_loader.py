@@ -0,0 +1,101 @@
+# ===== API/SERVICES/ROLEPLAY/LAZY_LOADER.PY - ON-DEMAND ROLEPLAY IMPLEMENTATIONS =====
+
+import time
+import logging
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LazyRoleplayImplementations(Mapping):
+    """
+    roleplay_id -> implementation, imported and constructed on first use.
+
+    loaders maps each roleplay_id to (module, class name) inside this
+    package. Looking an id up (implementations['1.2'], '1.2' in
+    implementations, .get('1.2')) imports that one module; nothing is
+    imported up front, so cold starts don't pay for the config classes
+    and constants of roleplays nobody has opened yet. Iteration only
+    covers what is already loaded; load_all() loads the rest.
+
+    If an import fails, fallback(roleplay_id) is asked for a stand-in;
+    when it returns None the id is remembered as unavailable.
+    """
+
+    def __init__(self, loaders: Dict[str, Tuple[str, str]], build: Callable[[type], Any],
+                 fallback: Optional[Callable[[str], Any]] = None):
+        self._loaders = dict(loaders)
+        self._build = build
+        self._fallback = fallback
+        self._instances = {}
+        self._unavailable = set()
+        self._load_ms = {}
+        self._lock = threading.Lock()
+
+    def _load(self, roleplay_id: str) -> Optional[Any]:
+        implementation = self._instances.get(roleplay_id)
+        if implementation is not None:
+            return implementation
+        if roleplay_id not in self._loaders or roleplay_id in self._unavailable:
+            return None
+
+        with self._lock:
+            if roleplay_id in self._instances:
+                return self._instances[roleplay_id]
+
+            module_name, class_name = self._loaders[roleplay_id]
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(f'.{module_name}', __package__)
+                implementation = self._build(getattr(module, class_name))
+                logger.info(f"✅ Loaded Roleplay {roleplay_id} in {(time.perf_counter() - started) * 1000:.0f}ms")
+            except ImportError as e:
+                logger.info(f"⏳ Roleplay {roleplay_id} not yet implemented ({e})")
+                implementation = self._fallback(roleplay_id) if self._fallback else None
+            except Exception as e:
+                logger.error(f"❌ Error loading Roleplay {roleplay_id}: {e}")
+                implementation = self._fallback(roleplay_id) if self._fallback else None
+
+            if implementation is None:
+                self._unavailable.add(roleplay_id)
+                return None
+
+            self._load_ms[roleplay_id] = round((time.perf_counter() - started) * 1000, 1)
+            self._instances[roleplay_id] = implementation
+            return implementation
+
+    def __getitem__(self, roleplay_id: str) -> Any:
+        implementation = self._load(roleplay_id)
+        if implementation is None:
+            raise KeyError(roleplay_id)
+        return implementation
+
+    def __contains__(self, roleplay_id: object) -> bool:
+        return isinstance(roleplay_id, str) and self._load(roleplay_id) is not None
+
+    def __iter__(self):
+        # Only what has been loaded: iterating must not import everything
+        return iter(list(self._instances))
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def load_all(self) -> Dict[str, Any]:
+        """Load every declared roleplay (e.g. to list what is really available)"""
+        for roleplay_id in list(self._loaders):
+            self._load(roleplay_id)
+        return {roleplay_id: self._instances[roleplay_id] for roleplay_id in self._loaders if roleplay_id in self._instances}
+
+    def loaded(self) -> Dict[str, Any]:
+        """Implementations constructed so far, without loading any more"""
+        return dict(self._instances)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'declared': list(self._loaders),
+            'loaded': list(self._instances),
+            'unavailable': sorted(self._unavailable),
+            'load_ms': dict(self._load_ms)
+        }
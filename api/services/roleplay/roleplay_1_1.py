@@ -12,8 +12,10 @@ logger = logging.getLogger(__name__)
 class Roleplay11(BaseRoleplay):
     """FIXED Roleplay 1.1 - Practice Mode with Proper Conversation Flow"""
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    supports_token_streaming = True
+    
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay11Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
         
@@ -105,7 +107,7 @@ class Roleplay11(BaseRoleplay):
             logger.error(f"Error creating Roleplay 1.1 session: {e}")
             return {'success': False, 'error': str(e)}
     
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
+    def process_user_input(self, session_id: str, user_input: str, on_token=None) -> Dict[str, Any]:
         """FIXED: Process user input with proper conversation flow"""
         try:
             if session_id not in self.active_sessions:
@@ -135,6 +137,9 @@ class Roleplay11(BaseRoleplay):
             
             logger.info(f"Processing input #{session['turn_count']}: '{user_input[:50]}...'")
             
+            # Generate the prospect reply while the input is being evaluated
+            speculative_response = self._start_speculative_response(session, user_input, on_token)
+            
             # FIXED: Better evaluation logic
             evaluation_stage = self._get_evaluation_stage(session['current_stage'])
             evaluation = self._evaluate_user_input_enhanced(session, user_input, evaluation_stage)
@@ -152,13 +157,14 @@ class Roleplay11(BaseRoleplay):
             should_hang_up = self._should_hang_up_enhanced(session, evaluation, user_input)
             
             if should_hang_up:
+                self._discard_speculative_response(speculative_response)
                 ai_response = self._get_contextual_hangup_response(session, evaluation)
                 session['hang_up_triggered'] = True
                 call_continues = False
                 logger.info(f"Session {session_id}: Call ending due to hang-up")
             else:
                 # Generate contextual AI response
-                ai_response = self._generate_contextual_ai_response(session, user_input, evaluation)
+                ai_response = self._generate_contextual_ai_response(session, user_input, evaluation, speculative_response)
                 
                 # FIXED: Update session state with proper logic
                 self._update_session_state_enhanced(session, evaluation)
@@ -488,31 +494,26 @@ class Roleplay11(BaseRoleplay):
     
     # ===== FIXED AI RESPONSE GENERATION =====
     
-    def _generate_contextual_ai_response(self, session: Dict, user_input: str, evaluation: Dict) -> str:
+    def _build_response_context(self, session: Dict, evaluation: Optional[Dict]) -> Dict[str, Any]:
+        """Enhanced context for AI response"""
+        return {
+            **session['user_context'],
+            'prospect_warmth': session.get('prospect_warmth', 0),
+            'conversation_quality': session.get('conversation_quality', 0),
+            'empathy_shown': session.get('empathy_shown', False),
+            'stage_performance': evaluation,
+            'turn_count': session.get('turn_count', 1),
+            'conversation_started': session.get('conversation_started', False),
+            'attempts_count': session.get('attempts_count', 0)
+        }
+    
+    def _generate_contextual_ai_response(self, session: Dict, user_input: str, evaluation: Dict,
+                                         speculative_response=None) -> str:
         """Generate contextual AI response based on conversation state"""
         try:
-            if self.is_openai_available():
-                # Enhanced context for AI response
-                enhanced_context = {
-                    **session['user_context'],
-                    'prospect_warmth': session.get('prospect_warmth', 0),
-                    'conversation_quality': session.get('conversation_quality', 0),
-                    'empathy_shown': session.get('empathy_shown', False),
-                    'stage_performance': evaluation,
-                    'turn_count': session.get('turn_count', 1),
-                    'conversation_started': session.get('conversation_started', False),
-                    'attempts_count': session.get('attempts_count', 0)
-                }
-                
-                response_result = self.openai_service.generate_roleplay_response(
-                    user_input,
-                    session['conversation_history'],
-                    enhanced_context,
-                    session['current_stage']
-                )
-                
-                if response_result.get('success'):
-                    return response_result['response']
+            ai_response = self._generate_prospect_response(session, user_input, evaluation, speculative_response)
+            if ai_response:
+                return ai_response
             
             # Enhanced fallback response
             return self._get_enhanced_fallback_response(session, evaluation, user_input)
@@ -4,7 +4,7 @@
 import random
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from .base_roleplay import BaseRoleplay
 from .configs.roleplay_1_2_config import Roleplay12Config
@@ -18,8 +18,10 @@ class Roleplay12(BaseRoleplay):
     10 calls, need 6 to pass. Uses enhanced conversation flow from Roleplay 1.1
     """
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    supports_token_streaming = True
+    
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay12Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
 
@@ -106,7 +108,7 @@ class Roleplay12(BaseRoleplay):
             'marathon_status': session_data['marathon_state']
         }
 
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
+    def process_user_input(self, session_id: str, user_input: str, on_token=None) -> Dict[str, Any]:
         """Enhanced user input processing adapted from Roleplay 1.1"""
         try:
             if session_id not in self.active_sessions:
@@ -137,6 +139,9 @@ class Roleplay12(BaseRoleplay):
             
             logger.info(f"Marathon Call #{session['marathon_state']['current_call_number']} Turn #{session['turn_count']}: Processing '{user_input[:50]}...'")
             
+            # Generate the prospect reply while the input is being evaluated
+            speculative_response = self._start_speculative_response(session, user_input, on_token)
+            
             # FIXED: Enhanced evaluation
             evaluation_stage = self._get_evaluation_stage(session['current_stage'])
             evaluation = self._evaluate_user_input_enhanced(session, user_input, evaluation_stage)
@@ -154,11 +159,12 @@ class Roleplay12(BaseRoleplay):
             should_hang_up = self._should_hang_up_marathon(session, evaluation, user_input)
             
             if should_hang_up:
+                self._discard_speculative_response(speculative_response)
                 ai_response = self._get_contextual_hangup_response(session, evaluation)
                 return self._handle_call_failure(session, "Call ended by prospect")
             
             # Generate AI response
-            ai_response = self._generate_contextual_ai_response(session, user_input, evaluation)
+            ai_response = self._generate_contextual_ai_response(session, user_input, evaluation, speculative_response)
             
             # Update session state
             self._update_session_state_marathon(session, evaluation)
@@ -473,29 +479,24 @@ class Roleplay12(BaseRoleplay):
         session['used_objections'].add(objection)
         return objection
 
-    def _generate_contextual_ai_response(self, session: Dict, user_input: str, evaluation: Dict) -> str:
+    def _build_response_context(self, session: Dict, evaluation: Optional[Dict]) -> Dict[str, Any]:
+        return {
+            **session['user_context'],
+            'prospect_warmth': session.get('prospect_warmth', 0),
+            'conversation_quality': session.get('conversation_quality', 0),
+            'stage_performance': evaluation,
+            'turn_count': session.get('turn_count', 1),
+            'call_number': session['marathon_state']['current_call_number'],
+            'marathon_mode': True
+        }
+
+    def _generate_contextual_ai_response(self, session: Dict, user_input: str, evaluation: Dict,
+                                         speculative_response=None) -> str:
         """Generate contextual AI response for marathon mode"""
         try:
-            if self.is_openai_available():
-                enhanced_context = {
-                    **session['user_context'],
-                    'prospect_warmth': session.get('prospect_warmth', 0),
-                    'conversation_quality': session.get('conversation_quality', 0),
-                    'stage_performance': evaluation,
-                    'turn_count': session.get('turn_count', 1),
-                    'call_number': session['marathon_state']['current_call_number'],
-                    'marathon_mode': True
-                }
-                
-                response_result = self.openai_service.generate_roleplay_response(
-                    user_input,
-                    session['conversation_history'],
-                    enhanced_context,
-                    session['current_stage']
-                )
-                
-                if response_result.get('success'):
-                    return response_result['response']
+            ai_response = self._generate_prospect_response(session, user_input, evaluation, speculative_response)
+            if ai_response:
+                return ai_response
             
             return self._get_marathon_fallback_response(session, evaluation, user_input)
             
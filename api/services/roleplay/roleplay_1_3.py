@@ -8,8 +8,8 @@ class Roleplay13(BaseRoleplay):
     The logic for this mode is very strict and will be implemented next.
     For now, it will behave like the base roleplay.
     """
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.roleplay_id = "1.3"
 
     def get_roleplay_info(self) -> dict:
@@ -17,8 +17,8 @@ class Roleplay21(BaseRoleplay):
     Advanced practice covering pitch → objections/questions → qualification → meeting ask
     """
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay21Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
 
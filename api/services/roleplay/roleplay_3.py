@@ -17,8 +17,8 @@ class Roleplay3(BaseRoleplay):
     25 rapid-fire questions to sharpen cold calling skills
     """
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay3Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
 
@@ -4,7 +4,7 @@
 import random
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from .base_roleplay import BaseRoleplay
 from .configs.roleplay_4_config import Roleplay4Config
@@ -17,8 +17,10 @@ class Roleplay4(BaseRoleplay):
     Complete end-to-end cold call from phone pickup to close
     """
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    supports_token_streaming = True
+    
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay4Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
 
@@ -119,7 +121,7 @@ class Roleplay4(BaseRoleplay):
             }
         }
 
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
+    def process_user_input(self, session_id: str, user_input: str, on_token=None) -> Dict[str, Any]:
         """Process user input for complete cold call simulation"""
         try:
             if session_id not in self.active_sessions:
@@ -149,6 +151,9 @@ class Roleplay4(BaseRoleplay):
             
             logger.info(f"Simulation Turn #{session['turn_count']}: Processing '{user_input[:50]}...'")
             
+            # Generate the prospect reply while the input is being evaluated
+            speculative_response = self._start_speculative_response(session, user_input, on_token)
+            
             # Advanced evaluation based on current stage
             evaluation = self._evaluate_simulation_input(session, user_input)
             
@@ -159,11 +164,12 @@ class Roleplay4(BaseRoleplay):
             should_hang_up = self._should_hang_up_simulation(session, evaluation, user_input)
             
             if should_hang_up:
+                self._discard_speculative_response(speculative_response)
                 ai_response = self._get_contextual_hangup_response(session, evaluation)
                 return self._handle_call_failure(session, "Call ended by prospect")
             
             # Generate advanced AI response
-            ai_response = self._generate_simulation_response(session, user_input, evaluation)
+            ai_response = self._generate_simulation_response(session, user_input, evaluation, speculative_response)
             
             # Update session progression
             self._update_session_progression(session, evaluation)
@@ -454,30 +460,25 @@ class Roleplay4(BaseRoleplay):
                 
                 logger.info(f"Simulation: Progressed from {current_stage} to {next_stage}")
 
-    def _generate_simulation_response(self, session: Dict, user_input: str, evaluation: Dict) -> str:
+    def _build_response_context(self, session: Dict, evaluation: Optional[Dict]) -> Dict[str, Any]:
+        return {
+            **session['user_context'],
+            'prospect_personality': session['prospect_personality'],
+            'company_scenario': session['company_scenario'],
+            'trust_level': session.get('trust_level', 0),
+            'interest_level': session.get('interest_level', 0),
+            'conversation_depth': session.get('conversation_depth', 0),
+            'stage_performance': evaluation,
+            'simulation_mode': True
+        }
+
+    def _generate_simulation_response(self, session: Dict, user_input: str, evaluation: Dict,
+                                      speculative_response=None) -> str:
         """Generate contextual response for simulation"""
         try:
-            if self.is_openai_available():
-                enhanced_context = {
-                    **session['user_context'],
-                    'prospect_personality': session['prospect_personality'],
-                    'company_scenario': session['company_scenario'],
-                    'trust_level': session.get('trust_level', 0),
-                    'interest_level': session.get('interest_level', 0),
-                    'conversation_depth': session.get('conversation_depth', 0),
-                    'stage_performance': evaluation,
-                    'simulation_mode': True
-                }
-                
-                response_result = self.openai_service.generate_roleplay_response(
-                    user_input,
-                    session['conversation_history'],
-                    enhanced_context,
-                    session['current_stage']
-                )
-                
-                if response_result.get('success'):
-                    return response_result['response']
+            ai_response = self._generate_prospect_response(session, user_input, evaluation, speculative_response)
+            if ai_response:
+                return ai_response
             
             return self._get_simulation_fallback_response(session, evaluation, user_input)
             
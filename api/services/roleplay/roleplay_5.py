@@ -4,7 +4,7 @@
 import random
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from .base_roleplay import BaseRoleplay
 from .configs.roleplay_5_config import Roleplay5Config
@@ -17,8 +17,10 @@ class Roleplay5(BaseRoleplay):
     10 consecutive advanced cold calls to test endurance and consistency
     """
     
-    def __init__(self, openai_service=None):
-        super().__init__(openai_service)
+    supports_token_streaming = True
+    
+    def __init__(self, openai_service=None, session_registry=None):
+        super().__init__(openai_service, session_registry)
         self.config = Roleplay5Config()
         self.roleplay_id = self.config.ROLEPLAY_ID
 
@@ -132,7 +134,7 @@ class Roleplay5(BaseRoleplay):
             }
         }
 
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
+    def process_user_input(self, session_id: str, user_input: str, on_token=None) -> Dict[str, Any]:
         """Process user input for power hour endurance challenge"""
         try:
             if session_id not in self.active_sessions:
@@ -164,6 +166,9 @@ class Roleplay5(BaseRoleplay):
             current_call = session['power_hour_state']['current_call_number']
             logger.info(f"Power Hour Call #{current_call} Turn #{session['turn_count']}: Processing '{user_input[:50]}...'")
             
+            # Generate the prospect reply while the input is being evaluated
+            speculative_response = self._start_speculative_response(session, user_input, on_token)
+            
             # Advanced evaluation with fatigue factor
             evaluation = self._evaluate_power_hour_input(session, user_input)
             
@@ -174,11 +179,12 @@ class Roleplay5(BaseRoleplay):
             should_hang_up = self._should_hang_up_power_hour(session, evaluation, user_input)
             
             if should_hang_up:
+                self._discard_speculative_response(speculative_response)
                 ai_response = self._get_contextual_hangup_response(session, evaluation)
                 return self._handle_call_failure(session, "Call ended by prospect")
             
             # Generate AI response with increasing difficulty
-            ai_response = self._generate_power_hour_response(session, user_input, evaluation)
+            ai_response = self._generate_power_hour_response(session, user_input, evaluation, speculative_response)
             
             # Update session progression
             self._update_power_hour_progression(session, evaluation)
@@ -624,30 +630,25 @@ class Roleplay5(BaseRoleplay):
         
         return random.choice(responses)
 
-    def _generate_power_hour_response(self, session: Dict, user_input: str, evaluation: Dict) -> str:
+    def _build_response_context(self, session: Dict, evaluation: Optional[Dict]) -> Dict[str, Any]:
+        return {
+            **session['user_context'],
+            'power_hour_challenge': True,
+            'current_call': session['power_hour_state']['current_call_number'],
+            'difficulty_level': session.get('difficulty_progression', 'standard'),
+            'energy_level': session['power_hour_state']['energy_level'],
+            'fatigue_factor': session.get('fatigue_factor', 0),
+            'consecutive_successes': session['power_hour_state']['consecutive_successes'],
+            'endurance_mode': True
+        }
+
+    def _generate_power_hour_response(self, session: Dict, user_input: str, evaluation: Dict,
+                                      speculative_response=None) -> str:
         """Generate AI response with power hour intensity"""
         try:
-            if self.is_openai_available():
-                enhanced_context = {
-                    **session['user_context'],
-                    'power_hour_challenge': True,
-                    'current_call': session['power_hour_state']['current_call_number'],
-                    'difficulty_level': session.get('difficulty_progression', 'standard'),
-                    'energy_level': session['power_hour_state']['energy_level'],
-                    'fatigue_factor': session.get('fatigue_factor', 0),
-                    'consecutive_successes': session['power_hour_state']['consecutive_successes'],
-                    'endurance_mode': True
-                }
-                
-                response_result = self.openai_service.generate_roleplay_response(
-                    user_input,
-                    session['conversation_history'],
-                    enhanced_context,
-                    session['current_stage']
-                )
-                
-                if response_result.get('success'):
-                    return response_result['response']
+            ai_response = self._generate_prospect_response(session, user_input, evaluation, speculative_response)
+            if ai_response:
+                return ai_response
             
             return self._get_power_hour_fallback_response(session, evaluation, user_input)
             
@@ -1,20 +1,54 @@
 # ===== UPDATED: services/roleplay_engine.py =====
 
+import os
+import json
+import time
 import logging
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import uuid
 
 from .supabase_client import SupabaseService
 from .user_progress_service import UserProgressService
+from .session_store import SessionStore, create_session_store
+from .session_log import SessionTurnLog
+from .session_index import SessionIndex
+from .session_reaper import SessionReaper
+from .session_registry import SessionRegistry
+from .roleplay.lazy_loader import LazyRoleplayImplementations
+from models.session import RoleplaySession, to_json_compatible, json_default
 
 logger = logging.getLogger(__name__)
 
+# roleplay_id -> (module in services.roleplay, class name)
+ROLEPLAY_LOADERS = {
+    '1.1': ('roleplay_1_1', 'Roleplay11'),
+    '1.2': ('roleplay_1_2', 'Roleplay12'),
+    '1.3': ('roleplay_1_3', 'Roleplay13'),  # Legend Mode
+    '2.1': ('roleplay_2_1', 'Roleplay21'),  # Advanced Post-Pitch Practice
+    '2.2': ('roleplay_2_2', 'Roleplay22'),  # Advanced Marathon
+    '3': ('roleplay_3', 'Roleplay3'),
+    '4': ('roleplay_4', 'Roleplay4'),
+    '5': ('roleplay_5', 'Roleplay5'),
+}
+# Always served, by BaseRoleplay if their module fails to import
+ESSENTIAL_ROLEPLAYS = ('1.1', '1.2', '2.1')
+
 class RoleplayEngine:
     """Enhanced Roleplay Engine with Roleplay 2.1 support"""
     
-    def __init__(self, openai_service=None, supabase_service=None):
-        self.active_sessions = {}
+    def __init__(self, openai_service=None, supabase_service=None, session_store: Optional[SessionStore] = None):
+        # This worker's working copy of session state, shared with every implementation
+        self.active_sessions = SessionRegistry()
+        # Source of truth for session state
+        self.session_store = session_store or create_session_store()
+        # user_id <-> session_id for the sessions this worker holds
+        self.session_index = SessionIndex()
+        # Ends sessions that have gone idle, off the request path
+        self.session_reaper = SessionReaper(self._reap_session)
+        if os.getenv('SESSION_REAPER_ENABLED', 'true').lower() != 'false':
+            self.session_reaper.start()
         if not openai_service:
             from .openai_service import OpenAIService
             self.openai_service = OpenAIService()
@@ -27,76 +61,35 @@ class RoleplayEngine:
             self.supabase_service = supabase_service
 
         self.progress_service = UserProgressService(self.supabase_service)
+        # Durable copy of session state as an append-only turn log
+        self.session_log = SessionTurnLog(self.supabase_service)
 
-        self.roleplay_implementations = {}
         self._load_roleplay_implementations()
-        logger.info(f"✅ RoleplayEngine initialized with {len(self.roleplay_implementations)} roleplay types")
+        logger.info(f"✅ RoleplayEngine initialized with {len(ROLEPLAY_LOADERS)} roleplay types (loaded on first use)")
     
     def _load_roleplay_implementations(self):
-        """Load all available roleplay implementations"""
-        try:
-            # Import existing roleplays
-            from .roleplay.roleplay_1_1 import Roleplay11
-            from .roleplay.roleplay_1_2 import Roleplay12
-            
-            # Import new Roleplay 2.1
-            from .roleplay.roleplay_2_1 import Roleplay21
-            
-            self.roleplay_implementations = {
-                '1.1': Roleplay11(self.openai_service),
-                '1.2': Roleplay12(self.openai_service),
-                '2.1': Roleplay21(self.openai_service),  # NEW: Advanced Post-Pitch Practice
-            }
-            
-            # Try to load other roleplays if they exist
-            try:
-                from .roleplay.roleplay_1_3 import Roleplay13
-                self.roleplay_implementations['1.3'] = Roleplay13(self.openai_service)
-                logger.info("✅ Loaded Roleplay 1.3 (Legend Mode)")
-            except ImportError:
-                logger.info("⏳ Roleplay 1.3 not yet implemented")
-            
-            try:
-                from .roleplay.roleplay_2_2 import Roleplay22
-                self.roleplay_implementations['2.2'] = Roleplay22(self.openai_service)
-                logger.info("✅ Loaded Roleplay 2.2 (Advanced Marathon)")
-            except ImportError:
-                logger.info("⏳ Roleplay 2.2 not yet implemented")
-            
-            # Try to load direct roleplays (3, 4, 5)
-            for roleplay_id in ['3', '4', '5']:
-                try:
-                    module_name = f'.roleplay.roleplay_{roleplay_id}'
-                    class_name = f'Roleplay{roleplay_id}'
-                    module = __import__(f'services.roleplay.roleplay_{roleplay_id}', fromlist=[class_name])
-                    roleplay_class = getattr(module, class_name)
-                    self.roleplay_implementations[roleplay_id] = roleplay_class(self.openai_service)
-                    logger.info(f"✅ Loaded Roleplay {roleplay_id}")
-                except ImportError:
-                    logger.info(f"⏳ Roleplay {roleplay_id} not yet implemented")
-            
-            logger.info(f"🎮 Loaded roleplay implementations: {list(self.roleplay_implementations.keys())}")
-            
-        except Exception as e:
-            logger.error(f"❌ Error loading roleplay implementations: {e}")
-            # Create fallback implementations
-            self._create_fallback_implementations()
+        """Register every roleplay; each one is imported on first use of its id"""
+        self.roleplay_implementations = LazyRoleplayImplementations(
+            ROLEPLAY_LOADERS,
+            build=lambda roleplay_class: roleplay_class(self.openai_service, self.active_sessions),
+            fallback=self._create_fallback_implementation
+        )
 
-    def _create_fallback_implementations(self):
-        """Create fallback implementations for missing roleplays"""
-        from .base_roleplay import BaseRoleplay
+    def _create_fallback_implementation(self, roleplay_id: str):
+        """Stand-in for an essential roleplay whose module failed to load"""
+        if roleplay_id not in ESSENTIAL_ROLEPLAYS:
+            return None
         
-        essential_roleplays = ['1.1', '1.2', '2.1']
-        for roleplay_id in essential_roleplays:
-            if roleplay_id not in self.roleplay_implementations:
-                logger.warning(f"⚠️ Creating fallback for {roleplay_id}")
-                fallback = BaseRoleplay(self.openai_service)
-                fallback.roleplay_id = roleplay_id
-                self.roleplay_implementations[roleplay_id] = fallback
+        from .roleplay.base_roleplay import BaseRoleplay
+        
+        logger.warning(f"⚠️ Creating fallback for {roleplay_id}")
+        fallback = BaseRoleplay(self.openai_service, self.active_sessions)
+        fallback.roleplay_id = roleplay_id
+        return fallback
 
     def get_available_roleplays(self) -> List[str]:
         """Get list of available roleplay IDs"""
-        return list(self.roleplay_implementations.keys())
+        return list(self.roleplay_implementations.load_all().keys())
     
     def get_roleplay_info(self, roleplay_id: str) -> Dict[str, Any]:
         """Get information about a specific roleplay"""
@@ -204,15 +197,11 @@ class RoleplayEngine:
                 return session_result
             
             session_id = session_result['session_id']
-            session_data = implementation.active_sessions.get(session_id)
             
-            if session_data:
-                # Store the session in the engine's active memory
-                self.active_sessions[session_id] = {
-                    'implementation_id': roleplay_id,
-                    'session_data': session_data,
-                    'user_id': user_id,
-                }
+            if session_id in self.active_sessions:
+                self.active_sessions[session_id] = RoleplaySession.from_dict(self.active_sessions[session_id])
+                self.session_index.bind(session_id, user_id)
+                self._save_session(session_id)
                 logger.info(f"✅ Session {session_id} created and stored in active memory.")
             
             # Log the attempt for progress tracking
@@ -224,33 +213,35 @@ class RoleplayEngine:
             logger.error(f"❌ Error creating roleplay session: {e}", exc_info=True)
             return {'success': False, 'error': f'Failed to create session: {str(e)}'}
 
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
-        """Process user input by delegating to the correct implementation"""
+    def process_user_input(self, session_id: str, user_input: str, on_token=None) -> Dict[str, Any]:
+        """
+        Process user input by delegating to the correct implementation
+        on_token, if given, receives prospect reply deltas as they stream in
+        (only for implementations that support token streaming)
+        """
         try:
             if not session_id or not user_input:
                 return {'success': False, 'error': 'Missing required parameters'}
             
             logger.info(f"💬 Processing input for session {session_id}: '{user_input[:50]}...'")
             
-            session_info = self._get_session_with_recovery(session_id)
-            if not session_info:
+            session_data = self._get_session_with_recovery(session_id)
+            if not session_data:
                 logger.error(f"❌ Session {session_id} not found")
                 return {'success': False, 'error': 'Session not found or expired'}
             
-            implementation_id = session_info['implementation_id']
-            implementation = self.roleplay_implementations[implementation_id]
+            implementation = self.roleplay_implementations[session_data['roleplay_id']]
             
-            session_data = session_info['session_data']
             if not session_data.get('session_active', True):
                 logger.error(f"❌ Session {session_id} is no longer active")
                 return {'success': False, 'error': 'Session has ended'}
             
-            result = implementation.process_user_input(session_id, user_input)
+            if on_token and getattr(implementation, 'supports_token_streaming', False):
+                result = implementation.process_user_input(session_id, user_input, on_token=on_token)
+            else:
+                result = implementation.process_user_input(session_id, user_input)
             
-            if result.get('success'):
-                updated_session_data = implementation.active_sessions.get(session_id)
-                if updated_session_data and session_id in self.active_sessions:
-                    self.active_sessions[session_id]['session_data'] = updated_session_data
+            self._save_session(session_id)
             
             return result
             
@@ -258,30 +249,32 @@ class RoleplayEngine:
             logger.error(f"❌ Error processing user input: {e}", exc_info=True)
             return {'success': False, 'error': f"Processing failed: {str(e)}"}
     
-    def end_session(self, session_id: str, forced_end: bool = False) -> Dict[str, Any]:
-        """End session with enhanced results processing"""
+    def end_session(self, session_id: str, forced_end: bool = False,
+                    claimed_session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        End session with enhanced results processing.
+        claimed_session is session data already taken out of the store (see _reap_session)
+        """
         try:
             logger.info(f"📞 Ending session {session_id} (forced: {forced_end})")
             
-            session_info = self.active_sessions.get(session_id)
-            if not session_info:
+            if claimed_session is not None:
+                session_data = self._adopt_session(session_id, claimed_session)
+            else:
+                session_data = self._get_session_with_recovery(session_id)
+            if not session_data:
                 logger.warning(f"⚠️ Session {session_id} not found in active memory for ending.")
-                for impl in self.roleplay_implementations.values():
-                    if session_id in impl.active_sessions:
-                        session_info = {'session_data': impl.active_sessions.get(session_id)}
-                        break
-            
-            if not session_info:
-                 return {'success': True, 'message': 'Session not found or already ended.'}
+                return {'success': True, 'message': 'Session not found or already ended.'}
 
-            implementation_id = session_info.get('implementation_id', '1.1')
+            implementation_id = session_data.get('roleplay_id', '1.1')
             implementation = self.roleplay_implementations.get(implementation_id)
             
             if not implementation:
                 raise ValueError(f"Implementation for {implementation_id} not found")
 
             # Get the final result from the specific roleplay logic
-            result = implementation.end_session(session_id, forced_end)
+            # Plain dicts from here on: the result is saved and returned as JSON
+            result = to_json_compatible(implementation.end_session(session_id, forced_end))
             
             if result.get('success'):
                 session_data = result.get('session_data', {})
@@ -311,16 +304,23 @@ class RoleplayEngine:
                     if result.get('advanced_results'):
                         completion_data['advanced_results'] = result.get('advanced_results')
                     
-                    # Save completion and update progress
-                    self.progress_service.save_roleplay_completion(completion_data)
-                    self.progress_service.update_user_progress_after_completion(completion_data)
-
-                    logger.info(f"✅ Session {session_id} results have been saved to the database.")
+                    # Save completion and update progress (one transactional RPC)
+                    saved = self.progress_service.record_completion(completion_data)
+                    result['progress_saved'] = saved.get('success', False)
+                    if result['progress_saved']:
+                        logger.info(f"✅ Session {session_id} results have been saved to the database.")
+                    else:
+                        logger.error(f"❌ Session {session_id} results could not be saved "
+                                     f"(completion {saved.get('completion_id') or 'not written'})")
                 else:
                     logger.warning("No user_id found in session data, cannot save progress.")
 
             # Cleanup in-memory session
             self.active_sessions.pop(session_id, None)
+            self.session_index.remove_session(session_id)
+            self.session_reaper.cancel(session_id)
+            self.session_store.delete(session_id)
+            self.session_log.delete(session_id)
             
             logger.info(f"✅ Session {session_id} ended and cleaned from memory.")
             return result
@@ -332,13 +332,11 @@ class RoleplayEngine:
     def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get current status of a session"""
         try:
-            session_info = self._get_session_with_recovery(session_id)
+            session_data = self._get_session_with_recovery(session_id)
             
-            if not session_info:
+            if not session_data:
                 return None
             
-            session_data = session_info['session_data']
-            
             return {
                 'session_active': session_data.get('session_active', False),
                 'current_stage': session_data.get('current_stage', 'unknown'),
@@ -348,7 +346,7 @@ class RoleplayEngine:
                 'user_id': session_data.get('user_id'),
                 'roleplay_id': session_data.get('roleplay_id'),
                 'mode': session_data.get('mode'),
-                'last_activity': session_info.get('last_activity')
+                'last_activity': session_data.get('last_activity_at')
             }
             
         except Exception as e:
@@ -366,60 +364,148 @@ class RoleplayEngine:
         except Exception:
             return False
     
-    def _get_session_with_recovery(self, session_id: str) -> Optional[Dict[str, Any]]:
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Current session data, loaded from the session store"""
+        return self._get_session_with_recovery(session_id)
+    
+    def get_working_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """This worker's copy of a session after a turn, without re-reading the store"""
         return self.active_sessions.get(session_id)
     
+    def get_user_session_id(self, user_id: str) -> Optional[str]:
+        """Live session id for a user, if any"""
+        return self.session_store.get_user_session(user_id)
+    
+    def restore_session(self, session_id: str, session_data: Dict[str, Any]) -> bool:
+        """Put recovered session data (e.g. from the database) back into the store"""
+        user_id = session_data.get('user_id')
+        if not user_id or session_data.get('roleplay_id') not in self.roleplay_implementations:
+            return False
+        self.session_store.put(session_id, user_id, session_data)
+        return self._get_session_with_recovery(session_id) is not None
+    
+    def _get_session_with_recovery(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the session from the store and make it this worker's working copy.
+        Another worker may have served the previous turn, so the store wins.
+        """
+        session_data = self.session_store.get(session_id)
+        if session_data is None:
+            # Not in the store (expired or never saved) - drop any stale local copy
+            self.active_sessions.pop(session_id, None)
+            self.session_index.remove_session(session_id)
+            return None
+        
+        return self._adopt_session(session_id, session_data)
+    
+    def _adopt_session(self, session_id: str, session_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Make stored session data this worker's working copy"""
+        implementation_id = session_data.get('roleplay_id')
+        if implementation_id not in self.roleplay_implementations:
+            logger.error(f"❌ No implementation for session {session_id} (roleplay {implementation_id})")
+            return None
+        
+        session_data = RoleplaySession.coerce(session_data)
+        # The registry is shared, so the implementation sees this copy too
+        self.active_sessions[session_id] = session_data
+        self.session_index.bind(session_id, session_data.get('user_id'))
+        return session_data
+    
+    def recover_session(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild a session missing from the store out of its turn log"""
+        session_data = self.session_log.rebuild(session_id, user_id)
+        if session_data and self.restore_session(session_id, session_data):
+            logger.info(f"✅ Session {session_id} rebuilt from turn log")
+            return self.get_working_session(session_id)
+        return None
+    
+    def _save_session(self, session_id: str) -> None:
+        """Write this worker's copy of the session back to the store and the turn log"""
+        session_data = self.active_sessions.get(session_id)
+        if not session_data:
+            return
+        
+        # Epoch seconds, so expiry checks don't parse timestamps
+        session_data['last_activity_at'] = time.time()
+        self.session_reaper.schedule(session_id)
+        
+        user_id = session_data.get('user_id')
+        # The log records its cursor in session_data, so append before the store write
+        if not self.session_log.append(session_id, user_id, session_data):
+            logger.warning(f"⚠️ Session {session_id} not persisted to turn log")
+        
+        try:
+            self.session_store.put(session_id, user_id, session_data)
+        except Exception as e:
+            logger.error(f"❌ Failed to save session {session_id} to store: {e}")
+    
     def _cleanup_user_sessions(self, user_id: str):
-        sessions_to_remove = [sid for sid, s_info in self.active_sessions.items() if s_info.get('user_id') == user_id]
+        sessions_to_remove = {
+            self.session_index.session_for_user(user_id),
+            self.session_store.get_user_session(user_id)
+        }
+        sessions_to_remove.discard(None)
         for session_id in sessions_to_remove:
             logger.info(f"🧹 Cleaning up stale active session {session_id} for user {user_id}")
             self.active_sessions.pop(session_id, None)
+            self.session_index.remove_session(session_id)
+            self.session_store.delete(session_id)
     
-    def cleanup_old_sessions(self, max_age_hours: int = 24):
-        """Clean up old/abandoned sessions"""
+    def cleanup_old_sessions(self, max_age_hours: int = None):
+        """Reap sessions whose idle deadline has passed (the reaper thread does this on its own)"""
         try:
-            cutoff_time = datetime.now(timezone.utc).timestamp() - (max_age_hours * 3600)
-            sessions_to_remove = []
-            
-            for session_id, session_info in self.active_sessions.items():
-                last_activity_str = session_info.get('last_activity')
-                if last_activity_str:
-                    try:
-                        last_activity = datetime.fromisoformat(last_activity_str.replace('Z', '+00:00'))
-                        if last_activity.timestamp() < cutoff_time:
-                            sessions_to_remove.append(session_id)
-                    except Exception as parse_error:
-                        logger.warning(f"⚠️ Error parsing last_activity for session {session_id}: {parse_error}")
-                        sessions_to_remove.append(session_id)
-            
-            for session_id in sessions_to_remove:
-                try:
-                    self.end_session(session_id, forced_end=True)
-                    logger.info(f"✅ Cleaned up old session: {session_id}")
-                except Exception as cleanup_error:
-                    logger.warning(f"⚠️ Error cleaning up old session {session_id}: {cleanup_error}")
-            
-            if sessions_to_remove:
-                logger.info(f"✅ Cleaned up {len(sessions_to_remove)} old sessions")
-            
-            return len(sessions_to_remove)
-            
+            return self.session_reaper.reap_expired()['reaped']
         except Exception as e:
             logger.error(f"❌ Error cleaning up old sessions: {e}")
             return 0
+    
+    def _reap_session(self, session_id: str) -> Optional[int]:
+        """
+        Reaper callback: end an idle session with forced_end=True.
+        Returns the approximate bytes it held, or None if it was not ended.
+        """
+        session_data = self.get_session(session_id)
+        if not session_data:
+            return None
+        
+        # Another worker may have served a turn since we scheduled this deadline
+        last_activity_at = session_data.get('last_activity_at', 0)
+        if last_activity_at + self.session_reaper.idle_timeout > time.time():
+            self.session_reaper.schedule(session_id, last_activity_at + self.session_reaper.idle_timeout)
+            return None
+        
+        # Every worker runs a reaper; only the one that takes the session out of
+        # the store ends it, so completion and usage are recorded once
+        session_data = self.session_store.take(session_id)
+        if not session_data:
+            return None
+        
+        last_activity_at = session_data.get('last_activity_at', 0)
+        if last_activity_at + self.session_reaper.idle_timeout > time.time():
+            # A turn was saved between the check above and the take
+            self.session_store.put(session_id, session_data.get('user_id'), session_data)
+            self.session_reaper.schedule(session_id, last_activity_at + self.session_reaper.idle_timeout)
+            return None
+        
+        size = len(json.dumps(session_data, default=json_default))
+        logger.info(f"🧹 Reaping idle session {session_id}")
+        self.end_session(session_id, forced_end=True, claimed_session=session_data)
+        return size
 
     def get_user_available_roleplays(self, user_id: str) -> Dict[str, Any]:
         """Get available roleplays for a specific user with access info"""
         try:
             available_roleplays = {}
+            roleplay_ids = self.get_available_roleplays()
+            # One progress query, every rule evaluated in memory
+            access_checks = self.progress_service.evaluate_access(user_id, roleplay_ids)
             
-            for roleplay_id in self.get_available_roleplays():
+            for roleplay_id in roleplay_ids:
                 try:
                     # Get roleplay info
                     roleplay_info = self.get_roleplay_info(roleplay_id)
                     
-                    # Check access
-                    access_check = self.progress_service.check_roleplay_access(user_id, roleplay_id)
+                    access_check = access_checks[roleplay_id]
                     
                     available_roleplays[roleplay_id] = {
                         **roleplay_info,
@@ -440,10 +526,13 @@ class RoleplayEngine:
 
 # Global instance for singleton pattern
 _roleplay_engine = None
+_roleplay_engine_lock = threading.Lock()
 
 def get_roleplay_engine():
     """Get global roleplay engine instance"""
     global _roleplay_engine
     if _roleplay_engine is None:
-        _roleplay_engine = RoleplayEngine()
+        with _roleplay_engine_lock:
+            if _roleplay_engine is None:
+                _roleplay_engine = RoleplayEngine()
     return _roleplay_engine
\ No newline at end of file
@@ -0,0 +1,217 @@
+# ===== API/SERVICES/SCORE_RANK_INDEX.PY - IN-PROCESS RANK / PERCENTILE INDEX =====
+
+import os
+import time
+import logging
+import threading
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SCORE = 100
+DEFAULT_RESOLUTION = 0.1  # scores closer than this share a bucket (and a rank)
+DEFAULT_REFRESH_INTERVAL = 300  # seconds before a roleplay's index is reloaded from the DB
+WARM_PAGE_SIZE = 1000
+
+class FenwickTree:
+    """Counts per bucket with O(log n) point updates and prefix sums"""
+
+    __slots__ = ('size', 'tree')
+
+    def __init__(self, counts: List[int]):
+        # O(n) construction from per-bucket counts
+        self.size = len(counts)
+        self.tree = [0] + list(counts)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, bucket: int, delta: int) -> None:
+        i = bucket + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, bucket: int) -> int:
+        """Sum of buckets 0..bucket (0 for bucket < 0)"""
+        total = 0
+        i = min(bucket, self.size - 1) + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+class RoleplayScoreIndex:
+    """
+    best_score of every participant in one roleplay, bucketed on a Fenwick
+    tree: rank and percentile are O(log buckets), however many users there are.
+    """
+
+    def __init__(self, scores: Dict[str, float], max_score: float, resolution: float):
+        self.max_score = max_score
+        self.resolution = resolution
+        self.scores = {}
+        counts = [0] * (self._bucket(max_score) + 1)
+        for user_id, score in scores.items():
+            if score and score > 0:
+                self.scores[user_id] = score
+                counts[self._bucket(score)] += 1
+        self.tree = FenwickTree(counts)
+
+    def _bucket(self, score: float) -> int:
+        return int(round(min(max(score, 0), self.max_score) / self.resolution))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def set(self, user_id: str, score: float) -> None:
+        previous = self.scores.get(user_id)
+        if previous is not None:
+            self.tree.add(self._bucket(previous), -1)
+        if score and score > 0:
+            self.scores[user_id] = score
+            self.tree.add(self._bucket(score), 1)
+        else:
+            self.scores.pop(user_id, None)
+
+    def rank_of_score(self, score: float) -> int:
+        """1 + number of participants scoring higher (ties share a rank)"""
+        return 1 + len(self.scores) - self.tree.prefix(self._bucket(score))
+
+    def lookup(self, user_id: str) -> Optional[Dict[str, Any]]:
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        bucket = self._bucket(score)
+        total = len(self.scores)
+        below = self.tree.prefix(bucket - 1)
+        return {
+            'rank': 1 + total - self.tree.prefix(bucket),
+            'score': score,
+            # Share of participants with a lower best score
+            'percentile': round(below / total * 100, 1),
+            'total': total
+        }
+
+class ScoreRankIndex:
+    """
+    Optional process-local rank index per roleplay_id (SCORE_RANK_INDEX_ENABLED).
+
+    A roleplay's index is loaded from user_roleplay_progress on first use,
+    updated in place as completions raise best scores on this worker, and
+    reloaded in the background every refresh_interval seconds so it picks up
+    completions handled by other workers. Updates that land while a reload
+    is in flight are replayed onto the new index.
+    """
+
+    def __init__(self, supabase_service, max_score: Optional[float] = None, resolution: Optional[float] = None,
+                 refresh_interval: Optional[int] = None):
+        self.supabase = supabase_service
+        self.max_score = max_score or float(os.getenv('SCORE_RANK_INDEX_MAX_SCORE', str(DEFAULT_MAX_SCORE)))
+        self.resolution = resolution or float(os.getenv('SCORE_RANK_INDEX_RESOLUTION', str(DEFAULT_RESOLUTION)))
+        self.refresh_interval = refresh_interval if refresh_interval is not None else int(
+            os.getenv('SCORE_RANK_INDEX_REFRESH_INTERVAL', str(DEFAULT_REFRESH_INTERVAL))
+        )
+
+        self._indexes = {}  # roleplay_id -> RoleplayScoreIndex
+        self._loaded_at = {}
+        self._pending = {}  # roleplay_id -> [(user_id, score)] while a reload runs
+        self._lock = threading.Lock()
+        self._stats = {'lookups': 0, 'updates': 0, 'loads': 0, 'load_errors': 0}
+
+    # ===== LOOKUP =====
+
+    def lookup(self, roleplay_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """rank/score/percentile/total for a user, or None if the index can't answer"""
+        index = self.get(roleplay_id)
+        if index is None:
+            return None
+        with self._lock:
+            self._stats['lookups'] += 1
+            return index.lookup(user_id) or {'rank': None, 'score': None, 'percentile': None, 'total': len(index)}
+
+    def get(self, roleplay_id: str) -> Optional[RoleplayScoreIndex]:
+        """The roleplay's index, loading it on first use (None if it could not be loaded)"""
+        index = self._indexes.get(roleplay_id)
+        if index is None:
+            return self.load(roleplay_id)
+        if time.time() - self._loaded_at.get(roleplay_id, 0) >= self.refresh_interval:
+            self.load_in_background(roleplay_id)
+        return index
+
+    # ===== UPDATES =====
+
+    def update(self, roleplay_id: str, user_id: str, score: float) -> None:
+        """A user's best_score changed on this worker"""
+        with self._lock:
+            if roleplay_id in self._pending:
+                self._pending[roleplay_id].append((user_id, score))
+            index = self._indexes.get(roleplay_id)
+            if index is not None:
+                index.set(user_id, score)
+                self._stats['updates'] += 1
+
+    # ===== LOADING =====
+
+    def load(self, roleplay_id: str) -> Optional[RoleplayScoreIndex]:
+        with self._lock:
+            if roleplay_id in self._pending:
+                return self._indexes.get(roleplay_id)  # another thread is loading it
+            self._pending[roleplay_id] = []
+
+        started = time.perf_counter()
+        try:
+            index = RoleplayScoreIndex(self._fetch_scores(roleplay_id), self.max_score, self.resolution)
+        except Exception as e:
+            logger.error(f"❌ Error loading rank index for roleplay {roleplay_id}: {e}")
+            with self._lock:
+                self._pending.pop(roleplay_id, None)
+                self._stats['load_errors'] += 1
+            return None
+
+        with self._lock:
+            for user_id, score in self._pending.pop(roleplay_id, []):
+                index.set(user_id, score)
+            self._indexes[roleplay_id] = index
+            self._loaded_at[roleplay_id] = time.time()
+            self._stats['loads'] += 1
+
+        logger.info(f"📊 Rank index for roleplay {roleplay_id}: {len(index)} participants "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return index
+
+    def load_in_background(self, roleplay_id: str) -> None:
+        with self._lock:
+            if roleplay_id in self._pending:
+                return
+        threading.Thread(target=self.load, args=(roleplay_id,), name='score-rank-index', daemon=True).start()
+
+    def _fetch_scores(self, roleplay_id: str) -> Dict[str, float]:
+        client = self.supabase.get_service_client()
+        scores = {}
+        offset = 0
+        while True:
+            response = client.table('user_roleplay_progress').select('user_id,best_score')\
+                .eq('roleplay_id', roleplay_id).gt('best_score', 0)\
+                .order('user_id')\
+                .range(offset, offset + WARM_PAGE_SIZE - 1)\
+                .execute()
+            rows = response.data or []
+            for row in rows:
+                scores[str(row['user_id'])] = row['best_score']
+            if len(rows) < WARM_PAGE_SIZE:
+                return scores
+            offset += WARM_PAGE_SIZE
+
+    # ===== METRICS =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['participants'] = {roleplay_id: len(index) for roleplay_id, index in self._indexes.items()}
+        stats['refresh_interval'] = self.refresh_interval
+        return stats
+
+def is_score_rank_index_enabled() -> bool:
+    return os.getenv('SCORE_RANK_INDEX_ENABLED', 'false').lower() == 'true'
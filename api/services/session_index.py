@@ -0,0 +1,85 @@
+# ===== API/SERVICES/SESSION_INDEX.PY - USER <-> SESSION INDEX =====
+
+import time
+import threading
+from typing import Dict, Any, Optional
+
+class SessionIndex:
+    """
+    Bidirectional session_id <-> user_id map with idle TTL.
+    A user has at most one current session; binding a new one replaces it.
+    Every operation is O(1); expired entries are dropped when they are read.
+    """
+
+    def __init__(self, ttl_seconds: int = 2 * 60 * 60):
+        self.ttl_seconds = ttl_seconds
+        self._user_by_session = {}  # session_id -> (user_id, expires_at)
+        self._session_by_user = {}  # user_id -> session_id
+        self._lock = threading.Lock()
+
+    def bind(self, session_id: str, user_id: str) -> None:
+        with self._lock:
+            previous_session = self._session_by_user.get(user_id)
+            if previous_session and previous_session != session_id:
+                self._user_by_session.pop(previous_session, None)
+
+            previous = self._user_by_session.get(session_id)
+            if previous and previous[0] != user_id and self._session_by_user.get(previous[0]) == session_id:
+                del self._session_by_user[previous[0]]
+
+            self._user_by_session[session_id] = (user_id, time.time() + self.ttl_seconds)
+            self._session_by_user[user_id] = session_id
+
+    def touch(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._user_by_session.get(session_id)
+            if entry:
+                self._user_by_session[session_id] = (entry[0], time.time() + self.ttl_seconds)
+
+    def session_for_user(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            session_id = self._session_by_user.get(user_id)
+            if session_id and self._live(session_id):
+                return session_id
+            return None
+
+    def user_for_session(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            if self._live(session_id):
+                return self._user_by_session[session_id][0]
+            return None
+
+    def remove_session(self, session_id: str) -> Optional[str]:
+        """Unbind a session; returns the user it belonged to"""
+        with self._lock:
+            return self._unbind(session_id)
+
+    def _live(self, session_id: str) -> bool:
+        """Caller holds the lock. Drops the entry if it has expired"""
+        entry = self._user_by_session.get(session_id)
+        if entry is None:
+            return False
+        if entry[1] < time.time():
+            self._unbind(session_id)
+            return False
+        return True
+
+    def _unbind(self, session_id: str) -> Optional[str]:
+        entry = self._user_by_session.pop(session_id, None)
+        if entry is None:
+            return None
+        user_id = entry[0]
+        if self._session_by_user.get(user_id) == session_id:
+            del self._session_by_user[user_id]
+        return user_id
+
+    def __len__(self) -> int:
+        return len(self._user_by_session)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'sessions': len(self._user_by_session),
+                'users': len(self._session_by_user),
+                'ttl_seconds': self.ttl_seconds
+            }
@@ -0,0 +1,188 @@
+# ===== API/SERVICES/SESSION_LOG.PY - APPEND-ONLY SESSION TURN LOG =====
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from models.session import json_default, from_json_compatible
+
+logger = logging.getLogger(__name__)
+
+EVENTS_TABLE = 'roleplay_session_events'
+CURSOR_KEY = '_persist_cursor'
+HISTORY_KEY = 'conversation_history'
+
+def _digest(value: Any) -> str:
+    return hashlib.md5(json.dumps(value, sort_keys=True, default=json_default).encode('utf-8')).hexdigest()[:16]
+
+class SessionTurnLog:
+    """
+    Durable session persistence as an append-only event log.
+
+    Each save writes one 'delta' event holding only the conversation
+    messages added since the last save and the top-level fields whose value
+    changed. Every COMPACT_EVERY events a full 'snapshot' is written and the
+    older events for that session are deleted. Recovery replays the latest
+    snapshot plus the deltas after it.
+
+    What has already been persisted is tracked in session_data[CURSOR_KEY],
+    so the cursor travels with the session between workers.
+    """
+
+    def __init__(self, supabase_service=None, compact_every: Optional[int] = None):
+        self.supabase_service = supabase_service
+        self.compact_every = compact_every or int(os.getenv('SESSION_LOG_COMPACT_EVERY', '20'))
+
+    def is_available(self) -> bool:
+        return self.supabase_service is not None
+
+    # ===== WRITE PATH =====
+
+    def append(self, session_id: str, user_id: str, session_data: Dict[str, Any]) -> bool:
+        """Persist whatever changed since the last append. Returns False on failure"""
+        if not self.is_available():
+            return False
+
+        try:
+            cursor = session_data.get(CURSOR_KEY)
+            history = session_data.get(HISTORY_KEY, [])
+
+            if (cursor is None
+                    or cursor.get('since_snapshot', 0) >= self.compact_every
+                    or len(history) < cursor.get('messages', 0)):
+                return self._write_snapshot(session_id, user_id, session_data)
+
+            fields = self._field_digests(session_data)
+            changed_fields = {
+                key: session_data[key] for key, digest in fields.items()
+                if cursor['fields'].get(key) != digest
+            }
+            removed_fields = [key for key in cursor['fields'] if key not in fields]
+            new_messages = history[cursor['messages']:]
+
+            if not new_messages and not changed_fields and not removed_fields:
+                return True
+
+            payload = {'messages': new_messages, 'fields': changed_fields}
+            if removed_fields:
+                payload['removed'] = removed_fields
+
+            seq = cursor['seq'] + 1
+            if not self._insert_event(session_id, user_id, seq, 'delta', payload):
+                return False
+
+            session_data[CURSOR_KEY] = {
+                'seq': seq,
+                'messages': len(history),
+                'fields': fields,
+                'since_snapshot': cursor.get('since_snapshot', 0) + 1
+            }
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Failed to append session {session_id} to turn log: {e}")
+            return False
+
+    def _write_snapshot(self, session_id: str, user_id: str, session_data: Dict[str, Any]) -> bool:
+        cursor = session_data.get(CURSOR_KEY) or {}
+        seq = cursor.get('seq', 0) + 1
+        snapshot = {key: value for key, value in session_data.items() if key != CURSOR_KEY}
+
+        if not self._insert_event(session_id, user_id, seq, 'snapshot', snapshot):
+            return False
+
+        # Compaction: everything before the snapshot is now redundant
+        if seq > 1:
+            try:
+                self.supabase_service.get_service_client().table(EVENTS_TABLE)\
+                    .delete()\
+                    .eq('session_id', session_id)\
+                    .lt('seq', seq)\
+                    .execute()
+            except Exception as e:
+                logger.warning(f"⚠️ Turn log compaction failed for {session_id}: {e}")
+
+        session_data[CURSOR_KEY] = {
+            'seq': seq,
+            'messages': len(session_data.get(HISTORY_KEY, [])),
+            'fields': self._field_digests(session_data),
+            'since_snapshot': 0
+        }
+        return True
+
+    def _insert_event(self, session_id: str, user_id: str, seq: int, kind: str, payload: Dict) -> bool:
+        record = self.supabase_service.insert_data(EVENTS_TABLE, {
+            'session_id': session_id,
+            'user_id': user_id,
+            'seq': seq,
+            'kind': kind,
+            'payload': json.loads(json.dumps(payload, default=json_default)),
+            'created_at': datetime.now(timezone.utc).isoformat()
+        })
+        return record is not None
+
+    @staticmethod
+    def _field_digests(session_data: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            key: _digest(value) for key, value in session_data.items()
+            if key not in (HISTORY_KEY, CURSOR_KEY)
+        }
+
+    # ===== RECOVERY =====
+
+    def rebuild(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild a session from its latest snapshot and the deltas after it"""
+        if not self.is_available():
+            return None
+
+        events = self.supabase_service.get_data_with_filter(
+            EVENTS_TABLE, 'session_id', session_id,
+            additional_filters={'user_id': user_id},
+            order_by='seq', ascending=True, columns='seq,kind,payload'
+        )
+        return self.replay(events)
+
+    @classmethod
+    def replay(cls, events: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Fold ordered events into session data (None if there is no snapshot)"""
+        snapshot_index = None
+        for index, event in enumerate(events):
+            if event.get('kind') == 'snapshot':
+                snapshot_index = index
+        if snapshot_index is None:
+            return None
+
+        # Payloads were written through json_default; set fields come back as sets
+        session_data = from_json_compatible(dict(events[snapshot_index]['payload']))
+        session_data[HISTORY_KEY] = list(session_data.get(HISTORY_KEY, []))
+
+        for event in events[snapshot_index + 1:]:
+            payload = event.get('payload') or {}
+            session_data[HISTORY_KEY].extend(from_json_compatible(payload.get('messages', [])))
+            session_data.update(from_json_compatible(payload.get('fields', {})))
+            for key in payload.get('removed', []):
+                session_data.pop(key, None)
+
+        last_event = events[-1]
+        session_data[CURSOR_KEY] = {
+            'seq': last_event['seq'],
+            'messages': len(session_data[HISTORY_KEY]),
+            'fields': cls._field_digests(session_data),
+            'since_snapshot': len(events) - snapshot_index - 1
+        }
+        return session_data
+
+    def delete(self, session_id: str) -> None:
+        """Drop a finished session's events (the completion record is kept elsewhere)"""
+        if not self.is_available():
+            return
+        try:
+            self.supabase_service.get_service_client().table(EVENTS_TABLE)\
+                .delete()\
+                .eq('session_id', session_id)\
+                .execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to delete turn log for {session_id}: {e}")
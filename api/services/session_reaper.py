@@ -0,0 +1,130 @@
+# ===== API/SERVICES/SESSION_REAPER.PY - BACKGROUND SESSION EXPIRY =====
+
+import os
+import time
+import heapq
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+class SessionReaper:
+    """
+    Expires idle sessions in deadline order.
+
+    Deadlines live in a min-heap of (expires_at, session_id). Rescheduling
+    a session pushes a new entry and leaves the old one behind; stale
+    entries are recognised on pop because they no longer match
+    _deadlines[session_id]. Each eviction is O(log n).
+
+    on_expire(session_id) is called from the reaper thread (never from a
+    request) and returns the number of bytes the session occupied.
+    """
+
+    def __init__(self, on_expire: Callable[[str], int], idle_timeout: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self.on_expire = on_expire
+        self.idle_timeout = idle_timeout or int(os.getenv('SESSION_IDLE_TIMEOUT', '1800'))
+        self.interval = interval or float(os.getenv('SESSION_REAPER_INTERVAL', '60'))
+
+        self._heap = []  # (expires_at, session_id)
+        self._deadlines = {}  # session_id -> current expires_at
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self._stats = {
+            'reaped': 0,
+            'bytes_reclaimed': 0,
+            'runs': 0,
+            'errors': 0,
+            'last_run_at': None
+        }
+
+    # ===== SCHEDULING =====
+
+    def schedule(self, session_id: str, expires_at: Optional[float] = None) -> None:
+        """(Re)arm a session's deadline, by default idle_timeout from now"""
+        deadline = expires_at if expires_at is not None else time.time() + self.idle_timeout
+        with self._lock:
+            self._deadlines[session_id] = deadline
+            heapq.heappush(self._heap, (deadline, session_id))
+
+            # Stale entries pile up as active sessions are rescheduled every turn
+            if len(self._heap) > 2 * len(self._deadlines) + 64:
+                self._heap = [(d, sid) for sid, d in self._deadlines.items()]
+                heapq.heapify(self._heap)
+
+    def cancel(self, session_id: str) -> None:
+        with self._lock:
+            self._deadlines.pop(session_id, None)
+
+    def _pop_expired(self, now: float) -> List[str]:
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(self._heap)
+                if self._deadlines.get(session_id) == deadline:
+                    del self._deadlines[session_id]
+                    expired.append(session_id)
+        return expired
+
+    # ===== REAPING =====
+
+    def reap_expired(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Finalize every session whose deadline has passed"""
+        expired = self._pop_expired(now if now is not None else time.time())
+        reaped = 0
+        bytes_reclaimed = 0
+        errors = 0
+
+        for session_id in expired:
+            try:
+                freed = self.on_expire(session_id)
+                if freed is not None:
+                    reaped += 1
+                    bytes_reclaimed += freed
+            except Exception as e:
+                errors += 1
+                logger.warning(f"⚠️ Failed to reap session {session_id}: {e}")
+
+        with self._lock:
+            self._stats['reaped'] += reaped
+            self._stats['bytes_reclaimed'] += bytes_reclaimed
+            self._stats['errors'] += errors
+            self._stats['runs'] += 1
+            self._stats['last_run_at'] = time.time()
+
+        if reaped:
+            logger.info(f"🧹 Reaped {reaped} idle sessions, reclaimed ~{bytes_reclaimed / 1024:.1f} KB")
+
+        return {'reaped': reaped, 'bytes_reclaimed': bytes_reclaimed, 'errors': errors}
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            try:
+                self.reap_expired()
+            except Exception as e:
+                logger.error(f"❌ Session reaper run failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='session-reaper', daemon=True)
+            self._thread.start()
+            logger.info(f"🧹 Session reaper started (idle timeout {self.idle_timeout}s, every {self.interval}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tracked_sessions'] = len(self._deadlines)
+            stats['heap_size'] = len(self._heap)
+            stats['next_expiry_in'] = round(self._heap[0][0] - time.time(), 1) if self._heap else None
+        stats['idle_timeout'] = self.idle_timeout
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        return stats
@@ -0,0 +1,32 @@
+# ===== API/SERVICES/SESSION_REGISTRY.PY - SHARED IN-PROCESS SESSION REGISTRY =====
+
+from typing import Dict, Any, List
+
+class SessionRegistry(dict):
+    """
+    The one in-process map of session_id -> session_data.
+
+    The engine owns it and hands the same instance to every roleplay
+    implementation as its active_sessions, so a session's state is held
+    once and any session can be found with a single lookup. The owning
+    implementation and user come from session_data['roleplay_id'] and
+    session_data['user_id'].
+    """
+
+    def items(self):
+        # Snapshot, so callers can iterate while request threads add or end sessions
+        return list(dict.items(self))
+
+    def for_roleplay(self, roleplay_id: str) -> List[str]:
+        """Session ids belonging to one roleplay implementation"""
+        return [
+            session_id for session_id, session_data in self.items()
+            if session_data.get('roleplay_id') == roleplay_id
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_roleplay = {}
+        for _, session_data in self.items():
+            roleplay_id = session_data.get('roleplay_id', 'unknown')
+            by_roleplay[roleplay_id] = by_roleplay.get(roleplay_id, 0) + 1
+        return {'sessions': len(self), 'by_roleplay': by_roleplay}
@@ -0,0 +1,252 @@
+# ===== API/SERVICES/SESSION_STORE.PY - ROLEPLAY SESSION STORAGE =====
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from .session_index import SessionIndex
+from models.session import json_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_TTL = 2 * 60 * 60  # 2 hours idle
+DEFAULT_MAX_SESSIONS = 5000
+
+class SessionStore:
+    """
+    Storage for active roleplay session state.
+    The engine reads a session from here at the start of every turn and
+    writes it back at the end, so with a shared backend any worker can
+    serve any turn.
+    """
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, user_id: str, session_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def take(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove a session and return its data. When several workers race for
+        the same session only one of them gets it, the others get None
+        """
+        raise NotImplementedError
+
+    def touch(self, session_id: str) -> None:
+        """Extend a session's TTL without rewriting it"""
+        raise NotImplementedError
+
+    def get_user_session(self, user_id: str) -> Optional[str]:
+        """Most recently stored live session id for a user"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': type(self).__name__}
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU with idle TTL. Single worker only"""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl_seconds: int = DEFAULT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session_id -> (user_id, session_data, expires_at)
+        self._index = SessionIndex(ttl_seconds)
+        self._lock = threading.RLock()
+        self._evictions = 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if entry[2] < time.time():
+                self._remove(session_id)
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id: str, user_id: str, session_data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[session_id] = (user_id, session_data, time.time() + self.ttl_seconds)
+            self._sessions.move_to_end(session_id)
+            self._index.bind(session_id, user_id)
+
+            while len(self._sessions) > self.max_sessions:
+                oldest_id = next(iter(self._sessions))
+                self._remove(oldest_id)
+                self._evictions += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._remove(session_id)
+
+    def take(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session_data = self.get(session_id)
+            if session_data is not None:
+                self._remove(session_id)
+            return session_data
+
+    def touch(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions[session_id] = (entry[0], entry[1], time.time() + self.ttl_seconds)
+                self._sessions.move_to_end(session_id)
+                self._index.touch(session_id)
+
+    def get_user_session(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            session_id = self._index.session_for_user(user_id)
+            if session_id and self.get(session_id) is not None:
+                return session_id
+            return None
+
+    def _remove(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self._index.remove_session(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self._evictions
+            }
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Shared-file backend: every worker process on the host opens the same
+    SQLite database (WAL mode), so a turn can land on any worker.
+    """
+
+    PURGE_EVERY = 200  # puts between expired-row sweeps
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = DEFAULT_SESSION_TTL):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'roleplay_sessions.db')
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._puts = 0
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS roleplay_sessions ('
+            ' session_id TEXT PRIMARY KEY,'
+            ' user_id TEXT NOT NULL,'
+            ' session_data TEXT NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_roleplay_sessions_user ON roleplay_sessions (user_id, updated_at)')
+        conn.commit()
+        logger.info(f"🗄️ SQLite session store at {self.path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA busy_timeout=5000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT session_data FROM roleplay_sessions WHERE session_id = ? AND expires_at > ?',
+            (session_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, user_id: str, session_data: Dict[str, Any]) -> None:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO roleplay_sessions (session_id, user_id, session_data, updated_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (session_id, user_id, json.dumps(session_data, default=json_default), now, now + self.ttl_seconds)
+            )
+
+        self._puts += 1
+        if self._puts % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM roleplay_sessions WHERE session_id = ?', (session_id,))
+
+    def take(self, session_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        # Write lock up front, so no other worker reads the row between our SELECT and DELETE
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT session_data FROM roleplay_sessions WHERE session_id = ? AND expires_at > ?',
+                (session_id, time.time())
+            ).fetchone()
+            conn.execute('DELETE FROM roleplay_sessions WHERE session_id = ?', (session_id,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return json.loads(row[0]) if row else None
+
+    def touch(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'UPDATE roleplay_sessions SET expires_at = ? WHERE session_id = ?',
+                (time.time() + self.ttl_seconds, session_id)
+            )
+
+    def get_user_session(self, user_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            'SELECT session_id FROM roleplay_sessions WHERE user_id = ? AND expires_at > ? '
+            'ORDER BY updated_at DESC LIMIT 1',
+            (user_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def purge_expired(self) -> int:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute('DELETE FROM roleplay_sessions WHERE expires_at <= ?', (time.time(),))
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        count = self._connection().execute(
+            'SELECT COUNT(*) FROM roleplay_sessions WHERE expires_at > ?', (time.time(),)
+        ).fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'sessions': count,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+def create_session_store() -> SessionStore:
+    """Build the store selected by SESSION_STORE_BACKEND (memory | sqlite)"""
+    backend = os.getenv('SESSION_STORE_BACKEND', 'memory').lower()
+    ttl_seconds = int(os.getenv('SESSION_TTL_SECONDS', str(DEFAULT_SESSION_TTL)))
+
+    if backend == 'sqlite':
+        try:
+            return SQLiteSessionStore(os.getenv('SESSION_STORE_PATH'), ttl_seconds)
+        except Exception as e:
+            logger.error(f"❌ SQLite session store unavailable, falling back to memory: {e}")
+
+    return InMemorySessionStore(int(os.getenv('SESSION_STORE_MAX_SESSIONS', str(DEFAULT_MAX_SESSIONS))), ttl_seconds)
@@ -6,6 +6,8 @@ from typing import Optional, Dict, Any, List, Union
 import logging
 import json
 
+from .profile_cache import get_profile_cache
+
 logger = logging.getLogger(__name__)
 
 class SupabaseService:
@@ -50,6 +52,10 @@ class SupabaseService:
             logger.error(f"Auth error: {e}")
             return None
     def get_user_profile_by_service(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Profile via the service client, served from the profile cache when possible"""
+        return get_profile_cache().get(user_id, self._fetch_user_profile_by_service)
+    
+    def _fetch_user_profile_by_service(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
             response = self.service_client.table('user_profiles').select('*').eq('id', user_id).single().execute()
             return response.data
@@ -90,6 +96,7 @@ class SupabaseService:
     def create_user_profile(self, profile_data: Dict[str, Any]) -> bool:
         try:
             response = self.service_client.table('user_profiles').insert(profile_data).execute()
+            get_profile_cache().invalidate(profile_data.get('id'))
             return bool(response.data)
         except Exception as e:
             logger.error(f"Error creating user profile: {e}")
@@ -99,6 +106,7 @@ class SupabaseService:
         try:
             updates['updated_at'] = 'NOW()'
             response = self.client.table('user_profiles').update(updates).eq('id', user_id).execute()
+            get_profile_cache().invalidate(user_id)
             return bool(response.data)
         except Exception as e:
             logger.error(f"Error updating user profile: {e}")
@@ -223,10 +231,10 @@ class SupabaseService:
             logger.error(f"Exception during upsert to '{table_name}': {e}", exc_info=True)
             return None
 
-    def get_data_with_filter(self, table_name: str, filter_column: str, filter_value: Any, additional_filters: Dict = None, limit: int = None, order_by: str = None, ascending: bool = True) -> List[Dict[str, Any]]:
-        """Get data from a table with filters using the service client."""
+    def get_data_with_filter(self, table_name: str, filter_column: str, filter_value: Any, additional_filters: Dict = None, limit: int = None, order_by: str = None, ascending: bool = True, columns: str = '*') -> List[Dict[str, Any]]:
+        """Get data from a table with filters using the service client. columns limits what is fetched."""
         try:
-            query = self.service_client.table(table_name).select('*').eq(filter_column, filter_value)
+            query = self.service_client.table(table_name).select(columns).eq(filter_column, filter_value)
             if additional_filters:
                 for col, val in additional_filters.items():
                     query = query.eq(col, val)
@@ -264,6 +272,8 @@ class SupabaseService:
             for col, val in id_filter.items():
                 query = query.eq(col, val)
             response = query.execute()
+            if table_name == 'user_profiles':
+                get_profile_cache().invalidate(id_filter.get('id'))
             # FIX: Check if response.data exists and has content
             if response.data:
                 logger.info(f"Update successful for table '{table_name}' with filter {id_filter}")
@@ -274,11 +284,11 @@ class SupabaseService:
         except Exception as e:
             logger.error(f"Exception during update in '{table_name}': {e}", exc_info=True)
             return False
-    def get_user_sessions(self, user_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_user_sessions(self, user_id: str, limit: int = 20, offset: int = 0, columns: str = '*') -> List[Dict[str, Any]]:
         """Get user's voice sessions (LEGACY)"""
         try:
             response = self.service_client.table('voice_sessions')\
-                .select('*')\
+                .select(columns)\
                 .eq('user_id', user_id)\
                 .order('created_at', desc=True)\
                 .range(offset, offset + limit - 1)\
@@ -305,18 +315,29 @@ class SupabaseService:
         updates['updated_at'] = datetime.now(timezone.utc).isoformat()
         try:
             response = self.service_client.table('user_profiles').update(updates).eq('id', user_id).execute()
+            get_profile_cache().invalidate(user_id)
             return bool(response.data)
         except Exception as e:
             logger.error(f"Error updating user profile by service: {e}")
             return False
-    def get_user_completions(self, user_id: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_user_completions(self, user_id: str, limit: int = 20, offset: int = 0, columns: str = '*') -> List[Dict[str, Any]]:
+        """Page of a user's completions, newest first. Pass columns to skip the transcript blobs."""
         try:
-            response = self.service_client.table('roleplay_completions').select('*').eq('user_id', user_id).order('completed_at', desc=True).range(offset, offset + limit - 1).execute()
+            response = self.service_client.table('roleplay_completions').select(columns).eq('user_id', user_id).order('completed_at', desc=True).range(offset, offset + limit - 1).execute()
             return response.data or []
         except Exception as e:
             logger.error(f"Error getting user completions: {e}")
             return []
 
+    def get_user_completion(self, user_id: str, completion_id: str, columns: str = '*') -> Optional[Dict[str, Any]]:
+        """One of a user's completions by id (None if it isn't theirs or doesn't exist)"""
+        try:
+            response = self.service_client.table('roleplay_completions').select(columns).eq('id', completion_id).eq('user_id', user_id).limit(1).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Error getting completion {completion_id}: {e}")
+            return None
+
     def get_completion_count(self, user_id: str) -> int:
         try:
             response = self.service_client.table('roleplay_completions').select('id', count='exact').eq('user_id', user_id).execute()
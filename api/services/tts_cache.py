@@ -0,0 +1,183 @@
+# ===== API/SERVICES/TTS_CACHE.PY - CONTENT-ADDRESSED TTS AUDIO CACHE =====
+
+import os
+import mmap
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024  # 32 MB
+
+def normalize_tts_text(text: str) -> str:
+    """Runs of whitespace don't change the audio, so they don't change the key either"""
+    return ' '.join(str(text).split())
+
+def make_cache_key(text: str, voice_id: str, voice_settings: Dict, model_id: str) -> str:
+    """Content address for a synthesized line: same inputs, same audio"""
+    payload = json.dumps({
+        'text': normalize_tts_text(text),
+        'voice_id': voice_id,
+        'voice_settings': voice_settings or {},
+        'model_id': model_id
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class TTSAudioCache:
+    """
+    Two-tier audio cache:
+    - memory: LRU bounded by total bytes
+    - disk (optional): one file per key, read back through mmap and promoted to memory
+    """
+
+    def __init__(self, max_memory_bytes: Optional[int] = None, disk_dir: Optional[str] = None):
+        self.max_memory_bytes = max_memory_bytes if max_memory_bytes is not None else int(
+            os.getenv('TTS_CACHE_MAX_BYTES', str(DEFAULT_MEMORY_BYTES))
+        )
+        self.disk_dir = disk_dir if disk_dir is not None else os.getenv('TTS_CACHE_DIR')
+
+        self._entries = OrderedDict()  # key -> bytes, oldest first
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'disk_writes': 0,
+            'disk_errors': 0
+        }
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                logger.info(f"🗄️ TTS disk cache enabled at {self.disk_dir}")
+            except OSError as e:
+                logger.warning(f"⚠️ TTS disk cache unavailable ({e}), memory tier only")
+                self.disk_dir = None
+
+    # ===== LOOKUP =====
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio or None. Disk hits are promoted to memory"""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return audio
+
+        audio = self._read_from_disk(key)
+        with self._lock:
+            if audio is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+            self._store_in_memory(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio in memory and, when enabled, on disk"""
+        if not audio:
+            return
+
+        with self._lock:
+            self._store_in_memory(key, audio)
+
+        self._write_to_disk(key, audio)
+
+    # ===== MEMORY TIER =====
+
+    def _store_in_memory(self, key: str, audio: bytes) -> None:
+        """Insert under lock, evicting least recently used entries past the byte budget"""
+        if len(audio) > self.max_memory_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        self._entries[key] = audio
+        self._memory_bytes += len(audio)
+
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats['evictions'] += 1
+
+    # ===== DISK TIER =====
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.mp3")
+
+    def _read_from_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return bytes(mapped)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ TTS disk cache read failed for {key[:12]}: {e}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+            return None
+
+    def _write_to_disk(self, key: str, audio: bytes) -> None:
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so readers never map a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            with self._lock:
+                self._stats['disk_writes'] += 1
+        except OSError as e:
+            logger.warning(f"⚠️ TTS disk cache write failed for {key[:12]}: {e}")
+            with self._lock:
+                self._stats['disk_errors'] += 1
+
+    # ===== STATS =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = self._memory_bytes
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['max_memory_bytes'] = self.max_memory_bytes
+        stats['disk_enabled'] = bool(self.disk_dir)
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Drop the memory tier (disk files are left in place)"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
@@ -5,8 +5,23 @@ from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import json
 from datetime import datetime, timedelta, timezone
+
+from .profile_cache import get_profile_cache
+from .leaderboard_service import get_leaderboard_service
+from .progression_graph import ProgressionGraph
+from .user_stats_rollup import get_user_stats_rollup
+
 logger = logging.getLogger(__name__)
 
+ALL_ROLEPLAY_IDS = ['1.1', '1.2', '1.3', '2.1', '2.2', '3', '4', '5']
+
+COMPLETION_RPC = 'record_roleplay_completion'
+
+def _is_missing_function(error: Exception) -> bool:
+    """PostgREST's answer when the migration defining the RPC hasn't been applied"""
+    message = str(error)
+    return 'PGRST202' in message or 'Could not find the function' in message
+
 class UserProgressService:
     """Service for managing user roleplay progress and achievements"""
     
@@ -64,7 +79,9 @@ class UserProgressService:
             'description': 'Ultimate endurance test'
         }
     }
-    logger.info("UserProgressService initialized with enhanced progression rules")
+        # Compiled once per service; access checks and unlocks walk this graph
+        self.progression_graph = ProgressionGraph(self.progression_rules)
+        logger.info("UserProgressService initialized with enhanced progression rules")
 
     def get_user_roleplay_stats(self, user_id: str, roleplay_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -91,80 +108,47 @@ class UserProgressService:
     def check_roleplay_access(self, user_id: str, roleplay_id: str) -> Dict[str, Any]:
         """Enhanced access check with detailed reasoning"""
         try:
-            # Always available roleplays
-            always_available = ['1.1', '1.2', '3']
-            if roleplay_id in always_available:
-                return {'allowed': True, 'reason': 'Always available'}
-            
-            # Check progression rules
-            rule = self.progression_rules.get(roleplay_id)
-            if not rule:
-                return {'allowed': True, 'reason': 'No specific unlock requirement'}
-
+            rule = self.progression_rules.get(roleplay_id) or {}
             required_rp_id = rule.get('requires_completion')
-            if not required_rp_id:
-                return {'allowed': True, 'reason': 'No prerequisite required'}
-                
-            # Get user's progress on required roleplay
-            user_stats = self.get_user_roleplay_stats(user_id, required_rp_id)
-            required_stats = user_stats.get(required_rp_id)
-            
-            if not required_stats:
-                return {
-                    'allowed': False, 
-                    'reason': f'Complete {rule.get("description", required_rp_id)} first',
-                    'required_roleplay': required_rp_id,
-                    'required_name': rule.get('name', f'Roleplay {required_rp_id}')
-                }
-            
-            # ENHANCED: Check specific pass conditions for each roleplay type
-            if required_rp_id == '1.2':  # Marathon Mode
-                # For 2.1 and 1.3, check marathon_passed flag
-                if not required_stats.get('marathon_passed', False):
-                    return {
-                        'allowed': False,
-                        'reason': f'Pass Marathon Mode (6/10 calls) to unlock {roleplay_id}',
-                        'required_roleplay': required_rp_id,
-                        'required_name': 'Marathon Mode',
-                        'current_progress': f"{required_stats.get('marathon_best_run', 0)}/10 calls passed"
-                    }
-            elif required_rp_id == '1.3':  # Legend Mode
-                if not required_stats.get('legend_completed', False):
-                    return {
-                        'allowed': False,
-                        'reason': f'Complete Legend Mode to unlock {roleplay_id}',
-                        'required_roleplay': required_rp_id,
-                        'required_name': 'Legend Mode'
-                    }
-            elif required_rp_id == '2.1':  # Post-Pitch Practice
-                # Check if user has passed 2.1 (score >= 70)
-                if not required_stats.get('best_score', 0) >= 70:
-                    return {
-                        'allowed': False,
-                        'reason': f'Pass Post-Pitch Practice (70+ score) to unlock {roleplay_id}',
-                        'required_roleplay': required_rp_id,
-                        'required_name': 'Post-Pitch Practice',
-                        'current_progress': f"Best score: {required_stats.get('best_score', 0)}/100"
-                    }
-            else:
-                # Generic completion check
-                if not required_stats.get('completed', False):
-                    return {
-                        'allowed': False,
-                        'reason': f'Complete {required_rp_id} to unlock {roleplay_id}',
-                        'required_roleplay': required_rp_id
-                    }
-
-            return {
-                'allowed': True, 
-                'reason': 'Requirement met',
-                'unlocked_by': required_rp_id
-            }
+            user_stats = self.get_user_roleplay_stats(user_id, required_rp_id) if required_rp_id else {}
+            return self._evaluate_access(roleplay_id, user_stats)
             
         except Exception as e:
             logger.error(f"Error in check_roleplay_access for {roleplay_id}: {e}", exc_info=True)
             return {'allowed': False, 'reason': 'Error checking access'}
 
+    def evaluate_access(self, user_id: str, roleplay_ids: Optional[List[str]] = None,
+                        user_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Access for many roleplays at once: roleplay_id -> check_roleplay_access() result.
+        Loads the user's progress rows in one query (or uses user_stats, as returned
+        by get_user_roleplay_stats) and evaluates every rule in memory.
+        """
+        roleplay_ids = list(roleplay_ids or ALL_ROLEPLAY_IDS)
+        try:
+            if user_stats is None:
+                user_stats = self.get_user_roleplay_stats(user_id)
+        except Exception as e:
+            logger.error(f"Error loading progress for access checks: {e}", exc_info=True)
+            return {roleplay_id: {'allowed': False, 'reason': 'Error checking access'} for roleplay_id in roleplay_ids}
+
+        # Unlocks a completion couldn't write (record_roleplay_completion() only
+        # unlocks direct children): rare, and found from rows already loaded
+        self._sync_unlocks(user_id, user_stats)
+
+        access = {}
+        for roleplay_id in roleplay_ids:
+            try:
+                access[roleplay_id] = self._evaluate_access(roleplay_id, user_stats)
+            except Exception as e:
+                logger.error(f"Error in access check for {roleplay_id}: {e}", exc_info=True)
+                access[roleplay_id] = {'allowed': False, 'reason': 'Error checking access'}
+        return access
+
+    def _evaluate_access(self, roleplay_id: str, user_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Access decision for one roleplay given the user's progress rows (roleplay_id -> row)"""
+        return self.progression_graph.evaluate(roleplay_id, user_stats)
+
     def get_user_roleplay_progress(self, user_id: str, roleplay_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get user's progress for specific roleplays or all roleplays"""
         try:
@@ -178,8 +162,15 @@ class UserProgressService:
                 query = query.in_('roleplay_id', roleplay_ids)
             
             progress_records = query.execute().data or []
+            return self.format_roleplay_progress(progress_records)
             
-            # Build the progress dictionary
+        except Exception as e:
+            logger.error(f"Error getting user roleplay progress: {e}", exc_info=True)
+            return {}
+
+    def format_roleplay_progress(self, progress_records) -> Dict[str, Any]:
+        """Build the progress dictionary from user_roleplay_progress rows"""
+        try:
             progress = {}
             for record in progress_records:
                 roleplay_id = record['roleplay_id']
@@ -214,7 +205,7 @@ class UserProgressService:
             return progress
             
         except Exception as e:
-            logger.error(f"Error getting user roleplay progress: {e}", exc_info=True)
+            logger.error(f"Error formatting user roleplay progress: {e}", exc_info=True)
             return {}
 
     def _determine_completion_status(self, roleplay_id: str, progress_record: Dict, completions: List[Dict]) -> bool:
@@ -309,6 +300,64 @@ class UserProgressService:
         except Exception as e:
             logger.error(f"❌ Exception in save_roleplay_completion: {e}", exc_info=True)
             return None
+
+    def record_completion(self, completion_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write everything a finished session changes through record_roleplay_completion()
+        (see migrations/supabase_schema.sql): the completion row, stats rollup,
+        progress stats, Marathon Pass rewards, direct unlocks and usage minutes,
+        in one round-trip and one transaction. Unlocks further down the graph
+        are written the next time evaluate_access() loads the user's progress.
+        Returns {'success', 'completion_id', 'unlocked'}.
+        """
+        result = {'success': False, 'completion_id': None, 'unlocked': []}
+        if not self.supabase:
+            return result
+
+        user_id = completion_data.get('user_id')
+        roleplay_id = completion_data.get('roleplay_id')
+        if not all([user_id, roleplay_id, completion_data.get('score') is not None]):
+            # Nothing for the progress tables; keep whatever the legacy path records
+            return self._record_completion_legacy(completion_data)
+
+        try:
+            response = self.supabase.get_service_client().rpc(COMPLETION_RPC, {
+                'p_completion': completion_data,
+                'p_pass_rule': self.progression_graph.pass_requirement(roleplay_id).kind,
+                'p_unlock_ids': self.progression_graph.children.get(roleplay_id, [])
+            }).execute()
+        except Exception as e:
+            if _is_missing_function(e):
+                logger.warning(f"⚠️ {COMPLETION_RPC} RPC unavailable, writing completion step by step: {e}")
+            else:
+                # The transaction rolled back, so nothing of this completion is saved yet
+                logger.error(f"❌ {COMPLETION_RPC} failed for user {user_id}, retrying step by step: {e}", exc_info=True)
+            return self._record_completion_legacy(completion_data)
+
+        data = response.data or {}
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        progress = data.get('progress') or {}
+        previous_best = data.get('previous_best_score') or 0
+        if (progress.get('best_score') or 0) > previous_best:
+            get_leaderboard_service(self.supabase).record_best_score(
+                roleplay_id, user_id, progress, data.get('previous_best_score')
+            )
+        get_profile_cache().invalidate(user_id)
+
+        unlocked = data.get('unlocked') or []
+        if unlocked:
+            logger.info(f"Unlocked Roleplays {unlocked} for user {user_id}")
+        logger.info(f"✅ Recorded completion {data.get('completion_id')} for user {user_id} on roleplay {roleplay_id}")
+        return {'success': True, 'completion_id': data.get('completion_id'), 'unlocked': unlocked}
+
+    def _record_completion_legacy(self, completion_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Pre-migration path: one write per table"""
+        completion_id = self.save_roleplay_completion(completion_data)
+        if completion_id:
+            get_user_stats_rollup(self.supabase).record_completion(completion_data)
+        updated = self.update_user_progress_after_completion(completion_data)
+        return {'success': bool(completion_id) and updated, 'completion_id': completion_id, 'unlocked': []}
         
     def update_user_progress_after_completion(self, completion_data: Dict[str, Any]) -> bool:
         """Enhanced progress update with Roleplay 2.1 unlocking"""
@@ -330,7 +379,7 @@ class UserProgressService:
             
             # --- ENHANCED: Marathon Mode completion unlocks 2.1 ---
             if roleplay_id == '1.2' and marathon_results.get('marathon_passed', False):
-                logger.info(f"Marathon passed for user {user_id}. Unlocking Roleplay 2.1 and advanced content.")
+                logger.info(f"Marathon passed for user {user_id}. Granting Marathon Pass rewards.")
                 
                 unlock_timestamp = datetime.now(timezone.utc)
                 twenty_four_hours_from_now = (unlock_timestamp + timedelta(hours=24)).isoformat()
@@ -344,46 +393,12 @@ class UserProgressService:
                 }
                 self.supabase.update_data_by_id('user_profiles', {'id': user_id}, profile_updates)
                 
-                # Create initial progress record for 2.1
-                try:
-                    client.table('user_roleplay_progress').insert({
-                        'user_id': user_id,
-                        'roleplay_id': '2.1',
-                        'is_unlocked': True,
-                        'unlocked_at': unlock_timestamp.isoformat(),
-                        'unlocked_by': '1.2',
-                        'created_at': unlock_timestamp.isoformat()
-                    }).execute()
-                    logger.info(f"Created initial progress record for Roleplay 2.1 for user {user_id}")
-                except Exception as insert_error:
-                    logger.warning(f"Could not create 2.1 progress record: {insert_error}")
-                
                 logger.info(f"User {user_id} profile updated with Marathon Pass rewards and 2.1 access.")
 
-            # --- ENHANCED: Roleplay 2.1 completion unlocks further content ---
-            if roleplay_id == '2.1' and score >= 70:
-                logger.info(f"Post-Pitch Practice passed for user {user_id}. Unlocking advanced roleplays.")
-                
-                unlock_timestamp = datetime.now(timezone.utc)
-                
-                # Unlock 2.2 and 4
-                for unlock_id in ['2.2', '4']:
-                    try:
-                        client.table('user_roleplay_progress').insert({
-                            'user_id': user_id,
-                            'roleplay_id': unlock_id,
-                            'is_unlocked': True,
-                            'unlocked_at': unlock_timestamp.isoformat(),
-                            'unlocked_by': '2.1',
-                            'created_at': unlock_timestamp.isoformat()
-                        }).execute()
-                        logger.info(f"Unlocked Roleplay {unlock_id} for user {user_id}")
-                    except Exception as unlock_error:
-                        logger.warning(f"Could not unlock {unlock_id}: {unlock_error}")
-
-            # Update user_roleplay_progress (main stats)
-            current_stats_dict = self.get_user_roleplay_stats(user_id, roleplay_id)
-            current_stats = current_stats_dict.get(roleplay_id)
+            # Update user_roleplay_progress (main stats). All of the user's rows:
+            # unlock propagation below needs the other roleplays too
+            user_stats = self.get_user_roleplay_stats(user_id)
+            current_stats = user_stats.get(roleplay_id)
             
             updates = {
                 'last_score': score,
@@ -410,6 +425,11 @@ class UserProgressService:
                     updates['stages_completed'] = advanced_results.get('stages_completed', 0)
 
                 client.table('user_roleplay_progress').update(updates).eq('id', current_stats['id']).execute()
+                previous_best = current_stats.get('best_score') or 0
+                if updates['best_score'] > previous_best:
+                    get_leaderboard_service(self.supabase).record_best_score(
+                        roleplay_id, user_id, {**current_stats, **updates}, previous_best
+                    )
             else:
                 updates.update({
                     'user_id': user_id, 
@@ -428,11 +448,20 @@ class UserProgressService:
                     updates['stages_completed'] = advanced_results.get('stages_completed', 0)
                     
                 client.table('user_roleplay_progress').insert(updates).execute()
+                if score > 0:
+                    get_leaderboard_service(self.supabase).record_best_score(roleplay_id, user_id, updates)
             
             logger.info(f"Updated stats for user {user_id} on roleplay {roleplay_id}")
 
+            # Unlocks that follow from this roleplay's new state (e.g. Marathon pass -> 2.1)
+            user_stats[roleplay_id] = {**(current_stats or {}), **updates}
+            new_unlocks = self.progression_graph.propagate(roleplay_id, user_stats)
+            if new_unlocks:
+                self._save_unlocks(user_id, new_unlocks, user_stats)
+
             # Update user_profiles for usage time
             client.rpc('increment_usage_minutes', { 'p_user_id': user_id, 'p_duration': duration }).execute()
+            get_profile_cache().invalidate(user_id)
             logger.info(f"Updated usage for user {user_id}: +{duration} minutes via RPC.")
             
             return True
@@ -447,64 +476,52 @@ class UserProgressService:
             if not self.supabase:
                 return []
             
-            unlocked_roleplays = []
-            progress = self.get_user_roleplay_progress(user_id)
-            
-            for roleplay_id, rules in self.progression_rules.items():
-                if 'unlocks' not in rules or not rules['unlocks']:
-                    continue
-                
-                # Check if this roleplay was just completed
-                roleplay_progress = progress.get(roleplay_id)
-                if not roleplay_progress or not roleplay_progress.get('completed'):
-                    continue
-                
-                # Check what this roleplay unlocks
-                for unlock_id in rules['unlocks']:
-                    unlock_progress = progress.get(unlock_id)
-                    
-                    # If not yet unlocked, add to unlocks list
-                    if not unlock_progress or not unlock_progress.get('is_unlocked'):
-                        unlocked_roleplays.append(unlock_id)
-                        
-                        # Update database to mark as unlocked
-                        try:
-                            existing = self.supabase.get_data_with_filter(
-                                'user_roleplay_progress',
-                                'user_id',
-                                user_id,
-                                additional_filters={'roleplay_id': unlock_id}
-                            )
-                            
-                            now = datetime.now(timezone.utc).isoformat()
-                            
-                            if existing:
-                                self.supabase.update_data_by_id(
-                                    'user_roleplay_progress',
-                                    {'id': existing[0]['id']},
-                                    {'is_unlocked': True, 'unlocked_at': now, 'updated_at': now}
-                                )
-                            else:
-                                self.supabase.insert_data('user_roleplay_progress', {
-                                    'user_id': user_id,
-                                    'roleplay_id': unlock_id,
-                                    'is_unlocked': True,
-                                    'unlocked_at': now,
-                                    'created_at': now
-                                })
-                                
-                        except Exception as unlock_error:
-                            logger.error(f"Error updating unlock status: {unlock_error}")
-            
-            if unlocked_roleplays:
-                logger.info(f"New unlocks for {user_id}: {unlocked_roleplays}")
-            
-            return unlocked_roleplays
+            user_stats = self.get_user_roleplay_stats(user_id)
+            new_unlocks = self._sync_unlocks(user_id, user_stats)
+            if new_unlocks:
+                logger.info(f"New unlocks for {user_id}: {new_unlocks}")
+            return new_unlocks
             
         except Exception as e:
             logger.error(f"Error checking new unlocks: {e}")
             return []
 
+    def _sync_unlocks(self, user_id: str, user_stats: Dict[str, Any]) -> List[str]:
+        """Write every pending unlock for already-loaded progress rows; user_stats is updated in place"""
+        try:
+            new_unlocks = self.progression_graph.pending_unlocks(user_stats)
+            if not new_unlocks or not self._save_unlocks(user_id, new_unlocks, user_stats):
+                return []
+            for unlock_id in new_unlocks:
+                user_stats[unlock_id] = {**(user_stats.get(unlock_id) or {}), 'is_unlocked': True}
+            return list(new_unlocks)
+        except Exception as e:
+            logger.warning(f"Could not sync unlocks for {user_id}: {e}")
+            return []
+
+    def _save_unlocks(self, user_id: str, unlocks: Dict[str, str], user_stats: Dict[str, Any]) -> bool:
+        """Mark roleplays unlocked (unlock_id -> unlocked_by) in one batched upsert"""
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [{
+            'user_id': user_id,
+            'roleplay_id': unlock_id,
+            'is_unlocked': True,
+            'unlocked_at': now,
+            'unlocked_by': unlocked_by,
+            # Every row in a bulk upsert needs the same columns; keep existing creation times
+            'created_at': (user_stats.get(unlock_id) or {}).get('created_at') or now
+        } for unlock_id, unlocked_by in unlocks.items()]
+        
+        try:
+            self.supabase.get_service_client().table('user_roleplay_progress')\
+                .upsert(rows, on_conflict='user_id,roleplay_id')\
+                .execute()
+            logger.info(f"Unlocked Roleplays {list(unlocks)} for user {user_id}")
+            return True
+        except Exception as unlock_error:
+            logger.warning(f"Could not unlock {list(unlocks)} for user {user_id}: {unlock_error}")
+            return False
+
     def get_available_roleplays(self, user_id: str) -> List[str]:
         """Get list of roleplays available to the user"""
         try:
@@ -514,11 +531,9 @@ class UserProgressService:
             always_available = ['1.1', '1.2', '3']
             available.extend(always_available)
             
-            # Check unlocked roleplays
-            for roleplay_id in ['1.3', '2.1', '2.2', '4', '5']:
-                access_check = self.check_roleplay_access(user_id, roleplay_id)
-                if access_check['allowed']:
-                    available.append(roleplay_id)
+            # Check unlocked roleplays (one progress query for all of them)
+            access = self.evaluate_access(user_id, ['1.3', '2.1', '2.2', '4', '5'])
+            available.extend(roleplay_id for roleplay_id, access_check in access.items() if access_check['allowed'])
             
             logger.info(f"Available roleplays for user {user_id}: {available}")
             return available
@@ -536,7 +551,8 @@ class UserProgressService:
             completions = self.supabase.get_data_with_filter(
                 'roleplay_completions',
                 'user_id',
-                user_id
+                user_id,
+                columns='roleplay_id,score,success,duration_minutes'
             )
             
             if not completions:
@@ -573,34 +589,7 @@ class UserProgressService:
             if not self.supabase:
                 return []
             
-            # Get top scores for this roleplay
-            progress_records = self.supabase.get_data_with_filter(
-                'user_roleplay_progress',
-                'roleplay_id',
-                roleplay_id,
-                limit=limit,
-                order_by='best_score',
-                ascending=False
-            )
-            
-            leaderboard = []
-            
-            for i, record in enumerate(progress_records):
-                if record.get('best_score', 0) > 0:
-                    # Get user info (anonymized for privacy)
-                    user_id = record['user_id']
-                    
-                    leaderboard.append({
-                        'rank': i + 1,
-                        'user_id': user_id[:8] + '...',  # Anonymized
-                        'score': record.get('best_score', 0),
-                        'total_attempts': record.get('total_attempts', 0),
-                        'successful_attempts': record.get('successful_attempts', 0),
-                        'completion_rate': (record.get('successful_attempts', 0) / max(record.get('total_attempts', 1), 1)) * 100,
-                        'last_attempt': record.get('last_attempt_at')
-                    })
-            
-            return leaderboard
+            return get_leaderboard_service(self.supabase).get_leaderboard(roleplay_id, limit)['leaderboard']
             
         except Exception as e:
             logger.error(f"Error getting leaderboard: {e}")
@@ -0,0 +1,154 @@
+# ===== API/SERVICES/USER_STATS_ROLLUP.PY - INCREMENTAL PER-USER STATS =====
+
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'user_stats_rollup'
+BUMP_RPC = 'bump_user_stats_rollup'
+REBUILD_RPC = 'rebuild_user_stats_rollup'
+
+ROLLUP_COLUMNS = 'total_sessions,successful_sessions,total_minutes,roleplay_counts,daily_sessions,last_completed_at'
+
+class UserStatsRollupService:
+    """
+    Keeps one user_stats_rollup row per user (see migrations/supabase_schema.sql).
+
+    record_roleplay_completion() bumps the row in the same transaction that
+    saves a completion; record_completion() does it on its own for the
+    step-by-step path used before that migration. get_user_stats() is
+    then a single-row read. Week/month counts come from the per-day
+    buckets the row keeps for the last 31 days, so they are exact to the
+    UTC day rather than to the second.
+
+    A user without a row (history from before the rollup) is backfilled
+    from roleplay_completions on first read.
+    """
+
+    def __init__(self, supabase_service):
+        self.supabase = supabase_service
+
+    # ===== WRITE PATH =====
+
+    def record_completion(self, completion_data: Dict[str, Any]) -> bool:
+        """Add a saved completion to its user's rollup"""
+        user_id = completion_data.get('user_id')
+        if not user_id:
+            return False
+        try:
+            self.supabase.get_service_client().rpc(BUMP_RPC, {
+                'p_user_id': user_id,
+                'p_roleplay_id': str(completion_data.get('roleplay_id') or ''),
+                'p_success': completion_data.get('success') is True,
+                'p_duration_minutes': completion_data.get('duration_minutes') or 0,
+                'p_completed_at': completion_data.get('completed_at') or datetime.now(timezone.utc).isoformat()
+            }).execute()
+            return True
+        except Exception as e:
+            # The next rebuild (or the completions fallback) still has the full history
+            logger.error(f"❌ Error updating stats rollup for user {user_id}: {e}")
+            return False
+
+    def rebuild(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Recompute a user's row from roleplay_completions"""
+        response = self.supabase.get_service_client().rpc(REBUILD_RPC, {'p_user_id': user_id}).execute()
+        data = response.data
+        if isinstance(data, list):
+            data = data[0] if data else None
+        logger.info(f"📊 Rebuilt stats rollup for user {user_id}")
+        return data
+
+    # ===== READ PATH =====
+
+    def get_user_stats(self, user_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """The /api/user/stats payload for a user"""
+        try:
+            response = self.supabase.get_service_client().table(ROLLUP_TABLE)\
+                .select(ROLLUP_COLUMNS)\
+                .eq('user_id', user_id)\
+                .limit(1)\
+                .execute()
+            row = response.data[0] if response.data else self.rebuild(user_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Stats rollup unavailable for user {user_id}, counting completions: {e}")
+            row = self._rollup_from_completions(user_id)
+
+        return self._format(row or {}, profile)
+
+    def _rollup_from_completions(self, user_id: str) -> Dict[str, Any]:
+        """Pre-migration path: build the same row in Python from the stats columns only"""
+        response = self.supabase.get_service_client().table('roleplay_completions')\
+            .select('roleplay_id,success,duration_minutes,completed_at')\
+            .eq('user_id', user_id)\
+            .order('completed_at', desc=True)\
+            .limit(1000)\
+            .execute()
+
+        row = {'total_sessions': 0, 'successful_sessions': 0, 'total_minutes': 0,
+               'roleplay_counts': {}, 'daily_sessions': {}}
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=31)).date().isoformat()
+        for completion in response.data or []:
+            row['total_sessions'] += 1
+            row['successful_sessions'] += 1 if completion.get('success') is True else 0
+            row['total_minutes'] += completion.get('duration_minutes') or 0
+
+            main_id = str(completion.get('roleplay_id') or '').split('.')[0]
+            if main_id:
+                row['roleplay_counts'][main_id] = row['roleplay_counts'].get(main_id, 0) + 1
+
+            day = (completion.get('completed_at') or '')[:10]
+            if day >= cutoff:
+                row['daily_sessions'][day] = row['daily_sessions'].get(day, 0) + 1
+        return row
+
+    @staticmethod
+    def _format(row: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+        from utils.constants import ROLEPLAY_CONFIG
+
+        total_sessions = row.get('total_sessions') or 0
+        successful_sessions = row.get('successful_sessions') or 0
+
+        today = datetime.now(timezone.utc).date()
+        week_start = (today - timedelta(days=7)).isoformat()
+        month_start = (today - timedelta(days=30)).isoformat()
+        daily_sessions = row.get('daily_sessions') or {}
+
+        favorite_roleplay = None
+        roleplay_counts = row.get('roleplay_counts') or {}
+        if roleplay_counts:
+            favorite_id = int(max(sorted(roleplay_counts), key=lambda rp_id: roleplay_counts[rp_id]))
+            favorite_roleplay = ROLEPLAY_CONFIG.get(favorite_id, {}).get('name', f'Roleplay {favorite_id}')
+
+        total_minutes = row.get('total_minutes') or 0
+        if isinstance(total_minutes, float) and total_minutes.is_integer():
+            total_minutes = int(total_minutes)
+
+        return {
+            'total_sessions': total_sessions,
+            'total_minutes': total_minutes,
+            'successful_sessions': successful_sessions,
+            'success_rate': round((successful_sessions / total_sessions) * 100, 1) if total_sessions else 0,
+            'favorite_roleplay': favorite_roleplay,
+            'sessions_this_week': sum(count for day, count in daily_sessions.items() if day >= week_start),
+            'sessions_this_month': sum(count for day, count in daily_sessions.items() if day >= month_start),
+            'monthly_usage_minutes': profile.get('monthly_usage_minutes', 0) or 0,
+            'lifetime_usage_minutes': profile.get('lifetime_usage_minutes', 0) or 0
+        }
+
+# Global instance for singleton pattern
+_user_stats_rollup = None
+_user_stats_rollup_lock = threading.Lock()
+
+def get_user_stats_rollup(supabase_service=None) -> UserStatsRollupService:
+    """Get the process-wide stats rollup service"""
+    global _user_stats_rollup
+    if _user_stats_rollup is None:
+        with _user_stats_rollup_lock:
+            if _user_stats_rollup is None:
+                if supabase_service is None:
+                    from .lazy_services import supabase_service
+                _user_stats_rollup = UserStatsRollupService(supabase_service)
+    return _user_stats_rollup
@@ -88,6 +88,19 @@ class BaseRoleplayManager {
         }
     }
 
+    // One conversation turn: streamed through the voice handler when there is one
+    async requestAIResponse(transcript) {
+        if (this.voiceHandler) {
+            return this.voiceHandler.requestAIResponse(transcript);
+        }
+        
+        const response = await this.apiCall('/api/roleplay/respond', {
+            method: 'POST',
+            body: JSON.stringify({ user_input: transcript })
+        });
+        return response.json();
+    }
+
     loadRoleplayData() {
         const roleplayData = document.getElementById('roleplay-data');
         if (roleplayData) {
@@ -139,11 +139,7 @@ class Roleplay11Manager extends BaseRoleplayManager {
         this.isProcessing = true;
         this.updateTranscript('ðŸ§  Processing...');
         try {
-            const response = await this.apiCall('/api/roleplay/respond', {
-                method: 'POST', body: JSON.stringify({ user_input: transcript })
-            });
-            const data = await response.json();
-            if (!response.ok) throw new Error(data.error || 'Failed to get AI response');
+            const data = await this.requestAIResponse(transcript);
             
             if (!data.call_continues) {
                 this.endCall(true, data);
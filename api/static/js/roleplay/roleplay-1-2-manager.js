@@ -179,17 +179,7 @@ class Roleplay12Manager extends BaseRoleplayManager {
         try {
             console.log(`🏁 Marathon Call #${this.marathonState?.current_call_number || 'Unknown'}: Processing "${transcript}"`);
             
-            const response = await this.apiCall('/api/roleplay/respond', {
-                method: 'POST', 
-                body: JSON.stringify({ user_input: transcript })
-            });
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || 'Failed to get AI response');
-            }
-
-            const data = await response.json();
+            const data = await this.requestAIResponse(transcript);
             console.log('🏁 Marathon response received:', data);
             
             // Update marathon state if provided
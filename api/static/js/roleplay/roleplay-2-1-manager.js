@@ -222,17 +222,7 @@ class Roleplay21Manager extends BaseRoleplayManager {
         try {
             console.log(`🎯 Advanced Practice: Processing "${transcript}"`);
             
-            const response = await this.apiCall('/api/roleplay/respond', {
-                method: 'POST', 
-                body: JSON.stringify({ user_input: transcript })
-            });
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || 'Failed to get AI response');
-            }
-
-            const data = await response.json();
+            const data = await this.requestAIResponse(transcript);
             console.log('🎯 Advanced practice response received:', data);
             
             // Update advanced state tracking
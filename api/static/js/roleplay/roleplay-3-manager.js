@@ -289,17 +289,7 @@ class Roleplay3Manager extends BaseRoleplayManager {
         try {
             console.log(`🔥 Challenge Q${this.challengeState.currentQuestion}: Processing "${transcript}"`);
             
-            const response = await this.apiCall('/api/roleplay/respond', {
-                method: 'POST', 
-                body: JSON.stringify({ user_input: transcript })
-            });
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || 'Failed to get AI response');
-            }
-
-            const data = await response.json();
+            const data = await this.requestAIResponse(transcript);
             console.log('🔥 Challenge response received:', data);
             
             // Update challenge state
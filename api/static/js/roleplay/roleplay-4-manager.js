@@ -233,17 +233,7 @@ class Roleplay4Manager extends BaseRoleplayManager {
         try {
             console.log(`🎯 Simulation: Processing "${transcript}"`);
             
-            const response = await this.apiCall('/api/roleplay/respond', {
-                method: 'POST', 
-                body: JSON.stringify({ user_input: transcript })
-            });
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.error || 'Failed to get AI response');
-            }
-
-            const data = await response.json();
+            const data = await this.requestAIResponse(transcript);
             console.log('🎯 Simulation response received:', data);
             
             // Update simulation state
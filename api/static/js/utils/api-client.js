@@ -14,9 +14,10 @@ class ApiClient {
     
     async request(endpoint, options = {}) {
         const url = `${this.baseUrl}${endpoint}`;
+        // headers last: options.headers must add to the defaults, not replace them
         const config = {
-            headers: { ...this.defaultHeaders, ...options.headers },
-            ...options
+            ...options,
+            headers: { ...this.defaultHeaders, ...options.headers }
         };
         
         console.log(`🌐 API: ${options.method || 'GET'} ${endpoint}`);
@@ -61,6 +62,52 @@ class ApiClient {
     async delete(endpoint, options = {}) {
         return this.request(endpoint, { ...options, method: 'DELETE' });
     }
+    
+    // POST and read a Server-Sent Events response (e.g. /api/roleplay/respond/stream).
+    // onEvent(eventName, data) is called per event; resolves with the 'done' payload.
+    async postEventStream(endpoint, data, onEvent, options = {}) {
+        const response = await this.post(endpoint, data, {
+            ...options,
+            headers: { ...options.headers, 'Accept': 'text/event-stream' }
+        });
+        
+        if (!response.ok || !response.body) {
+            // Non-stream error responses are plain JSON
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `HTTP ${response.status}`);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let donePayload = null;
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let eventName = 'message';
+                const dataLines = [];
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+                }
+                if (!dataLines.length) continue;
+                
+                const payload = JSON.parse(dataLines.join('\n'));
+                if (eventName === 'done') donePayload = payload;
+                if (onEvent) onEvent(eventName, payload);
+            }
+        }
+        
+        return donePayload;
+    }
 }
 
 // Global instance
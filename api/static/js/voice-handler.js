@@ -421,6 +421,56 @@ class VoiceHandler {
         }
     }
 
+    // ===== AI RESPONSE =====
+
+    // Sends the user's transcript to /respond/stream and shows the prospect's reply
+    // as its tokens arrive. Resolves with the 'done' payload (the /respond result);
+    // its ai_response is authoritative, so that is what gets spoken.
+    async requestAIResponse(transcript) {
+        if (!window.apiClient || !window.ReadableStream || !window.TextDecoder) {
+            return this.requestBufferedResponse(transcript);
+        }
+        
+        const token = localStorage.getItem('access_token');
+        if (token) {
+            window.apiClient.setAuthToken(token);
+        }
+        
+        let streamedText = '';
+        const result = await window.apiClient.postEventStream(
+            '/api/roleplay/respond/stream',
+            { user_input: transcript },
+            (event, payload) => {
+                if (event === 'token' && payload.delta) {
+                    streamedText += payload.delta;
+                    this.updateTranscript(`🤖 ${streamedText}`);
+                }
+            }
+        );
+        
+        if (!result) {
+            throw new Error('Response stream ended before the turn completed');
+        }
+        return result;
+    }
+
+    async requestBufferedResponse(transcript) {
+        const response = await fetch('/api/roleplay/respond', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${localStorage.getItem('access_token') || ''}`
+            },
+            body: JSON.stringify({ user_input: transcript })
+        });
+        
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || 'Failed to get AI response');
+        }
+        return data;
+    }
+
     // ===== AUDIO MANAGEMENT =====
 
     async playAudio(text, isInterruptible = true) {
@@ -430,6 +480,62 @@ class VoiceHandler {
         this.setAITurn(true);
         this.setUserTurn(false);
         
+        // Prefer the streaming endpoint: playback starts with the first sentence
+        if (await this.playStreamingAudio(text)) {
+            return;
+        }
+        
+        await this.playBufferedAudio(text);
+    }
+
+    playStreamingAudio(text) {
+        // Resolves true once playback has started, false if the caller should fall back
+        return new Promise(resolve => {
+            try {
+                const streamUrl = `/api/roleplay/tts/stream?text=${encodeURIComponent(text)}`;
+                const audio = new Audio(streamUrl);
+                let started = false;
+                
+                audio.onended = () => {
+                    console.log('✅ Streamed audio finished');
+                    this.cleanupAudio();
+                    this.transitionToUserTurn();
+                };
+                
+                // A failed synthesis comes back as a 503 (X-TTS-Fallback), which
+                // the <audio> element reports here before playback starts
+                audio.onerror = () => {
+                    if (!started) {
+                        console.log('🎵 Streaming TTS failed, falling back');
+                        resolve(false);
+                        return;
+                    }
+                    console.log('❌ Streamed audio error');
+                    this.cleanupAudio();
+                    this.transitionToUserTurn();
+                };
+                
+                this.currentAudio = audio;
+                this.isAudioPlaying = true;
+                
+                audio.play().then(() => {
+                    started = true;
+                    console.log('🎵 Streamed audio playing');
+                    resolve(true);
+                }).catch(error => {
+                    console.warn('Streaming playback failed:', error);
+                    this.currentAudio = null;
+                    this.isAudioPlaying = false;
+                    resolve(false);
+                });
+            } catch (error) {
+                console.warn('Streaming TTS unavailable:', error);
+                resolve(false);
+            }
+        });
+    }
+
+    async playBufferedAudio(text) {
         try {
             const response = await fetch('/api/roleplay/tts', {
                 method: 'POST',
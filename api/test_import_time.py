@@ -0,0 +1,89 @@
+# ===== Test Script - IMPORT TIME PROFILE =====
+
+"""
+Import-time profile of the roleplay blueprint (what a serverless cold start pays).
+Runs `python -X importtime -c "import routes.roleplay"` in a fresh interpreter,
+prints the slowest imports and fails if:
+  - any roleplay implementation or its config is imported eagerly,
+  - the Supabase/OpenAI client libraries are imported before a request needs them, or
+  - the blueprint takes longer than IMPORT_TIME_BUDGET_MS to import.
+
+Run from the api/ directory:
+  python test_import_time.py            # report + checks
+  python -m pytest test_import_time.py  # checks only
+"""
+
+import os
+import re
+import sys
+import subprocess
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGET_MODULE = os.getenv('IMPORT_TIME_TARGET', 'routes.roleplay')
+BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1000'))
+TOP_N = int(os.getenv('IMPORT_TIME_TOP', '15'))
+
+# Must only be imported when a session for that roleplay is first used
+LAZY_MODULE_PATTERN = re.compile(r'^services\.roleplay\.(roleplay_\d|configs\.)')
+# Built by services.lazy_services on first use
+DEFERRED_LIBRARIES = ('supabase', 'openai')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def profile_imports(module: str = TARGET_MODULE):
+    """Returns [(module, self_us, cumulative_us, depth)] in import order"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=API_DIR, capture_output=True, text=True, timeout=120
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    if not entries:
+        raise RuntimeError(f"No import timings for {module}:\n{result.stderr[-2000:]}")
+    return entries
+
+def print_report(entries):
+    target = next((e for e in entries if e[0] == TARGET_MODULE), None)
+    print(f"🧪 Import-time profile for {TARGET_MODULE}")
+    print("=" * 60)
+    if target:
+        print(f"Total: {target[2] / 1000:.1f}ms (budget {BUDGET_MS:.0f}ms), {len(entries)} modules")
+
+    print(f"\nSlowest top-level dependencies (cumulative):")
+    top_level = sorted((e for e in entries if e[3] == 1), key=lambda e: e[2], reverse=True)
+    for name, self_us, cumulative_us, _ in top_level[:TOP_N]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    print(f"\nSlowest modules (self time):")
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:TOP_N]:
+        print(f"  {self_us / 1000:8.1f}ms  {name}")
+
+def test_roleplay_implementations_are_lazy():
+    eager = [e[0] for e in profile_imports() if LAZY_MODULE_PATTERN.match(e[0])]
+    assert not eager, f"Roleplay modules imported at blueprint import: {eager}"
+
+def test_client_libraries_are_deferred():
+    eager = [e[0] for e in profile_imports() if e[0] in DEFERRED_LIBRARIES]
+    assert not eager, f"Client libraries imported at blueprint import: {eager}"
+
+def test_import_time_budget():
+    entries = profile_imports()
+    total_ms = next(e[2] for e in entries if e[0] == TARGET_MODULE) / 1000
+    assert total_ms <= BUDGET_MS, f"{TARGET_MODULE} took {total_ms:.0f}ms to import (budget {BUDGET_MS:.0f}ms)"
+
+if __name__ == "__main__":
+    print_report(profile_imports())
+
+    failed = False
+    for check in (test_roleplay_implementations_are_lazy, test_client_libraries_are_deferred, test_import_time_budget):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
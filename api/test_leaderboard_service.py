@@ -0,0 +1,108 @@
+# ===== Test Script - LEADERBOARD SNAPSHOT RE-SLOTTING =====
+
+"""
+record_best_score() re-slots a user in the cached leaderboard snapshot
+instead of dropping it. After any run of best-score increases the snapshot
+must equal what get_roleplay_leaderboard() would return: ordered by score,
+then earliest last attempt, with RANK() ties.
+
+Run from the api/ directory:
+  python test_leaderboard_service.py            # run the checks
+  python -m pytest test_leaderboard_service.py  # same, under pytest
+"""
+
+import os
+import random
+import sys
+
+os.environ['SCORE_RANK_INDEX_ENABLED'] = 'false'
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.leaderboard_service import LeaderboardService, _assign_ranks
+
+SNAPSHOT_SIZE = 10
+
+def _progress(user_id, best_score, attempt):
+    return {'user_id': user_id, 'best_score': best_score, 'total_attempts': attempt,
+            'successful_attempts': 0, 'last_attempt_at': f'2024-01-01T00:{attempt // 60:02d}:{attempt % 60:02d}+00:00'}
+
+def _ranked(progress_rows, limit):
+    """The SQL ordering: best_score DESC, last_attempt_at ASC, user_id; RANK() for ties"""
+    ordered = sorted((row for row in progress_rows.values() if row['best_score'] > 0),
+                     key=lambda row: (-row['best_score'], row['last_attempt_at'], row['user_id']))
+    return _assign_ranks([LeaderboardService._row(row) for row in ordered[:limit]])
+
+def _snapshot(service, roleplay_id='2.1'):
+    snapshot = service._snapshots[roleplay_id]
+    return [(row['user_id'], row['score'], row['rank']) for row in snapshot['rows']], snapshot['total']
+
+def _expected(progress_rows):
+    rows = _ranked(progress_rows, SNAPSHOT_SIZE)
+    total = sum(1 for row in progress_rows.values() if row['best_score'] > 0)
+    return [(row['user_id'], row['score'], row['rank']) for row in rows], total
+
+def _service_with(progress_rows):
+    service = LeaderboardService(None, ttl_seconds=600, snapshot_size=SNAPSHOT_SIZE)
+    expected_rows, total = _expected(progress_rows)
+    service._store('2.1', _ranked(progress_rows, SNAPSHOT_SIZE), total)
+    assert _snapshot(service) == (expected_rows, total)
+    return service
+
+def test_snapshot_matches_ranked_query_through_increases():
+    rng = random.Random(13)
+    attempt = 0
+    progress_rows = {}
+    for i in range(40):
+        attempt += 1
+        progress_rows[f'user-{i}'] = _progress(f'user-{i}', rng.randint(40, 80), attempt)
+    service = _service_with(progress_rows)
+
+    for _ in range(400):
+        user_id = f'user-{rng.randrange(60)}'  # some are first-time participants
+        previous = progress_rows.get(user_id, {}).get('best_score', 0)
+        if previous >= 100:
+            continue
+        attempt += 1
+        progress_rows[user_id] = _progress(user_id, rng.randint(previous + 1, min(previous + 15, 100)), attempt)
+        service.record_best_score('2.1', user_id, progress_rows[user_id], previous_best=previous)
+        assert _snapshot(service) == _expected(progress_rows)
+
+def test_tie_goes_after_users_already_on_the_score():
+    progress_rows = {
+        'a': _progress('a', 90, 1),
+        'b': _progress('b', 80, 2),
+        'c': _progress('c', 70, 3)
+    }
+    service = _service_with(progress_rows)
+
+    progress_rows['c'] = _progress('c', 90, 4)
+    service.record_best_score('2.1', 'c', progress_rows['c'], previous_best=70)
+    assert _snapshot(service) == ([('a', 90, 1), ('c', 90, 1), ('b', 80, 3)], 3)
+
+def test_full_snapshot_admits_only_scores_above_the_cutoff():
+    progress_rows = {f'user-{i}': _progress(f'user-{i}', 100 - i, i + 1) for i in range(SNAPSHOT_SIZE)}
+    service = _service_with(progress_rows)
+    cutoff = 100 - (SNAPSHOT_SIZE - 1)
+
+    # Tying the last row: their last attempt is latest, so they sort below it
+    progress_rows['late'] = _progress('late', cutoff, 100)
+    service.record_best_score('2.1', 'late', progress_rows['late'], previous_best=None)
+    rows, total = _snapshot(service)
+    assert 'late' not in [user_id for user_id, _, _ in rows]
+    assert total == SNAPSHOT_SIZE + 1
+
+    progress_rows['late'] = _progress('late', cutoff + 1, 101)
+    service.record_best_score('2.1', 'late', progress_rows['late'], previous_best=cutoff)
+    assert _snapshot(service) == _expected(progress_rows)
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_snapshot_matches_ranked_query_through_increases, test_tie_goes_after_users_already_on_the_score,
+                  test_full_snapshot_admits_only_scores_above_the_cutoff):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
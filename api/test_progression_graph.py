@@ -0,0 +1,181 @@
+# ===== Test Script - PROGRESSION GRAPH =====
+
+"""
+The compiled progression graph must make the same access decisions as the
+original per-roleplay rules in UserProgressService.check_roleplay_access,
+and unlock propagation must mark exactly the roleplays those rules open up.
+
+Run from the api/ directory:
+  python test_progression_graph.py            # run the checks
+  python -m pytest test_progression_graph.py  # same, under pytest
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.progression_graph import ProgressionGraph
+from services.user_progress_service import UserProgressService
+
+RULES = UserProgressService(None).progression_rules
+ROLEPLAY_IDS = sorted(set(RULES) | {'1.1', '1.2', '3'})
+
+def _baseline_access(roleplay_id, user_stats):
+    """check_roleplay_access as it was written before the graph, one rule at a time"""
+    if roleplay_id in ['1.1', '1.2', '3']:
+        return {'allowed': True, 'reason': 'Always available'}
+    rule = RULES.get(roleplay_id)
+    if not rule:
+        return {'allowed': True, 'reason': 'No specific unlock requirement'}
+    required_rp_id = rule.get('requires_completion')
+    if not required_rp_id:
+        return {'allowed': True, 'reason': 'No prerequisite required'}
+
+    required_stats = user_stats.get(required_rp_id)
+    if not required_stats:
+        return {
+            'allowed': False,
+            'reason': f'Complete {rule.get("description", required_rp_id)} first',
+            'required_roleplay': required_rp_id,
+            'required_name': rule.get('name', f'Roleplay {required_rp_id}')
+        }
+    if required_rp_id == '1.2':
+        if not required_stats.get('marathon_passed', False):
+            return {
+                'allowed': False,
+                'reason': f'Pass Marathon Mode (6/10 calls) to unlock {roleplay_id}',
+                'required_roleplay': required_rp_id,
+                'required_name': 'Marathon Mode',
+                'current_progress': f"{required_stats.get('marathon_best_run', 0)}/10 calls passed"
+            }
+    elif required_rp_id == '1.3':
+        if not required_stats.get('legend_completed', False):
+            return {
+                'allowed': False,
+                'reason': f'Complete Legend Mode to unlock {roleplay_id}',
+                'required_roleplay': required_rp_id,
+                'required_name': 'Legend Mode'
+            }
+    elif required_rp_id == '2.1':
+        if not required_stats.get('best_score', 0) >= 70:
+            return {
+                'allowed': False,
+                'reason': f'Pass Post-Pitch Practice (70+ score) to unlock {roleplay_id}',
+                'required_roleplay': required_rp_id,
+                'required_name': 'Post-Pitch Practice',
+                'current_progress': f"Best score: {required_stats.get('best_score', 0)}/100"
+            }
+    elif not required_stats.get('completed', False):
+        return {
+            'allowed': False,
+            'reason': f'Complete {required_rp_id} to unlock {roleplay_id}',
+            'required_roleplay': required_rp_id
+        }
+    return {'allowed': True, 'reason': 'Requirement met', 'unlocked_by': required_rp_id}
+
+def _random_stats(rng):
+    """roleplay_id -> user_roleplay_progress row, with some roleplays never played"""
+    user_stats = {}
+    for roleplay_id in ROLEPLAY_IDS:
+        if rng.random() < 0.25:
+            continue
+        user_stats[roleplay_id] = {
+            'roleplay_id': roleplay_id,
+            'best_score': rng.choice((0, 45, 69, 70, 88)),
+            'completed': rng.random() < 0.5,
+            'marathon_passed': rng.random() < 0.5,
+            'marathon_best_run': rng.randint(0, 10),
+            'legend_completed': rng.random() < 0.5,
+            'is_unlocked': rng.random() < 0.3
+        }
+    return user_stats
+
+def _is_unlocked(user_stats, roleplay_id):
+    return bool(user_stats.get(roleplay_id, {}).get('is_unlocked'))
+
+def _baseline_unlocks_below(start, user_stats):
+    """
+    Roleplays the baseline rules allow, not yet marked unlocked, whose chain of
+    prerequisites leads up to `start` through roleplays the rules also allow
+    """
+    unlocks = {}
+    for roleplay_id, required_rp_id in ((rp, rule.get('requires_completion')) for rp, rule in RULES.items()):
+        if not required_rp_id or _is_unlocked(user_stats, roleplay_id):
+            continue
+        node, reachable = roleplay_id, False
+        while _baseline_access(node, user_stats)['allowed']:
+            parent = RULES.get(node, {}).get('requires_completion')
+            if parent == start:
+                reachable = True
+                break
+            if not parent:
+                break
+            node = parent
+        if reachable:
+            unlocks[roleplay_id] = required_rp_id
+    return unlocks
+
+def test_access_matches_baseline_rules():
+    graph = ProgressionGraph(RULES)
+    rng = random.Random(3)
+    for _ in range(300):
+        user_stats = _random_stats(rng)
+        for roleplay_id in ROLEPLAY_IDS + ['9.9']:
+            assert graph.evaluate(roleplay_id, user_stats) == _baseline_access(roleplay_id, user_stats), roleplay_id
+
+def test_pending_unlocks_match_baseline_rules():
+    graph = ProgressionGraph(RULES)
+    rng = random.Random(5)
+    for _ in range(300):
+        user_stats = _random_stats(rng)
+        expected = {
+            roleplay_id: RULES[roleplay_id]['requires_completion']
+            for roleplay_id in RULES
+            if RULES[roleplay_id].get('requires_completion')
+            and _baseline_access(roleplay_id, user_stats)['allowed']
+            and not _is_unlocked(user_stats, roleplay_id)
+        }
+        assert graph.pending_unlocks(user_stats) == expected
+
+def test_propagate_matches_baseline_rules():
+    graph = ProgressionGraph(RULES)
+    rng = random.Random(9)
+    for _ in range(300):
+        user_stats = _random_stats(rng)
+        for start in ROLEPLAY_IDS:
+            assert graph.propagate(start, user_stats) == _baseline_unlocks_below(start, user_stats), start
+
+def test_marathon_pass_cascades_down_the_chain():
+    graph = ProgressionGraph(RULES)
+    user_stats = {
+        '1.2': {'marathon_passed': True},
+        '2.1': {'best_score': 82},
+        '2.2': {'completed': True},
+        '5': {'is_unlocked': True}
+    }
+    assert graph.propagate('1.2', user_stats) == {'1.3': '1.2', '2.1': '1.2', '2.2': '2.1', '4': '2.1'}
+    assert graph.propagate('1.2', user_stats) == graph.pending_unlocks(user_stats)
+
+def test_cyclic_rules_are_rejected():
+    rules = {'a': {'requires_completion': 'b'}, 'b': {'requires_completion': 'a'}}
+    try:
+        ProgressionGraph(rules)
+    except ValueError as e:
+        assert 'cycle' in str(e)
+    else:
+        raise AssertionError('cyclic rules compiled')
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_access_matches_baseline_rules, test_pending_unlocks_match_baseline_rules,
+                  test_propagate_matches_baseline_rules, test_marathon_pass_cascades_down_the_chain,
+                  test_cyclic_rules_are_rejected):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,88 @@
+# ===== Test Script - SCORE RANK INDEX =====
+
+"""
+The Fenwick-tree rank index must agree with ranking a plain sorted list of
+best scores: rank = 1 + participants scoring higher (ties share a rank),
+percentile = share of participants scoring lower, before and after updates.
+
+Run from the api/ directory:
+  python test_score_rank_index.py            # run the checks
+  python -m pytest test_score_rank_index.py  # same, under pytest
+"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.score_rank_index import FenwickTree, RoleplayScoreIndex
+
+def _oracle(scores, user_id):
+    """rank/percentile from a sorted list of every best score"""
+    ordered = sorted(scores.values(), reverse=True)
+    score = scores[user_id]
+    higher = sum(1 for other in ordered if other > score)
+    lower = sum(1 for other in ordered if other < score)
+    return {
+        'rank': 1 + higher,
+        'score': score,
+        'percentile': round(lower / len(ordered) * 100, 1),
+        'total': len(ordered)
+    }
+
+def _assert_matches_oracle(index, scores):
+    assert len(index) == len(scores)
+    for user_id in scores:
+        assert index.lookup(user_id) == _oracle(scores, user_id), user_id
+
+def test_fenwick_prefix_sums_match_counts():
+    rng = random.Random(7)
+    counts = [rng.randint(0, 5) for _ in range(37)]
+    tree = FenwickTree(counts)
+    for _ in range(200):
+        bucket = rng.randrange(len(counts))
+        delta = rng.choice((-1, 1)) if counts[bucket] else 1
+        counts[bucket] += delta
+        tree.add(bucket, delta)
+        probe = rng.randrange(-1, len(counts) + 3)
+        assert tree.prefix(probe) == sum(counts[:max(probe + 1, 0)])
+
+def test_ranks_match_sorted_oracle_through_updates():
+    rng = random.Random(11)
+    # Whole-number scores sit on bucket boundaries, so the oracle compares exactly
+    scores = {f'user-{i}': rng.randint(1, 100) for i in range(300)}
+    index = RoleplayScoreIndex(dict(scores), max_score=100, resolution=0.1)
+    _assert_matches_oracle(index, scores)
+
+    for step in range(500):
+        user_id = f'user-{rng.randrange(400)}'
+        score = rng.choice((0, rng.randint(1, 100)))
+        index.set(user_id, score)
+        if score:
+            scores[user_id] = score
+        else:
+            scores.pop(user_id, None)  # score 0 leaves the leaderboard
+        if step % 50 == 0:
+            _assert_matches_oracle(index, scores)
+    _assert_matches_oracle(index, scores)
+
+def test_ties_share_a_rank_and_unknown_users_have_none():
+    index = RoleplayScoreIndex({'a': 90, 'b': 90, 'c': 75, 'd': 0}, max_score=100, resolution=0.1)
+    assert index.lookup('a')['rank'] == index.lookup('b')['rank'] == 1
+    assert index.lookup('c') == {'rank': 3, 'score': 75, 'percentile': 0.0, 'total': 3}
+    assert index.lookup('d') is None
+    assert index.rank_of_score(80) == 3
+    assert index.rank_of_score(95) == 1
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_fenwick_prefix_sums_match_counts, test_ranks_match_sorted_oracle_through_updates,
+                  test_ties_share_a_rank_and_unknown_users_have_none):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
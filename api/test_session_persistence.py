@@ -0,0 +1,94 @@
+# ===== Test Script - SESSION PERSISTENCE ROUND-TRIPS =====
+
+"""
+Sessions written to a SessionStore must come back usable by the roleplay
+implementations: set fields (used_objections, categories_covered, ...)
+have to be sets again after JSON storage, or the next turn's .add() fails.
+
+Run from the api/ directory:
+  python test_session_persistence.py            # run the checks
+  python -m pytest test_session_persistence.py  # same, under pytest
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.session import RoleplaySession
+from services.session_store import SQLiteSessionStore
+from services.session_log import SessionTurnLog
+
+class _EventTable:
+    """Stands in for the supabase service: keeps inserted turn log events in a list"""
+
+    def __init__(self):
+        self.events = []
+
+    def insert_data(self, table, record):
+        self.events.append(record)
+        return record
+
+def _session():
+    return RoleplaySession({
+        'session_id': 'session-1',
+        'user_id': 'user-1',
+        'roleplay_id': '2.1',
+        'current_stage': 'objection_handling',
+        'started_at': '2024-01-01T00:00:00+00:00',
+        'conversation_history': [{'role': 'user', 'content': 'Hello', 'timestamp': '2024-01-01T00:00:05+00:00'}],
+        'used_objections': {'Not interested', 'Send me an email'},
+        'used_questions': set()
+    })
+
+def test_sqlite_store_restores_set_fields():
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteSessionStore(os.path.join(directory, 'sessions.db'))
+        store.put('session-1', 'user-1', _session())
+
+        restored = RoleplaySession.coerce(store.get('session-1'))
+        assert restored['used_objections'] == {'Not interested', 'Send me an email'}
+        assert restored['used_questions'] == set()
+
+        # What roleplay_2_1 does on the next turn
+        restored['used_objections'].add('Too busy')
+        restored['used_questions'].add('What do you do?')
+        assert 'Too busy' in restored['used_objections']
+        assert restored['conversation_history'][0]['content'] == 'Hello'
+
+def test_turn_log_replay_restores_set_fields():
+    table = _EventTable()
+    log = SessionTurnLog(table, compact_every=20)
+    session = _session()
+    assert log.append('session-1', 'user-1', session)  # snapshot
+
+    session['used_objections'].add('Too busy')
+    session['conversation_history'].append({'role': 'assistant', 'content': 'Fair enough'})
+    assert log.append('session-1', 'user-1', session)  # delta
+    assert [event['kind'] for event in table.events] == ['snapshot', 'delta']
+
+    replayed = SessionTurnLog.replay(table.events)
+    assert isinstance(replayed['used_objections'], set)
+    restored = RoleplaySession.coerce(replayed)
+    assert restored['used_objections'] == {'Not interested', 'Send me an email', 'Too busy'}
+    assert len(restored['conversation_history']) == 2
+
+    # The replayed cursor matches the restored sets, so an unchanged session writes nothing
+    assert log.append('session-1', 'user-1', restored)
+    assert len(table.events) == 2
+
+    restored['used_questions'].add('What do you do?')
+    assert log.append('session-1', 'user-1', restored)
+    assert table.events[-1]['payload']['fields'] == {'used_questions': {'__set__': ['What do you do?']}}
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_sqlite_store_restores_set_fields, test_turn_log_replay_restores_set_fields):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,120 @@
+# ===== Test Script - SESSION REAPER ACROSS WORKERS =====
+
+"""
+Every worker process runs its own SessionReaper over the shared session
+store. When two of them find the same idle session, only one may end it,
+or the completion and usage are recorded twice.
+
+Run from the api/ directory:
+  python test_session_reaper.py            # run the checks
+  python -m pytest test_session_reaper.py  # same, under pytest
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ['SESSION_REAPER_ENABLED'] = 'false'  # reap_expired() is driven by the test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.roleplay_engine import RoleplayEngine
+from services.session_store import SQLiteSessionStore
+
+class _OpenAIOff:
+    def is_available(self):
+        return False
+
+class _EventTable:
+    """Stands in for the supabase service: keeps inserted turn log events in a list"""
+
+    def __init__(self):
+        self.events = []
+
+    def insert_data(self, table, record):
+        self.events.append(record)
+        return record
+
+class _Progress:
+    """Stands in for UserProgressService: records which sessions were completed"""
+
+    def __init__(self):
+        self.completions = []
+        self._lock = threading.Lock()
+
+    def log_roleplay_attempt(self, *args, **kwargs):
+        return None
+
+    def record_completion(self, completion_data):
+        with self._lock:
+            self.completions.append(completion_data['session_id'])
+        return {'success': True}
+
+class _RacingStore(SQLiteSessionStore):
+    """Holds the reaper's first read until every worker has read the session too"""
+
+    def __init__(self, path, barrier):
+        super().__init__(path)
+        self.barrier = barrier
+
+    def get(self, session_id):
+        session_data = super().get(session_id)
+        barrier, self.barrier = self.barrier, None
+        if barrier:
+            barrier.wait(timeout=5)
+        return session_data
+
+def test_sqlite_take_hands_a_session_to_one_worker():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.db')
+        first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+        first.put('session-1', 'user-1', {'session_id': 'session-1'})
+
+        assert first.take('session-1') == {'session_id': 'session-1'}
+        assert second.take('session-1') is None
+        assert second.get('session-1') is None
+
+def test_concurrent_reapers_end_an_idle_session_once():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.db')
+        barrier = threading.Barrier(2)
+        progress = _Progress()
+        workers = []
+        for _ in range(2):
+            engine = RoleplayEngine(_OpenAIOff(), _EventTable(), _RacingStore(path, None))
+            engine.progress_service = progress
+            workers.append(engine)
+
+        session_id = workers[0].create_session('user-1', '1.1', 'practice', {'first_name': 'Alex'})['session_id']
+        store = workers[0].session_store
+        session_data = store.get(session_id)
+        session_data['last_activity_at'] = time.time() - 2 * workers[0].session_reaper.idle_timeout
+        store.put(session_id, 'user-1', session_data)
+
+        for engine in workers:
+            engine.session_store.barrier = barrier
+            engine.session_reaper.schedule(session_id, time.time() - 1)
+
+        results = []
+        threads = [threading.Thread(target=lambda e=engine: results.append(e.session_reaper.reap_expired()))
+                   for engine in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert sorted(result['reaped'] for result in results) == [0, 1]
+        assert progress.completions == [session_id]
+        assert store.get(session_id) is None
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_sqlite_take_hands_a_session_to_one_worker, test_concurrent_reapers_end_an_idle_session_once):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
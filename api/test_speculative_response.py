@@ -0,0 +1,75 @@
+# ===== Test Script - SPECULATIVE PROSPECT REPLY =====
+
+"""
+The prospect reply is generated while the user's input is still being
+evaluated. Its streamed tokens must only reach the client once evaluation
+keeps the call going: after a hang-up the client shows the hang-up line,
+never the speculative text.
+
+Run from the api/ directory:
+  python test_speculative_response.py            # run the checks
+  python -m pytest test_speculative_response.py  # same, under pytest
+"""
+
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.roleplay.roleplay_1_1 import Roleplay11
+
+SPECULATIVE_TOKENS = ['Okay, ', 'what is ', 'this about?']
+
+class _StreamingOpenAI:
+    """Stands in for the OpenAI service: streams the reply before evaluation returns"""
+
+    def __init__(self):
+        self.generated = threading.Event()
+
+    def is_available(self):
+        return True
+
+    def generate_roleplay_response(self, user_input, conversation_history, context, current_stage, on_token=None):
+        for delta in SPECULATIVE_TOKENS:
+            if on_token:
+                on_token(delta)
+        self.generated.set()
+        return {'success': True, 'response': ''.join(SPECULATIVE_TOKENS)}
+
+    def evaluate_user_input(self, user_input, conversation_history, evaluation_stage):
+        # Evaluation finishes only after the speculative reply has streamed
+        self.generated.wait(timeout=5)
+        return {'score': 3, 'passed': True, 'criteria_met': []}
+
+def _run_turn(should_hang_up):
+    roleplay = Roleplay11(_StreamingOpenAI())
+    roleplay._should_hang_up_enhanced = lambda session, evaluation, user_input: should_hang_up
+    session_id = roleplay.create_session('user-1', 'practice', {'first_name': 'Alex'})['session_id']
+
+    streamed = []
+    result = roleplay.process_user_input(session_id, "Hi, it's Alex from Acme", on_token=streamed.append)
+    assert result['success']
+    return result, streamed
+
+def test_hang_up_after_speculation_streams_nothing():
+    result, streamed = _run_turn(should_hang_up=True)
+    assert streamed == []
+    assert result['call_continues'] is False
+    assert result['ai_response'] != ''.join(SPECULATIVE_TOKENS)
+
+def test_continuing_turn_flushes_held_tokens():
+    result, streamed = _run_turn(should_hang_up=False)
+    assert streamed == SPECULATIVE_TOKENS
+    assert result['ai_response'] == ''.join(SPECULATIVE_TOKENS)
+
+if __name__ == "__main__":
+    failed = False
+    for check in (test_hang_up_after_speculation_streams_nothing, test_continuing_turn_flushes_held_tokens):
+        try:
+            check()
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            print(f"❌ {check.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
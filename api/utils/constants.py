@@ -673,4 +673,8 @@ SUCCESS_MESSAGES = {
     "marathon_fail": "You completed all 10 calls and scored {score}/10. Keep practising—the more reps you get, the easier it becomes. Ready to try Marathon again?",
     "legend_pass": "Wow—six for six! That's legendary. Very few reps pull this off, so enjoy the bragging rights!",
     "legend_fail": "Legend attempt over this time. To earn another shot, just pass Marathon again. Meanwhile, modules 2.1 and 2.2 are open for the next 24 hours—feel free to explore them."
-}
\ No newline at end of file
+}
+# roleplay_completions columns fetched by list/paging views. The transcript
+# (conversation_data) and feedback blobs are only loaded per completion.
+COMPLETION_SUMMARY_COLUMNS = 'id,session_id,roleplay_id,mode,score,success,duration_minutes,started_at,completed_at,forced_end'
+COMPLETION_DETAIL_COLUMNS = '*'
@@ -253,7 +253,8 @@ def log_user_action(user_id: str, action: str, details: Dict = None):
 # ===== API/UTILS/DECORATORS.PY (ENHANCED) =====
 from functools import wraps
 from flask import session, request, jsonify, redirect, url_for
-from services.supabase_client import SupabaseService
+from services.lazy_services import get_supabase_service
+from services.admin_decision_cache import get_admin_decision_cache
 import os
 
 def require_auth(f):
@@ -273,7 +274,7 @@ def require_auth(f):
             access_token = session.get('access_token')
         
         if access_token:
-            supabase_service = SupabaseService()
+            supabase_service = get_supabase_service()
             user = supabase_service.authenticate_user(access_token)
             if not user:
                 session.clear()
@@ -297,9 +298,17 @@ def require_admin(f):
             else:
                 return redirect(url_for('login_page'))
         
+        # Reuse a recent decision for this session and token
+        decision_cache = get_admin_decision_cache()
+        cached_decision = decision_cache.get(session['user_id'], session.get('access_token'))
+        if cached_decision is True:
+            return f(*args, **kwargs)
+        if cached_decision is False:
+            return jsonify({'error': 'Admin privileges required'}), 403
+        
         # Get user profile to check admin status
         try:
-            supabase_service = SupabaseService()
+            supabase_service = get_supabase_service()
             profile = supabase_service.get_user_profile_by_service(session['user_id'])
             
             if not profile:
@@ -312,11 +321,15 @@ def require_admin(f):
             # Check access_level first (if you've updated schema)
             if profile.get('access_level') == 'admin':
                 logger.info("Admin access granted via access_level")
+                decision_cache.set(session['user_id'], session.get('access_token'), True)
                 return f(*args, **kwargs)
             
             # Fallback: Check if user is admin via environment variable
             admin_email = os.getenv('REACT_APP_ADMIN_EMAIL')
             logger.info(f"Admin email from env: {admin_email}")
+            # Only a definite "no" is cached: authenticate_user() returns None on
+            # Supabase Auth errors too, and that must not pin a 403
+            denial_confirmed = False
             
             if admin_email:
                 try:
@@ -342,9 +355,11 @@ def require_admin(f):
                             
                             if user_email and user_email.lower().strip() == admin_email.lower().strip():
                                 logger.info("Admin access granted via email match")
+                                decision_cache.set(session['user_id'], access_token, True)
                                 return f(*args, **kwargs)
                             else:
                                 logger.warning(f"Email mismatch: '{user_email}' != '{admin_email}'")
+                                denial_confirmed = bool(user_email)
                         else:
                             logger.warning("Failed to authenticate user with token")
                     else:
@@ -353,8 +368,11 @@ def require_admin(f):
                     logger.error(f"Error getting user email: {e}")
             else:
                 logger.warning("No REACT_APP_ADMIN_EMAIL environment variable set")
+                denial_confirmed = True
             
             logger.warning(f"Admin access denied for user {session['user_id']}")
+            if denial_confirmed:
+                decision_cache.set(session['user_id'], session.get('access_token'), False)
             return jsonify({'error': 'Admin privileges required'}), 403
             
         except Exception as e:
@@ -375,7 +393,7 @@ def require_access_level(min_level: str):
                     return redirect(url_for('login_page'))
             
             try:
-                supabase_service = SupabaseService()
+                supabase_service = get_supabase_service()
                 profile = supabase_service.get_user_profile_by_service(session['user_id'])
                 
                 if not profile:
@@ -414,7 +432,7 @@ def check_usage_limits(f):
             return jsonify({'error': 'Authentication required'}), 401
         
         try:
-            supabase_service = SupabaseService()
+            supabase_service = get_supabase_service()
             profile = supabase_service.get_user_profile_by_service(session['user_id'])
             
             if not profile: